@@ -2,7 +2,6 @@ import os
 import json
 from typing import List
 from datetime import datetime, timedelta
-import pandas as pd
 
 class Task:
     def __init__(self, title: str, description: str, completed: bool = False, created_at: str = None, completed_at: str = None, deadline: str = None):
@@ -79,6 +78,7 @@ class TaskManager:
         if not self.tasks:
             print("Список задач пуст.")
         else:
+            import pandas as pd  # pandas импортируется только при выводе таблицы, а не при запуске
             tasks_data = [task.to_dict(i + 1) for i, task in enumerate(self.tasks)]
             df = pd.DataFrame(tasks_data)
             print(df.to_string(index=False, justify='left'))
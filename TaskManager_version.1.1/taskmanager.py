@@ -0,0 +1,5448 @@
+"""
+TaskManager версии 1.1: задачи, пользователи, хранилище и служебные команды.
+Точка входа - TaskManager_version.1.1.py; код вынесен в модуль, чтобы Python кэшировал его байт-код
+в __pycache__ и не компилировал заново при каждом запуске.
+"""
+import os
+import sys
+import json
+import time
+import bisect
+import heapq
+import itertools
+import threading
+import functools
+import weakref
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import List
+from datetime import datetime, timedelta
+
+# Скрипт запуска меню и служебных команд (нагрузочный тест и замер запуска запускают его в отдельных процессах)
+ENTRY_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "TaskManager_version.1.1.py")
+
+try:  # Рекомендательные блокировки файлов (fcntl) доступны только на POSIX-системах
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def tabulate(*args, **kwargs):
+    """Обертка над tabulate.tabulate: библиотека импортируется при первой отрисовке таблицы, а не при запуске."""
+    from tabulate import tabulate as render_table
+    return render_table(*args, **kwargs)
+
+
+# Статистика конкурентного доступа к файлам данных (см. lock_statistics())
+LOCK_STATS = {
+    "acquired": 0,
+    "contended": 0,
+    "wait_seconds": 0.0,
+    "max_wait_seconds": 0.0,
+    "merged_saves": 0,
+    "rejected_saves": 0,
+}
+_LOCK_STATS_GUARD = threading.Lock()
+
+
+def _update_lock_stats(**increments):
+    with _LOCK_STATS_GUARD:
+        for key, value in increments.items():
+            if key == "max_wait_seconds":
+                LOCK_STATS[key] = max(LOCK_STATS[key], value)
+            else:
+                LOCK_STATS[key] += value
+
+
+def lock_statistics():
+    """Возвращает копию статистики блокировок: число захватов, ожиданий, слияний и отказов при сохранении."""
+    with _LOCK_STATS_GUARD:
+        return dict(LOCK_STATS)
+
+
+class FileLock:
+    """
+    Рекомендательная межпроцессная блокировка файла данных.
+    Блокируется файл-спутник "<имя файла>.lock", в нем же хранится счетчик версий файла данных.
+    shared=True - разделяемая блокировка для чтения, иначе эксклюзивная для записи.
+    """
+
+    def __init__(self, filename: str, shared: bool = False):
+        self.lock_filename = f"{filename}.lock"
+        self.shared = shared
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.lock_filename, 'a+', encoding='utf-8')
+        waited = 0.0
+        if fcntl is not None:
+            mode = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+            try:
+                fcntl.flock(self._file.fileno(), mode | fcntl.LOCK_NB)
+            except BlockingIOError:
+                started = time.perf_counter()
+                fcntl.flock(self._file.fileno(), mode)
+                waited = time.perf_counter() - started
+                _update_lock_stats(contended=1, wait_seconds=waited, max_wait_seconds=waited)
+        _update_lock_stats(acquired=1)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+        return False
+
+    def read_version(self) -> int:
+        self._file.seek(0)
+        content = self._file.read().strip()
+        return int(content) if content.isdigit() else 0
+
+    def write_version(self, version: int):
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(str(version))
+        self._file.flush()
+
+
+def merge_task_records(base: dict, ours: List[dict], theirs: List[dict], prefer_ours: bool = False):
+    """
+    Трехстороннее слияние списков задач по uid с объединением изменений по полям.
+    base - записи задач (uid -> запись) на момент загрузки или сохранения, ours - текущие в памяти,
+    theirs - сохраненные другим процессом. Изменения разных полей одной задачи объединяются;
+    конфликт - только если оба сеанса изменили одно и то же поле по-разному (или один удалил задачу,
+    которую изменил другой). prefer_ours=True разрешает конфликты в пользу текущего сеанса.
+    Возвращает (объединенный список, список uid задач с конфликтующими изменениями).
+    """
+    ours_by_uid = {record["uid"]: record for record in ours}
+    theirs_by_uid = {record["uid"]: record for record in theirs}
+    merged = []
+    conflicts = []
+
+    for uid, their in theirs_by_uid.items():
+        mine = ours_by_uid.get(uid)
+        old = base.get(uid)
+        if mine is None:
+            if old is None:
+                merged.append(their)  # Задачу добавил другой процесс
+            elif their != old:
+                conflicts.append(uid)  # Мы удалили задачу, которую другой процесс изменил
+            continue
+        if mine == their or mine == old:
+            merged.append(their)
+            continue
+        if their == old:
+            merged.append(mine)
+            continue
+        record = {}
+        conflicting = False
+        for field in dict.fromkeys(itertools.chain(their, mine)):
+            mine_value, their_value = mine.get(field), their.get(field)
+            old_value = (old or {}).get(field)
+            if mine_value == their_value or mine_value == old_value:
+                value = their_value
+            elif their_value == old_value:
+                value = mine_value
+            else:
+                conflicting = True
+                value = mine_value
+            if value is not None or field in Task.RECORD_FIELDS:
+                record[field] = value
+        if conflicting:
+            conflicts.append(uid)
+        if not conflicting or prefer_ours:
+            merged.append(record)
+
+    for uid, mine in ours_by_uid.items():
+        if uid in theirs_by_uid:
+            continue
+        old = base.get(uid)
+        if old is None:
+            merged.append(mine)  # Новая задача из текущей сессии
+        elif mine != old:
+            conflicts.append(uid)  # Другой процесс удалил задачу, которую мы изменили
+            if prefer_ours:
+                merged.append(mine)
+
+    return merged, conflicts
+
+
+def format_remaining_time(deadline_time: datetime, now: datetime) -> str:
+    """Текст колонки "Время" для открытой задачи со сроком deadline_time."""
+    remaining = deadline_time - now
+    if remaining.total_seconds() > 0:
+        days = remaining.days
+        if days >= 1:
+            return f"Более {days} дней"
+        else:
+            hours, remainder = divmod(remaining.seconds, 3600)
+            minutes, seconds = divmod(remainder, 60)
+            return f"{hours:02}:{minutes:02}:{seconds:02}"
+    else:
+        return "[Срок истек]"
+
+
+def new_uid() -> str:
+    import uuid
+    return uuid.uuid4().hex[:12]
+
+
+def task_filename(user_name: str) -> str:
+    return f"{user_name.replace(' ', '_')}_tasks.json"
+
+
+def record_checksum(record: dict) -> str:
+    """Контрольная сумма записи задачи: CRC32 канонического JSON записи без поля checksum."""
+    import zlib  # Импорт при первом использовании ускоряет запуск программы
+    payload = json.dumps({key: value for key, value in record.items() if key != "checksum"},
+                         ensure_ascii=False, sort_keys=True)
+    return f"{zlib.crc32(payload.encode('utf-8')):08x}"
+
+
+def dump_task_records(records: List[dict]) -> bytes:
+    """Содержимое файла задач: записи с контрольными суммами."""
+    return json.dumps([{**record, "checksum": record_checksum(record)} for record in records],
+                      ensure_ascii=False, indent=4).encode("utf-8")
+
+
+def _salvage_records(text: str) -> tuple:
+    """
+    Извлекает из испорченного файла задач все записи, которые еще разбираются как JSON.
+    Возвращает (записи, число записей, начало которых найдено, но которые не разбираются).
+    """
+    decoder = json.JSONDecoder()
+    records = []
+    broken = 0
+    position = text.find("{")
+    while position != -1:
+        try:
+            value, end = decoder.raw_decode(text, position)
+        except json.JSONDecodeError:
+            # Записи начинаются с "{" в начале строки; вложенные словари (recurrence) - после ключа
+            if not text[text.rfind("\n", 0, position) + 1:position].strip():
+                broken += 1
+            position = text.find("{", position + 1)
+            continue
+        if isinstance(value, dict) and "title" in value:
+            records.append(value)
+            position = text.find("{", end)
+        else:
+            position = text.find("{", position + 1)
+    return records, broken
+
+
+def parse_task_records(data: bytes) -> tuple:
+    """
+    Разбирает содержимое файла задач и проверяет контрольные суммы записей. Если файл не разбирается
+    целиком (оборванная запись, испорченные байты), из него извлекаются все уцелевшие записи.
+    Возвращает (целые записи, число поврежденных записей, число записей без контрольной суммы,
+    разобран ли файл целиком). Записи старых версий без контрольной суммы считаются целыми.
+    """
+    text = data.decode("utf-8", errors="replace")
+    try:
+        candidates = json.loads(text)
+        intact = isinstance(candidates, list)
+        damaged = 0 if intact else 1
+        if not intact:
+            candidates = []
+    except json.JSONDecodeError:
+        candidates, damaged = _salvage_records(text)
+        intact = False
+    records = []
+    unsigned = 0
+    for record in candidates:
+        if not isinstance(record, dict) or "title" not in record:
+            damaged += 1
+            continue
+        checksum = record.pop("checksum", None)
+        if checksum is None:
+            unsigned += 1
+        elif checksum != record_checksum(record):
+            damaged += 1
+            continue
+        records.append(record)
+    return records, damaged, unsigned, intact
+
+
+def read_records_file(filename: str) -> tuple:
+    """Читает файл задач с проверкой контрольных сумм: (целые записи, поврежденных, без суммы, разобран целиком)."""
+    with open(filename, 'rb') as file:
+        return parse_task_records(file.read())
+
+
+def read_task_records(filename: str) -> List[dict]:
+    """
+    Читает записи задач из файла под разделяемой блокировкой, не создавая объектов TaskManager.
+    Из поврежденного файла возвращаются уцелевшие записи.
+    """
+    with FileLock(filename, shared=True):
+        return read_records_file(filename)[0]
+
+
+def write_file_durable(path: str, data: bytes):
+    """Атомарная запись файла с отдельным сбросом на диск: временный файл, fsync, переименование."""
+    with open(path + ".tmp", 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(path + ".tmp", path)
+
+
+class WriteCoordinator:
+    """
+    Групповая запись файлов данных. Сохранения всех TaskManager процесса попадают в ограниченную очередь;
+    фоновый поток забирает пачку (до max_batch запросов, ожидая следующих не дольше max_delay секунд),
+    пишет каждый файл во временный "<файл>.tmp", делает один сброс на диск на всю пачку
+    и переименовывает временные файлы на место. Несколько записей одного файла в пачке сливаются
+    в последнюю. Если очередь заполнена, сохраняющий поток ждет (обратное давление).
+    """
+
+    def __init__(self, max_pending: int = 1024, max_batch: int = 128, max_delay: float = 0.0):
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.stats = {"requests": 0, "files": 0, "coalesced": 0, "batches": 0, "barriers": 0,
+                      "max_batch": 0, "backpressure_waits": 0}
+        self._stats_guard = threading.Lock()
+        self._start_guard = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._syncfs = None
+
+    def _count(self, **increments):
+        with self._stats_guard:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def _ensure_started(self):
+        with self._start_guard:
+            # После fork поток в дочернем процессе не существует - очередь и поток создаются заново
+            if self._thread is None or not self._thread.is_alive():
+                import queue  # Импорт при первом использовании ускоряет запуск программы
+                self._queue = queue.Queue(self.max_pending)
+                self._thread = threading.Thread(target=self._run, name="write-coordinator", daemon=True)
+                self._thread.start()
+                try:
+                    import ctypes
+                    self._syncfs = ctypes.CDLL(None, use_errno=True).syncfs  # Сброс одной файловой системы
+                except Exception:
+                    self._syncfs = None
+
+    def write(self, files: List[tuple]):
+        """
+        Записывает файлы [(путь, байты), ...] в составе ближайшей пачки и возвращается, когда они на диске.
+        Файлы одного вызова переименовываются на место в переданном порядке.
+        """
+        self._ensure_started()
+        request = {"files": files, "done": threading.Event(), "error": None}
+        try:
+            self._queue.put_nowait(request)
+        except Exception:  # queue.Full
+            self._count(backpressure_waits=1)
+            self._queue.put(request)
+        request["done"].wait()
+        if request["error"] is not None:
+            raise request["error"]
+
+    def _run(self):
+        import queue
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                try:
+                    batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._commit(batch)
+            except Exception as e:
+                # Любая ошибка пачки (не только OSError) возвращается ее запросам, поток продолжает работу
+                for request in batch:
+                    if request["error"] is None:
+                        request["error"] = e
+            finally:
+                for request in batch:
+                    request["done"].set()
+
+    def _barrier(self, descriptors: List[int]):
+        """Один сброс на диск для всех записанных файлов пачки."""
+        if self._syncfs is not None:
+            devices = {}
+            for descriptor in descriptors:
+                devices.setdefault(os.fstat(descriptor).st_dev, descriptor)
+            for descriptor in devices.values():
+                if self._syncfs(descriptor) != 0:
+                    raise OSError(ctypes_errno(), "syncfs")
+        elif hasattr(os, "sync"):
+            os.sync()
+        else:
+            for descriptor in descriptors:
+                os.fsync(descriptor)
+
+    def _commit(self, batch: List[dict]):
+        latest = {}  # путь -> (байты, запросы); при повторной записи файла остается последняя
+        for request in batch:
+            for path, data in request["files"]:
+                requests = latest.pop(path, (None, []))[1]
+                if requests:
+                    self._count(coalesced=1)
+                latest[path] = (data, requests + [request])
+        errors = {}
+        descriptors = []
+        try:
+            for path, (data, _) in latest.items():
+                try:
+                    descriptor = os.open(path + ".tmp", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                    descriptors.append(descriptor)
+                    view = memoryview(data)
+                    while view:
+                        view = view[os.write(descriptor, view):]
+                except OSError as e:
+                    errors[path] = e
+            try:
+                self._barrier(descriptors)
+            except OSError as e:
+                errors.update((path, e) for path in latest)
+        finally:
+            for descriptor in descriptors:
+                os.close(descriptor)
+        directories = set()
+        for path in latest:
+            if path not in errors:
+                try:
+                    os.replace(path + ".tmp", path)
+                    directories.add(os.path.dirname(os.path.abspath(path)))
+                except OSError as e:
+                    errors[path] = e
+        for directory in directories:  # Переименования тоже должны пережить сбой питания
+            try:
+                descriptor = os.open(directory, os.O_RDONLY)
+            except OSError:
+                continue  # Каталоги нельзя открыть (Windows) - сброс каталога пропускается
+            try:
+                os.fsync(descriptor)
+            except OSError:
+                pass
+            finally:
+                os.close(descriptor)
+        self._count(requests=len(batch), files=len(latest), batches=1, barriers=1)
+        with self._stats_guard:
+            self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+        for path, (_, requests) in latest.items():
+            for request in requests:
+                if path in errors and request["error"] is None:
+                    request["error"] = errors[path]
+
+
+def ctypes_errno() -> int:
+    import ctypes
+    return ctypes.get_errno()
+
+
+WRITE_COORDINATOR = WriteCoordinator()
+
+
+class ReadWriteLock:
+    """
+    Блокировка "много читателей / один писатель" для потоков одного процесса.
+    Ожидающий писатель не пропускает новых читателей вперед, чтобы записи не голодали.
+    Поток, владеющий блокировкой записи, может повторно захватывать ее и блокировку чтения.
+    Блокировка чтения повторно входима: поток, уже читающий, не ждет писателя (иначе вложенный
+    вызов читающего метода и ожидающий писатель ждали бы друг друга вечно).
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()  # depth - глубина вложенных блокировок чтения текущего потока
+
+    def acquire_read(self):
+        with self._condition:
+            if self._writer is threading.current_thread():
+                self._writer_depth += 1
+                return
+            depth = getattr(self._local, "depth", 0)
+            if depth:
+                self._local.depth = depth + 1
+                return
+            while self._writer is not None or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+            self._local.depth = 1
+
+    def release_read(self):
+        with self._condition:
+            if self._writer is threading.current_thread():
+                self._writer_depth -= 1
+                return
+            self._local.depth -= 1
+            if self._local.depth:
+                return
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        with self._condition:
+            if self._writer is threading.current_thread():
+                self._writer_depth += 1
+                return
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = threading.current_thread()
+            self._writer_depth = 1
+
+    def release_write(self):
+        with self._condition:
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._condition.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+def _synchronized(kind: str):
+    """Оборачивает метод менеджера в блокировку чтения ("read") или записи ("write") из self._rw_lock."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            lock = self._rw_lock.read_locked() if kind == "read" else self._rw_lock.write_locked()
+            with lock:
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def normalize_tag(tag: str) -> str:
+    return str(tag).strip().lstrip("#").strip().lower()
+
+
+def normalize_tags(tags) -> tuple:
+    """Кортеж тегов без повторов и пустых значений; теги можно передать строкой через пробел или запятую."""
+    if not tags:
+        return ()
+    if isinstance(tags, str):
+        tags = tags.replace(",", " ").split()
+    result = []
+    for tag in map(normalize_tag, tags):
+        if tag and tag not in result:
+            result.append(tag)
+    return tuple(result)
+
+
+TAG_QUERY_HELP = (
+    "Фильтр по тегам: #тег или tag:тег, project:проект; операторы AND, OR, NOT и скобки "
+    "(соседние условия без оператора объединяются через AND). Пример: #срочно AND (project:сайт OR NOT #личное)"
+)
+
+
+def parse_tag_query(query: str):
+    """
+    Разбирает запрос по тегам (см. TAG_QUERY_HELP) в дерево из кортежей:
+    ("tag", имя), ("project", имя), ("not", x), ("and", x, y), ("or", x, y). Ошибка - ValueError.
+    """
+    tokens = query.replace("(", " ( ").replace(")", " ) ").split()
+    position = 0
+
+    def peek():
+        return tokens[position].upper() if position < len(tokens) else None
+
+    def parse_or():
+        nonlocal position
+        node = parse_and()
+        while peek() == "OR":
+            position += 1
+            node = ("or", node, parse_and())
+        return node
+
+    def parse_and():
+        nonlocal position
+        node = parse_not()
+        while peek() not in (None, "OR", ")"):
+            if peek() == "AND":
+                position += 1
+            node = ("and", node, parse_not())
+        return node
+
+    def parse_not():
+        nonlocal position
+        if peek() == "NOT":
+            position += 1
+            return ("not", parse_not())
+        if peek() == "(":
+            position += 1
+            node = parse_or()
+            if peek() != ")":
+                raise ValueError("Не хватает закрывающей скобки.")
+            position += 1
+            return node
+        if peek() is None or peek() in ("AND", "OR", ")"):
+            raise ValueError("Ожидался тег или проект.")
+        token = tokens[position]
+        position += 1
+        if token.lower().startswith("project:"):
+            return ("project", normalize_tag(token[len("project:"):]))
+        if token.lower().startswith("tag:"):
+            return ("tag", normalize_tag(token[len("tag:"):]))
+        return ("tag", normalize_tag(token))
+
+    if not tokens:
+        raise ValueError("Пустой запрос по тегам.")
+    tree = parse_or()
+    if position != len(tokens):
+        raise ValueError(f"Лишний элемент запроса: {tokens[position]}")
+    return tree
+
+
+def match_tag_query(tree, task) -> bool:
+    """Проверка одной задачи по дереву запроса (для задач вне индекса, например из архива)."""
+    kind = tree[0]
+    if kind == "tag":
+        return tree[1] in (getattr(task, "tags", None) or ())
+    if kind == "project":
+        return getattr(task, "project", None) == tree[1]
+    if kind == "not":
+        return not match_tag_query(tree[1], task)
+    if kind == "and":
+        return match_tag_query(tree[1], task) and match_tag_query(tree[2], task)
+    return match_tag_query(tree[1], task) or match_tag_query(tree[2], task)
+
+
+class TagIndex:
+    """
+    Битовые индексы тегов и проектов для списка задач: для каждого тега - целое число, где бит i
+    установлен, если тег есть у задачи с позицией i. Запрос AND/OR/NOT вычисляется побитовыми
+    операциями над целыми числами, задачи читаются только для итоговых позиций.
+    Индекс строится за один проход, а при добавлении, удалении задачи и смене ее тегов
+    обновляется на месте (append, delete, replace) вслед за списком задач.
+    """
+
+    def __init__(self, tasks):
+        self.size = len(tasks)
+        positions = {}
+        for position, task in enumerate(tasks):
+            for key in self._keys(task):
+                positions.setdefault(key, []).append(position)
+        self.bitsets = {key: self._bitset(values) for key, values in positions.items()}
+
+    @staticmethod
+    def _keys(task):
+        for tag in task.tags:
+            yield "tag", tag
+        if task.project:
+            yield "project", task.project
+
+    def _set(self, key, bits: int):
+        if bits:
+            self.bitsets[key] = bits
+        else:
+            self.bitsets.pop(key, None)
+
+    def append(self, task):
+        for key in self._keys(task):
+            self._set(key, self.bitsets.get(key, 0) | 1 << self.size)
+        self.size += 1
+
+    def replace(self, position: int, old, new):
+        for key in self._keys(old):
+            self._set(key, self.bitsets.get(key, 0) & ~(1 << position))
+        for key in self._keys(new):
+            self._set(key, self.bitsets.get(key, 0) | 1 << position)
+
+    def delete(self, position: int):
+        """Убирает позицию position: биты следующих задач сдвигаются на одну позицию вниз."""
+        low = (1 << position) - 1
+        for key, bits in list(self.bitsets.items()):
+            self._set(key, bits & low | bits >> (position + 1) << position)
+        self.size -= 1
+
+    def _bitset(self, positions) -> int:
+        bits = bytearray((self.size + 7) // 8)
+        for position in positions:
+            bits[position >> 3] |= 1 << (position & 7)
+        return int.from_bytes(bits, "little")
+
+    def evaluate(self, tree) -> int:
+        kind = tree[0]
+        if kind in ("tag", "project"):
+            return self.bitsets.get(tree, 0)
+        if kind == "not":
+            return ((1 << self.size) - 1) ^ self.evaluate(tree[1])
+        if kind == "and":
+            return self.evaluate(tree[1]) & self.evaluate(tree[2])
+        return self.evaluate(tree[1]) | self.evaluate(tree[2])
+
+    @staticmethod
+    def positions(bits: int):
+        """Позиции установленных битов по возрастанию."""
+        data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+        for offset, byte in enumerate(data):
+            while byte:
+                low = byte & -byte
+                yield offset * 8 + low.bit_length() - 1
+                byte ^= low
+
+    def counts(self) -> dict:
+        """Число задач по каждому тегу и проекту."""
+        return {key: bin(bits).count("1") for key, bits in self.bitsets.items()}
+
+
+RECURRENCE_FREQUENCIES = {"daily": "ежедневно", "weekly": "еженедельно", "monthly": "ежемесячно"}
+
+
+def _add_months(moment: datetime, months: int) -> datetime:
+    import calendar  # Импорт при первом использовании ускоряет запуск программы
+    year, month = divmod(moment.month - 1 + months, 12)
+    year += moment.year
+    return moment.replace(year=year, month=month + 1, day=min(moment.day, calendar.monthrange(year, month + 1)[1]))
+
+
+def occurrence_at(rule: dict, number: int):
+    """
+    Срок повторения номер number (с 0) по правилу rule или None, если серия к этому
+    повторению уже закончилась (по числу повторений count или дате until).
+    Первые повторения могут быть записаны в rule["history"] (см. reschedule_recurrence),
+    остальные отсчитываются от rule["start"].
+    """
+    if number < 0 or (rule.get("count") and number >= rule["count"]):
+        return None
+    history = rule.get("history") or ()
+    if number < len(history):
+        return datetime.strptime(history[number], "%Y-%m-%d %H:%M:%S")
+    number -= len(history)
+    start = datetime.strptime(rule["start"], "%Y-%m-%d %H:%M:%S")
+    interval = rule.get("interval") or 1
+    if rule["freq"] == "monthly":
+        moment = _add_months(start, number * interval)
+    else:
+        moment = start + timedelta(days=number * interval * (7 if rule["freq"] == "weekly" else 1))
+    if rule.get("until") and moment.strftime("%Y-%m-%d %H:%M:%S") > rule["until"]:
+        return None
+    return moment
+
+
+def iter_occurrences(rule: dict, start: datetime = None, end: datetime = None):
+    """
+    Генератор (номер, срок) повторений правила rule в окне [start, end].
+    Повторения до start не перебираются: номер первого из них вычисляется сразу.
+    Без end и без count/until серия бесконечна - перебор ограничивает вызывающий код.
+    """
+    history = rule.get("history") or ()
+    for number in range(len(history)):
+        moment = occurrence_at(rule, number)
+        if moment is None or (end is not None and moment > end):
+            return
+        if start is None or moment >= start:
+            yield number, moment
+    number = 0
+    if start is not None:
+        first = datetime.strptime(rule["start"], "%Y-%m-%d %H:%M:%S")
+        interval = rule.get("interval") or 1
+        if rule["freq"] == "monthly":
+            number = max(0, ((start.year - first.year) * 12 + start.month - first.month) // interval - 1)
+        else:
+            step = timedelta(days=interval * (7 if rule["freq"] == "weekly" else 1))
+            number = max(0, (start - first) // step)
+    number += len(history)
+    while True:
+        moment = occurrence_at(rule, number)
+        if moment is None or (end is not None and moment > end):
+            return
+        if start is None or moment >= start:
+            yield number, moment
+        number += 1
+
+
+def reschedule_recurrence(rule: dict, deadline: str) -> dict:
+    """
+    Правило серии, в которой ближайшее невыполненное повторение перенесено на deadline.
+    Сроки выполненных повторений переходят в rule["history"], поэтому они остаются в отчетах,
+    а ограничение count по-прежнему считается по всей серии.
+    """
+    done = rule["done"]
+    history = list(rule.get("history") or ())
+    history.extend(occurrence_at(rule, number).strftime("%Y-%m-%d %H:%M:%S") for number in range(len(history), done))
+    return {**rule, "start": deadline, "history": history}
+
+
+class Task:
+    RECORD_FIELDS = ("title", "description", "completed", "created_at", "completed_at", "deadline", "uid")
+    # Необязательные поля записываются в файл, только если заданы: старые записи не меняются
+    OPTIONAL_FIELDS = ("recurrence", "tags", "project", "priority", "depends_on")
+    # Правило повторения: {"freq", "interval", "start", "count", "until", "done", "history"}. Хранится одно
+    # на всю серию; deadline - срок ближайшего невыполненного повторения, done - число выполненных.
+    # Словарь не изменяется на месте (задачи копируются поверхностно), а заменяется новым.
+    recurrence = None
+    tags = ()  # Теги (без "#", в нижнем регистре) и проект задачи
+    project = None
+    priority = None  # 1 - критический ... 4 - низкий, None - обычный (см. PRIORITY_LEVELS)
+    # uid задач, которые нужно выполнить раньше; связи между задачами хранит только DependencyGraph
+    depends_on = ()
+
+    def __init__(
+        self,
+        title: str,
+        description: str,
+        completed: bool = False,
+        created_at: str = None,
+        completed_at: str = None,
+        deadline: str = None,
+        uid: str = None,
+        recurrence: dict = None,
+        tags: list = None,
+        project: str = None,
+        priority: int = None,
+        depends_on: list = None
+    ):
+        try:  # SCRUM-10: Защита на случай любых ошибок при инициализации Task
+            self.title = title
+            self.description = description
+            self.completed = completed
+            self.created_at = created_at if created_at else datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.completed_at = completed_at
+            self.deadline = deadline
+            # Стабильный идентификатор задачи. Для задач из старых файлов без uid он вычисляется
+            # из даты создания, названия и описания, поэтому не меняется между загрузками.
+            if uid:
+                self.uid = uid
+            elif created_at:
+                import hashlib  # Импорт при первом использовании ускоряет запуск программы
+                source = f"{created_at}|{title}|{description}".encode("utf-8")
+                self.uid = hashlib.sha1(source).hexdigest()[:12]
+            else:
+                self.uid = new_uid()
+            # Необязательные поля записываются в задачу, только если заданы, иначе действуют значения
+            # класса: у большинства задач их нет, и словарь атрибутов задачи остается маленьким
+            if recurrence:
+                self.recurrence = recurrence
+            tags = normalize_tags(tags)
+            if tags:
+                self.tags = tags
+            if project:
+                self.project = normalize_tag(project)
+            if priority is not None:
+                self.priority = priority
+            if depends_on:
+                self.depends_on = tuple(dict.fromkeys(depends_on))
+        except Exception as e:  # SCRUM-10
+            print(f"Ошибка при инициализации Task: {e}")  #SCRUM-10
+
+    @classmethod
+    def from_record(cls, data: dict):
+        """Создает задачу из записи JSON-файла, пропуская неизвестные поля."""
+        return cls(**{key: value for key, value in data.items()
+                      if key in cls.RECORD_FIELDS or key in cls.OPTIONAL_FIELDS})
+
+    def to_record(self) -> dict:
+        """Запись задачи для сохранения в JSON-файл."""
+        record = {field: getattr(self, field) for field in self.RECORD_FIELDS}
+        for field in self.OPTIONAL_FIELDS:
+            value = getattr(self, field, None)
+            if value:
+                record[field] = list(value) if isinstance(value, tuple) else value
+        return record
+
+    def copy(self):
+        """Копия задачи. TaskManager изменяет только копии, поэтому снимки истории остаются неизменными."""
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        return clone
+
+    def mark_completed(self):
+        try:  # SCRUM-10: При отметке задачи как выполненной могут возникнуть непредвиденные ситуации
+            self.completed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            if self.recurrence:
+                # Выполнено текущее повторение: срок переходит на следующее, серия закрывается после последнего
+                done = self.recurrence["done"] + 1
+                self.recurrence = {**self.recurrence, "done": done}
+                following = occurrence_at(self.recurrence, done)
+                if following is not None:
+                    self.deadline = following.strftime("%Y-%m-%d %H:%M:%S")
+                    return
+            self.completed = True
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при завершении задачи: {e}")  #SCRUM-10
+
+    def mark_incomplete(self):
+        try:  # SCRUM-10
+            if self.recurrence and self.recurrence["done"]:
+                # Для серии снимается отметка с последнего выполненного повторения
+                done = self.recurrence["done"] - 1
+                self.recurrence = {**self.recurrence, "done": done}
+                self.deadline = occurrence_at(self.recurrence, done).strftime("%Y-%m-%d %H:%M:%S")
+                self.completed = False
+                self.completed_at = None
+                return
+            self.completed = False
+            self.completed_at = None
+            self.deadline = None
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при изменении статуса задачи: {e}")  #SCRUM-10
+
+    def set_deadline(self, deadline: str):
+        if self.completed:
+            print("Задача уже выполнена. Установка срока невозможна.")
+            return False
+        try:
+            deadline_time = datetime.strptime(deadline, "%H:%M %d.%m.%Y")
+            self.deadline = deadline_time.strftime("%Y-%m-%d %H:%M:%S")
+            if self.recurrence:  # Новый срок переносит невыполненные повторения, выполненные сохраняются
+                self.recurrence = reschedule_recurrence(self.recurrence, self.deadline)
+            return True
+        except ValueError:
+            print("Некорректный формат даты. Используйте формат 'ЧЧ:ММ ДД.ММ.ГГГГ'.")
+            return False
+        except Exception as e:  # SCRUM-10
+            print(f"Ошибка при установке срока: {e}")  #SCRUM-10
+            return False
+
+    def set_recurrence(self, freq: str, interval: int = 1, count: int = None, until: str = None):
+        """
+        Делает задачу повторяющейся, начиная с текущего срока. freq - daily, weekly или monthly;
+        серия ограничивается числом повторений count или датой until (ДД.ММ.ГГГГ), либо бесконечна.
+        freq=None отменяет повторение.
+        """
+        if freq is None:
+            self.recurrence = None
+            return True
+        if freq not in RECURRENCE_FREQUENCIES:
+            print(f"Неизвестная периодичность: {freq}.")
+            return False
+        if self.completed or not self.deadline:
+            print("Для повторяющейся задачи нужен срок первого выполнения у невыполненной задачи.")
+            return False
+        try:
+            if until:
+                until = datetime.strptime(until, "%d.%m.%Y").strftime("%Y-%m-%d 23:59:59")
+        except ValueError:
+            print("Некорректный формат даты. Используйте формат 'ДД.ММ.ГГГГ'.")
+            return False
+        self.recurrence = {"freq": freq, "interval": max(1, int(interval)), "start": self.deadline,
+                           "count": count or None, "until": until or None, "done": 0}
+        return True
+
+    def occurrences(self, start: datetime = None, end: datetime = None):
+        """Генератор (срок, выполнено) повторений задачи в окне [start, end]; для обычной задачи - ее срок."""
+        if not self.recurrence:
+            if self.deadline:
+                moment = datetime.strptime(self.deadline, "%Y-%m-%d %H:%M:%S")
+                if (start is None or moment >= start) and (end is None or moment <= end):
+                    yield moment, bool(self.completed)
+            return
+        for number, moment in iter_occurrences(self.recurrence, start, end):
+            yield moment, number < self.recurrence["done"]
+
+    def remaining_time(self):
+        try:  # SCRUM-10: Возможны ошибки при вычислениях, особенно если дата испорчена
+            if not self.deadline:
+                return "[ ]"
+            if self.completed:
+                return "[ ]"
+            deadline_time = datetime.strptime(self.deadline, "%Y-%m-%d %H:%M:%S")
+            return format_remaining_time(deadline_time, datetime.now())
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при расчете оставшегося времени: {e}")  #SCRUM-10
+            return "[Ошибка]"
+
+    def to_dict(self, index: int):
+        try:  # SCRUM-10: Подстраховка при формировании данных для отчёта/отображения
+            return {
+                "#": index,
+                "Статус": "[X]" if self.completed else "[ ]",
+                "Время": self.remaining_time(),
+                "Название задачи": self.title,
+                "Описание задачи": self.description,
+                "Создано": self.created_at,
+                "Завершено": self.completed_at if self.completed else ""
+            }
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при преобразовании задачи в словарь: {e}")  #SCRUM-10
+            return {}
+
+class StringPool:
+    """
+    Пул строк: одинаковые названия и описания задач хранятся в одном экземпляре.
+    Пулом пользуются, захватив его (acquire/release или with); когда его отпускает последний
+    пользователь, пул очищается, поэтому не растет в течение всей работы процесса.
+    """
+
+    def __init__(self):
+        self._strings = {}
+        self.requests = 0
+        self._users = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._strings)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+    def acquire(self):
+        with self._lock:
+            self._users += 1
+
+    def release(self):
+        with self._lock:
+            self._users -= 1
+            if not self._users:
+                self._strings.clear()
+
+    def intern(self, value):
+        if not isinstance(value, str):
+            return value
+        self.requests += 1
+        return self._strings.setdefault(value, value)
+
+
+# Общий пул всех загруженных TaskManager(compact=True) и общего отчета: каждый из них захватывает пул на время своей жизни
+SHARED_STRING_POOL = StringPool()
+
+
+def pack_timestamp(value):
+    """Упаковывает "ГГГГ-ММ-ДД ЧЧ:ММ:СС" в целое ГГГГММДДЧЧММСС; прочие значения возвращаются как есть."""
+    if isinstance(value, str) and len(value) == 19 and value[4] == "-" and value[10] == " ":
+        digits = value[0:4] + value[5:7] + value[8:10] + value[11:13] + value[14:16] + value[17:19]
+        if digits.isdigit():
+            return int(digits)
+    return value
+
+
+def unpack_timestamp(value):
+    if not isinstance(value, int) or isinstance(value, bool):
+        return value
+    date, clock = divmod(value, 1000000)
+    return f"{date // 10000:04}-{date // 100 % 100:02}-{date % 100:02} {clock // 10000:02}:{clock // 100 % 100:02}:{clock % 100:02}"
+
+
+def _packed_timestamp(name: str):
+    attribute = "_" + name
+
+    def getter(self):
+        return unpack_timestamp(self.__dict__[attribute])
+
+    def setter(self, value):
+        self.__dict__[attribute] = pack_timestamp(value)
+
+    return property(getter, setter)
+
+
+def _pooled_string(name: str):
+    attribute = "_" + name
+
+    def getter(self):
+        return self.__dict__[attribute]
+
+    def setter(self, value):
+        self.__dict__[attribute] = SHARED_STRING_POOL.intern(value)
+
+    return property(getter, setter)
+
+
+class CompactTask(Task):
+    """
+    Задача с экономией памяти: название и описание берутся из SHARED_STRING_POOL,
+    даты хранятся целыми числами ГГГГММДДЧЧММСС. Снаружи поля выглядят так же, как у Task.
+    """
+
+    title = _pooled_string("title")
+    description = _pooled_string("description")
+    created_at = _packed_timestamp("created_at")
+    completed_at = _packed_timestamp("completed_at")
+    deadline = _packed_timestamp("deadline")
+
+
+class _Node:
+    __slots__ = ("left", "value", "right", "size", "height")
+
+    def __init__(self, left, value, right):
+        self.left = left
+        self.value = value
+        self.right = right
+        self.size = (left.size if left else 0) + (right.size if right else 0) + 1
+        self.height = max(left.height if left else 0, right.height if right else 0) + 1
+
+
+def _height(node):
+    return node.height if node else 0
+
+
+def _size(node):
+    return node.size if node else 0
+
+
+def _balanced_node(left, value, right):
+    if _height(left) > _height(right) + 1:
+        if _height(left.left) >= _height(left.right):
+            return _Node(left.left, left.value, _Node(left.right, value, right))
+        middle = left.right
+        return _Node(_Node(left.left, left.value, middle.left), middle.value, _Node(middle.right, value, right))
+    if _height(right) > _height(left) + 1:
+        if _height(right.right) >= _height(right.left):
+            return _Node(_Node(left, value, right.left), right.value, right.right)
+        middle = right.left
+        return _Node(_Node(left, value, middle.left), middle.value, _Node(middle.right, right.value, right.right))
+    return _Node(left, value, right)
+
+
+class PersistentTaskList:
+    """
+    Неизменяемый список задач на AVL-дереве с размерами поддеревьев.
+    Изменение (set/insert/append/delete) возвращает новый список за O(log n): копируется только
+    путь от корня до измененного элемента, остальные узлы общие со старой версией.
+    Поэтому хранение снимка после каждого изменения стоит O(log n) памяти.
+    """
+
+    __slots__ = ("_root",)
+
+    def __init__(self, items=()):
+        items = list(items)
+
+        def build(low, high):
+            if low >= high:
+                return None
+            middle = (low + high) // 2
+            return _Node(build(low, middle), items[middle], build(middle + 1, high))
+
+        self._root = build(0, len(items))
+
+    @classmethod
+    def _from_root(cls, root):
+        result = cls.__new__(cls)
+        result._root = root
+        return result
+
+    def __len__(self):
+        return _size(self._root)
+
+    def __bool__(self):
+        return self._root is not None
+
+    def __iter__(self):
+        stack = []
+        node = self._root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.value
+            node = node.right
+
+    def _index(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("list index out of range")
+        return index
+
+    def __getitem__(self, index: int):
+        index = self._index(index)
+        node = self._root
+        while True:
+            left_size = _size(node.left)
+            if index < left_size:
+                node = node.left
+            elif index > left_size:
+                index -= left_size + 1
+                node = node.right
+            else:
+                return node.value
+
+    def set(self, index: int, value):
+        def replace(node, index):
+            left_size = _size(node.left)
+            if index < left_size:
+                return _Node(replace(node.left, index), node.value, node.right)
+            if index > left_size:
+                return _Node(node.left, node.value, replace(node.right, index - left_size - 1))
+            return _Node(node.left, value, node.right)
+
+        return self._from_root(replace(self._root, self._index(index)))
+
+    def insert(self, index: int, value):
+        def insert(node, index):
+            if node is None:
+                return _Node(None, value, None)
+            left_size = _size(node.left)
+            if index <= left_size:
+                return _balanced_node(insert(node.left, index), node.value, node.right)
+            return _balanced_node(node.left, node.value, insert(node.right, index - left_size - 1))
+
+        return self._from_root(insert(self._root, max(0, min(index, len(self)))))
+
+    def append(self, value):
+        return self.insert(len(self), value)
+
+    def delete(self, index: int):
+        def delete(node, index):
+            left_size = _size(node.left)
+            if index < left_size:
+                return _balanced_node(delete(node.left, index), node.value, node.right)
+            if index > left_size:
+                return _balanced_node(node.left, node.value, delete(node.right, index - left_size - 1))
+            if node.left is None:
+                return node.right
+            if node.right is None:
+                return node.left
+            successor = node.right
+            while successor.left:
+                successor = successor.left
+            return _balanced_node(node.left, successor.value, delete(node.right, 0))
+
+        return self._from_root(delete(self._root, self._index(index)))
+
+
+class TaskHistory:
+    """
+    История состояний списка задач для отмены/повтора и просмотра на момент времени.
+    Хранит не более depth + 1 снимков PersistentTaskList (общие узлы не дублируются).
+    """
+
+    def __init__(self, depth: int = 50):
+        self.depth = depth
+        self._states = deque()  # (время, описание действия, PersistentTaskList)
+        self._position = -1
+
+    def reset(self, tasks: PersistentTaskList, label: str):
+        self._states.clear()
+        self._states.append((datetime.now(), label, tasks))
+        self._position = 0
+
+    def record(self, tasks: PersistentTaskList, label: str):
+        while len(self._states) > self._position + 1:
+            self._states.pop()  # Новое действие отменяет возможность повтора
+        self._states.append((datetime.now(), label, tasks))
+        while len(self._states) > self.depth + 1:
+            self._states.popleft()
+        self._position = len(self._states) - 1
+
+    def undo(self):
+        """Возвращает (описание отмененного действия, состояние до него) или None."""
+        if self._position <= 0:
+            return None
+        label = self._states[self._position][1]
+        self._position -= 1
+        return label, self._states[self._position][2]
+
+    def redo(self):
+        """Возвращает (описание повторенного действия, состояние после него) или None."""
+        if self._position >= len(self._states) - 1:
+            return None
+        self._position += 1
+        _, label, tasks = self._states[self._position]
+        return label, tasks
+
+    def as_of(self, moment: datetime):
+        """Состояние списка задач на момент moment или None, если он раньше начала истории."""
+        result = None
+        for index, (recorded_at, _, tasks) in enumerate(self._states):
+            if recorded_at > moment or index > self._position:
+                break
+            result = tasks
+        return result
+
+
+class IndexedHeap:
+    """
+    Двоичная куча с индексом позиций: элементы (ключ, id) с уникальными id.
+    Вставка, удаление и изменение ключа по id - O(log n), минимум - O(1),
+    n наименьших по порядку - O(n log n) без изменения кучи (smallest).
+    """
+
+    def __init__(self, items=()):
+        self._heap = [(key, item_id) for key, item_id in items]
+        heapq.heapify(self._heap)
+        self._positions = {item_id: position for position, (_, item_id) in enumerate(self._heap)}
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, item_id):
+        return item_id in self._positions
+
+    def _place(self, position: int, entry):
+        self._heap[position] = entry
+        self._positions[entry[1]] = position
+
+    def _sift_up(self, position: int):
+        entry = self._heap[position]
+        while position:
+            parent = (position - 1) >> 1
+            if not entry < self._heap[parent]:
+                break
+            self._place(position, self._heap[parent])
+            position = parent
+        self._place(position, entry)
+
+    def _sift_down(self, position: int):
+        entry = self._heap[position]
+        size = len(self._heap)
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and self._heap[child + 1] < self._heap[child]:
+                child += 1
+            if not self._heap[child] < entry:
+                break
+            self._place(position, self._heap[child])
+            position = child
+        self._place(position, entry)
+
+    def push(self, key, item_id):
+        """Добавляет элемент или меняет ключ уже имеющегося."""
+        if item_id in self._positions:
+            self.remove(item_id)
+        self._heap.append((key, item_id))
+        self._sift_up(len(self._heap) - 1)
+
+    def remove(self, item_id) -> bool:
+        position = self._positions.pop(item_id, None)
+        if position is None:
+            return False
+        last = self._heap.pop()
+        if position < len(self._heap):
+            self._place(position, last)
+            self._sift_up(position)
+            self._sift_down(self._positions[last[1]])
+        return True
+
+    def peek(self):
+        return self._heap[0] if self._heap else None
+
+    def smallest(self, count: int):
+        """Генератор count наименьших элементов по возрастанию: обход кучи со вспомогательной кучей позиций."""
+        frontier = [(self._heap[0], 0)] if self._heap else []
+        while frontier and count > 0:
+            entry, position = heapq.heappop(frontier)
+            yield entry
+            count -= 1
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(self._heap):
+                    heapq.heappush(frontier, (self._heap[child], child))
+
+
+PRIORITY_LEVELS = {1: "критический", 2: "высокий", 3: "обычный", 4: "низкий"}
+DEFAULT_PRIORITY = 3
+
+
+def priority_key(task) -> tuple:
+    """Порядок "что делать сейчас": приоритет, затем ближайший срок, затем давность создания."""
+    return (task.priority or DEFAULT_PRIORITY, task.deadline or "9999-12-31 23:59:59", str(task.created_at or ""))
+
+
+class DependencyGraph:
+    """
+    Граф зависимостей задач по uid: ребро prerequisite -> dependent означает "dependent после prerequisite".
+    Поддерживает топологический порядок (алгоритм Пирса - Келли: при добавлении ребра, нарушающего порядок,
+    просматриваются и переставляются только задачи между его концами; там же обнаруживается цикл),
+    счетчики невыполненных предварительных задач и множества готовых и заблокированных открытых задач.
+    Неизвестные uid (архивные или удаленные задачи) считаются выполненными.
+    """
+
+    def __init__(self, tasks=()):
+        self.tasks = {}  # uid -> задача
+        self.ready = set()  # Открытые задачи, все предварительные задачи которых выполнены
+        self.blocked = set()  # Открытые задачи с невыполненными предварительными задачами
+        self._prerequisites = {}
+        self._dependents = {}
+        self._pending = {}  # uid -> число невыполненных предварительных задач
+        self._order = {}
+        self._next_order = 0
+        self._unresolved = {}  # uid, которого нет в графе -> задачи, ссылающиеся на него
+        tasks = list(tasks)
+        for task in tasks:
+            self.tasks[task.uid] = task
+            self._prerequisites[task.uid] = set()
+            self._dependents[task.uid] = set()
+            self._pending[task.uid] = 0
+        edges = []
+        for task in tasks:
+            for prerequisite in task.depends_on:
+                if prerequisite not in self.tasks:
+                    self._unresolved.setdefault(prerequisite, set()).add(task.uid)
+                elif prerequisite != task.uid:
+                    edges.append((prerequisite, task.uid))
+        # Начальный порядок - алгоритмом Кана; задачи из циклов (ручная правка файла, слияние) идут в конец,
+        # а замыкающие цикл ребра отбрасываются при добавлении
+        incoming = {uid: 0 for uid in self.tasks}
+        following = {uid: [] for uid in self.tasks}
+        for prerequisite, dependent in edges:
+            incoming[dependent] += 1
+            following[prerequisite].append(dependent)
+        queue = deque(uid for uid, count in incoming.items() if not count)
+        while queue:
+            uid = queue.popleft()
+            self._assign_order(uid)
+            for dependent in following[uid]:
+                incoming[dependent] -= 1
+                if not incoming[dependent]:
+                    queue.append(dependent)
+        for uid in self.tasks:
+            if uid not in self._order:
+                self._assign_order(uid)
+        for uid in self.tasks:
+            self._classify(uid)
+        for prerequisite, dependent in edges:
+            self.add_edge(prerequisite, dependent)
+
+    def __contains__(self, uid):
+        return uid in self.tasks
+
+    def _assign_order(self, uid):
+        self._order[uid] = self._next_order
+        self._next_order += 1
+
+    def _classify(self, uid):
+        self.ready.discard(uid)
+        self.blocked.discard(uid)
+        if not self.tasks[uid].completed:
+            (self.blocked if self._pending[uid] else self.ready).add(uid)
+
+    def _is_open(self, uid) -> bool:
+        return uid in self.tasks and not self.tasks[uid].completed
+
+    def _search(self, start, neighbours, inside, target=None):
+        """Обход в глубину от start по соседям, удовлетворяющим inside; возвращает (посещенные, путь к target)."""
+        visited = {start: None}
+        stack = [start]
+        while stack:
+            uid = stack.pop()
+            for neighbour in neighbours[uid]:
+                if neighbour in visited or not inside(neighbour):
+                    continue
+                visited[neighbour] = uid
+                if neighbour == target:
+                    path = [neighbour]
+                    while visited[path[-1]] is not None:
+                        path.append(visited[path[-1]])
+                    return visited, path[::-1]
+                stack.append(neighbour)
+        return visited, None
+
+    def add_edge(self, prerequisite, dependent):
+        """Добавляет зависимость. Если она замкнет цикл, граф не меняется и возвращается цикл (список uid)."""
+        if prerequisite == dependent:
+            return [dependent, prerequisite]
+        if dependent not in self.tasks or prerequisite in self._prerequisites[dependent]:
+            return None
+        if prerequisite not in self.tasks:
+            self._unresolved.setdefault(prerequisite, set()).add(dependent)
+            return None
+        lower, upper = self._order[dependent], self._order[prerequisite]
+        if lower < upper:
+            # Порядок нарушен: переставляются только задачи с номерами в [lower, upper]
+            forward, cycle = self._search(dependent, self._dependents,
+                                          lambda uid: self._order[uid] <= upper, target=prerequisite)
+            if cycle:
+                return cycle + [dependent]
+            backward, _ = self._search(prerequisite, self._prerequisites, lambda uid: self._order[uid] >= lower)
+            moved = sorted(backward, key=self._order.get) + sorted(forward, key=self._order.get)
+            for uid, order in zip(moved, sorted(self._order[uid] for uid in moved)):
+                self._order[uid] = order
+        self._prerequisites[dependent].add(prerequisite)
+        self._dependents[prerequisite].add(dependent)
+        if self._is_open(prerequisite):
+            self._pending[dependent] += 1
+            self._classify(dependent)
+        return None
+
+    def remove_edge(self, prerequisite, dependent):
+        if prerequisite not in self._prerequisites.get(dependent, ()):
+            return
+        self._prerequisites[dependent].discard(prerequisite)
+        self._dependents[prerequisite].discard(dependent)
+        if self._is_open(prerequisite):
+            self._pending[dependent] -= 1
+            self._classify(dependent)
+
+    def _set_completed(self, uid, completed: bool):
+        """Меняет статус задачи; пересчитываются только ее зависимые задачи."""
+        step = -1 if completed else 1
+        for dependent in self._dependents[uid]:
+            self._pending[dependent] += step
+            self._classify(dependent)
+
+    def update(self, old, new):
+        """Применяет изменение одной задачи: old/new - прежняя и новая версии (None при добавлении/удалении)."""
+        if old is not None and (new is None or new.uid != old.uid):
+            uid = old.uid
+            for dependent in list(self._dependents.get(uid, ())):
+                self.remove_edge(uid, dependent)
+            for prerequisite in list(self._prerequisites.get(uid, ())):
+                self.remove_edge(prerequisite, uid)
+            for mapping in (self.tasks, self._prerequisites, self._dependents, self._pending, self._order):
+                mapping.pop(uid, None)
+            self.ready.discard(uid)
+            self.blocked.discard(uid)
+            old = None
+        if new is None:
+            return
+        uid = new.uid
+        if old is None:
+            self.tasks[uid] = new
+            self._prerequisites[uid] = set()
+            self._dependents[uid] = set()
+            self._pending[uid] = 0
+            self._assign_order(uid)
+            self._classify(uid)
+            # Задачи, уже ссылающиеся на новую (например, после повтора отмененного удаления)
+            for dependent in self._unresolved.pop(uid, ()):
+                if dependent in self.tasks and uid in self.tasks[dependent].depends_on:
+                    self.add_edge(uid, dependent)
+        else:
+            was_completed = self.tasks[uid].completed
+            self.tasks[uid] = new
+            if bool(was_completed) != bool(new.completed):
+                self._set_completed(uid, bool(new.completed))
+            self._classify(uid)
+        wanted = set(new.depends_on)
+        for prerequisite in self._prerequisites[uid] - wanted:
+            self.remove_edge(prerequisite, uid)
+        for prerequisite in new.depends_on:
+            self.add_edge(prerequisite, uid)
+
+    def dependents(self, uid) -> set:
+        return set(self._dependents.get(uid, ()))
+
+    def open_prerequisites(self, uid) -> list:
+        return [self.tasks[prerequisite] for prerequisite in self._prerequisites.get(uid, ())
+                if self._is_open(prerequisite)]
+
+    def ready_tasks(self) -> list:
+        return [self.tasks[uid] for uid in self.ready]
+
+    def blocked_tasks(self) -> list:
+        """Список (задача, невыполненные предварительные задачи)."""
+        return [(self.tasks[uid], self.open_prerequisites(uid)) for uid in self.blocked]
+
+
+class TaskTableRenderer:
+    """
+    Отрисовка таблицы задач в стиле tabulate "grid" с кэшированием.
+    Для каждой задачи кэшируются значения ячеек и готовая строка таблицы, для колонок - счетчики
+    длин значений, поэтому после изменения одной задачи пересчитывается только ее строка.
+    Как и tabulate, ячейки выводятся без начальных и конечных пробелов. В отличие от tabulate, все
+    ячейки, кроме "#", выравниваются влево (числа в названиях не разбираются), а переводы строк
+    в названии и описании заменяются пробелами - каждая задача занимает одну строку таблицы.
+    Колонка "Время" обновляется раз в секунду и только для задач, у которых срок еще не истек.
+    Задачи, изменяемые на месте, нужно передавать в invalidate().
+    """
+
+    HEADERS = ("#", "Статус", "Время", "Название задачи", "Описание задачи", "Создано", "Завершено")
+    TIME_COLUMN = 1  # Индекс колонки "Время" среди кэшируемых ячеек (без "#")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cells = {}  # задача -> список ячеек без "#"
+        self._lines = {}  # задача -> строка таблицы без ячейки "#" для текущих ширин колонок
+        self._deadlines = {}  # задача с неистекшим сроком -> срок (datetime)
+        self._lengths = [Counter() for _ in self.HEADERS[1:]]
+        self._widths = None
+        self._clock = None
+
+    def invalidate(self, task=None):
+        """Сбрасывает кэш задачи (или весь кэш, если task не указан)."""
+        with self._lock:
+            if task is None:
+                self._cells.clear()
+                self._lines.clear()
+                self._deadlines.clear()
+                self._lengths = [Counter() for _ in self.HEADERS[1:]]
+                self._widths = None
+            else:
+                self._forget(task)
+
+    def _forget(self, task):
+        cells = self._cells.pop(task, None)
+        if cells is not None:
+            for counter, value in zip(self._lengths, cells):
+                counter[len(value)] -= 1
+                if not counter[len(value)]:
+                    del counter[len(value)]
+        self._lines.pop(task, None)
+        self._deadlines.pop(task, None)
+
+    def _set_cell(self, task, column: int, value: str):
+        cells = self._cells[task]
+        counter = self._lengths[column]
+        counter[len(cells[column])] -= 1
+        if not counter[len(cells[column])]:
+            del counter[len(cells[column])]
+        counter[len(value)] += 1
+        cells[column] = value
+        self._lines.pop(task, None)
+
+    @staticmethod
+    def _text(value) -> str:
+        return " ".join(str(value).strip().splitlines())
+
+    def _add(self, task, now: datetime):
+        time_cell = task.remaining_time()
+        cells = [
+            "[X]" if task.completed else "[ ]",
+            time_cell,
+            self._text(task.title),
+            self._text(task.description),
+            str(task.created_at),
+            str(task.completed_at or "") if task.completed else "",
+        ]
+        self._cells[task] = cells
+        for counter, value in zip(self._lengths, cells):
+            counter[len(value)] += 1
+        if task.deadline and not task.completed and time_cell != "[Срок истек]":
+            try:
+                self._deadlines[task] = datetime.strptime(task.deadline, "%Y-%m-%d %H:%M:%S")
+            except ValueError:
+                pass
+
+    def _tick(self, now: datetime):
+        clock = int(now.timestamp())
+        if clock == self._clock:
+            return
+        self._clock = clock
+        for task, deadline_time in list(self._deadlines.items()):
+            value = format_remaining_time(deadline_time, now)
+            if value != self._cells[task][self.TIME_COLUMN]:
+                self._set_cell(task, self.TIME_COLUMN, value)
+            if value == "[Срок истек]":
+                del self._deadlines[task]
+
+    def render(self, tasks) -> str:
+        with self._lock:
+            now = datetime.now()
+            if len(self._cells) > len(tasks):
+                current = set(tasks)
+                for task in [task for task in self._cells if task not in current]:
+                    self._forget(task)
+            for task in tasks:
+                if task not in self._cells:
+                    self._add(task, now)
+            self._tick(now)
+
+            widths = tuple(max(len(header) + 2, max(counter, default=0))
+                           for header, counter in zip(self.HEADERS[1:], self._lengths))
+            if widths != self._widths:
+                self._widths = widths
+                self._lines.clear()
+            number_width = max(len(self.HEADERS[0]) + 2, len(str(len(tasks))))
+
+            separator = "+" + "+".join("-" * (width + 2) for width in (number_width,) + widths) + "+"
+            header_separator = separator.replace("-", "=")
+            header = "| " + self.HEADERS[0].rjust(number_width) + " | " + " | ".join(
+                title.ljust(width) for title, width in zip(self.HEADERS[1:], widths)) + " |"
+            output = [separator, header, header_separator]
+            for number, task in enumerate(tasks, start=1):
+                line = self._lines.get(task)
+                if line is None:
+                    line = " | ".join(value.ljust(width) for value, width in zip(self._cells[task], widths)) + " |"
+                    self._lines[task] = line
+                output.append(f"| {number:>{number_width}} | {line}")
+                output.append(separator)
+            return "\n".join(output)
+
+
+REPORT_FORMATS = ("txt", "csv", "jsonl", "html")
+REPORT_BUFFER_SIZE = 1 << 20  # Отчеты пишутся блоками по 1 МБ
+
+
+def parse_report_format(value: str):
+    """Разбирает формат отчета вида "csv" или "csv.gz". Возвращает (формат, сжатие gzip)."""
+    value = (value or "txt").strip().lower()
+    compress = value.endswith(".gz")
+    fmt = value[:-3] if compress else value
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Неизвестный формат отчета: {value}")
+    return fmt, compress
+
+
+def completed_report_rows(tasks):
+    """Строки отчета по выполненным задачам с нумерацией от 1, формируются по одной."""
+    number = 0
+    for task in tasks:
+        recurrence = getattr(task, "recurrence", None)
+        if recurrence:
+            # Выполненные повторения серии разворачиваются по одному; время выполнения хранится
+            # только для последнего, для остальных указывается срок повторения
+            for occurrence in range(recurrence["done"]):
+                moment = occurrence_at(recurrence, occurrence)
+                number += 1
+                yield {
+                    "#": number,
+                    "Название задачи": f"{task.title} ({moment:%d.%m.%Y})",
+                    "Описание задачи": task.description,
+                    "Создано": task.created_at,
+                    "Завершено": task.completed_at if occurrence == recurrence["done"] - 1
+                    else moment.strftime("%Y-%m-%d %H:%M:%S"),
+                }
+        elif task.completed:
+            number += 1
+            yield {
+                "#": number,
+                "Название задачи": task.title,
+                "Описание задачи": task.description,
+                "Создано": task.created_at,
+                "Завершено": task.completed_at,
+            }
+
+
+class ReportWriter:
+    """
+    Потоковая запись отчета по секциям (одна секция - один пользователь).
+    Наследники пишут строки по мере поступления; файл открывается с буфером REPORT_BUFFER_SIZE
+    и при compress=True сжимается gzip. owner - пользователь для отчета одного пользователя
+    (в машиночитаемых форматах попадает в колонку "Пользователь").
+    """
+
+    extension = "txt"
+
+    def __init__(self, base_filename: str, compress: bool = False, owner: str = None):
+        self.owner = owner
+        self.filename = f"{base_filename}.{self.extension}" + (".gz" if compress else "")
+        if compress:
+            import gzip
+            import io
+            self.file = io.TextIOWrapper(
+                io.BufferedWriter(gzip.open(self.filename, 'wb', compresslevel=6), REPORT_BUFFER_SIZE),
+                encoding='utf-8', newline='')
+        else:
+            self.file = open(self.filename, 'w', encoding='utf-8', newline='', buffering=REPORT_BUFFER_SIZE)
+        self.begin()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.end()
+        finally:
+            self.file.close()
+        return False
+
+    def begin(self):
+        pass
+
+    def end(self):
+        pass
+
+    def write_section(self, rows, user_name: str = None) -> int:
+        """Пишет строки отчета; user_name=None - отчет одного пользователя без заголовка. Возвращает число строк."""
+        raise NotImplementedError
+
+
+class TextReportWriter(ReportWriter):
+    """Текстовый отчет в виде таблицы tabulate (прежний формат report.txt)."""
+
+    def write_section(self, rows, user_name: str = None) -> int:
+        rows = list(rows)
+        if user_name is None:
+            self.file.write(tabulate(rows, headers="keys", tablefmt="grid"))
+        elif rows:
+            self.file.write(f"Отчет для пользователя: {user_name}\n")
+            self.file.write(tabulate(rows, headers="keys", tablefmt="grid"))
+            self.file.write("\n\n")
+        else:
+            self.file.write(f"Нет выполненных задач для пользователя {user_name}\n\n")
+        return len(rows)
+
+
+class CsvReportWriter(ReportWriter):
+    extension = "csv"
+    COLUMNS = ("Пользователь", "#", "Название задачи", "Описание задачи", "Создано", "Завершено")
+
+    def begin(self):
+        import csv
+        self._writer = csv.writer(self.file)
+        self._writer.writerow(self.COLUMNS)
+
+    def write_section(self, rows, user_name: str = None) -> int:
+        count = 0
+        for row in rows:
+            self._writer.writerow((user_name or self.owner or "", *row.values()))
+            count += 1
+        return count
+
+
+class JsonlReportWriter(ReportWriter):
+    extension = "jsonl"
+
+    def write_section(self, rows, user_name: str = None) -> int:
+        count = 0
+        for row in rows:
+            row = {"Пользователь": user_name or self.owner, **row}
+            self.file.write(json.dumps(row, ensure_ascii=False))
+            self.file.write("\n")
+            count += 1
+        return count
+
+
+class HtmlReportWriter(ReportWriter):
+    extension = "html"
+    COLUMNS = ("#", "Название задачи", "Описание задачи", "Создано", "Завершено")
+
+    def begin(self):
+        self.file.write('<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Отчет о выполненных задачах</title>'
+                        '</head><body>\n')
+
+    def end(self):
+        self.file.write("</body></html>\n")
+
+    def write_section(self, rows, user_name: str = None) -> int:
+        from html import escape
+        if user_name is not None:
+            self.file.write(f"<h2>Отчет для пользователя: {escape(user_name)}</h2>\n")
+        self.file.write("<table border=\"1\">\n<tr>")
+        self.file.write("".join(f"<th>{escape(column)}</th>" for column in self.COLUMNS))
+        self.file.write("</tr>\n")
+        count = 0
+        for row in rows:
+            self.file.write("<tr>" + "".join(f"<td>{escape(str(value or ''))}</td>" for value in row.values()) + "</tr>\n")
+            count += 1
+        self.file.write("</table>\n")
+        return count
+
+
+REPORT_WRITERS = {
+    "txt": TextReportWriter,
+    "csv": CsvReportWriter,
+    "jsonl": JsonlReportWriter,
+    "html": HtmlReportWriter,
+}
+
+
+def _in_range(value: str, low: str = None, high: str = None) -> bool:
+    """Проверка даты-строки на попадание в диапазон; high может быть префиксом ("2024-12" - весь декабрь)."""
+    return (low is None or value >= low) and (high is None or value[:len(high)] <= high)
+
+
+class PartitionedTaskStore:
+    """
+    Хранение задач пользователя по месяцам создания: каталог "<пользователь>_tasks" с файлами
+    "ГГГГ-ММ.json" и оглавлением manifest.json, где для каждого месяца записаны число задач,
+    число открытых задач и самый поздний срок открытой задачи. Загрузка, планировщик сроков и отчеты за период
+    читают только месяцы, подходящие под запрос.
+    """
+
+    def __init__(self, user_name: str, directory: str = "."):
+        self.path = os.path.join(directory, f"{user_name.replace(' ', '_')}_tasks")
+        self.manifest_path = os.path.join(self.path, "manifest.json")
+
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    @staticmethod
+    def partition_of(record: dict) -> str:
+        created_at = str(record.get("created_at") or "")
+        return created_at[:7] if len(created_at) >= 7 and created_at[4] == "-" else "unknown"
+
+    def manifest(self) -> dict:
+        if not self.exists():
+            return {}
+        with open(self.manifest_path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def select(self, created_from: str = None, created_to: str = None, open_only: bool = False,
+               deadlines_after: str = None, include_open: bool = False) -> List[str]:
+        """
+        Месяцы, которые нужно прочитать: пересекающиеся с [created_from, created_to],
+        только с открытыми задачами (open_only), только с открытыми задачами со сроком
+        позже deadlines_after ("ГГГГ-ММ-ДД ЧЧ:ММ:СС", по самому позднему сроку из оглавления).
+        include_open=True добавляет все месяцы с открытыми задачами независимо от периода.
+        """
+        selected = []
+        for month, entry in sorted(self.manifest().items()):
+            if open_only and not entry["open"]:
+                continue
+            # В оглавлениях прежних версий этого срока нет - такие месяцы читаются
+            if deadlines_after is not None and "max_open_deadline" in entry and \
+                    not (entry["max_open_deadline"] and entry["max_open_deadline"] > deadlines_after):
+                continue
+            in_period = (created_from is None or month >= created_from[:7]) and \
+                        (created_to is None or month <= created_to[:7])
+            if in_period or (include_open and entry["open"]):
+                selected.append(month)
+        return selected
+
+    def read(self, months) -> List[dict]:
+        """Записи месяцев months; поврежденные файлы месяцев (путь -> число потерянных записей) - в self.damaged."""
+        records = []
+        self.damaged = {}
+        for month in sorted(months):
+            path = os.path.join(self.path, f"{month}.json")
+            try:
+                found, damaged, _, intact = read_records_file(path)
+            except FileNotFoundError:
+                continue
+            records.extend(found)
+            if damaged or not intact:
+                self.damaged[path] = damaged
+        return records
+
+    def write(self, records: List[dict], months, writer: WriteCoordinator = None):
+        """
+        Перезаписывает месяцы months (и месяцы, в которые попадают records) содержимым records.
+        Ставший пустым месяц удаляется. Остальные месяцы не затрагиваются. Файлы месяцев и оглавление
+        записываются одной групповой записью writer (по умолчанию WRITE_COORDINATOR), оглавление - последним.
+        Вызывается под блокировкой FileLock(manifest_path).
+        """
+        os.makedirs(self.path, exist_ok=True)
+        files = []
+        groups = {month: [] for month in months}
+        for record in records:
+            groups.setdefault(self.partition_of(record), []).append(record)
+        manifest = self.manifest()
+        for month, group in groups.items():
+            partition_path = os.path.join(self.path, f"{month}.json")
+            if not group:
+                if os.path.exists(partition_path):
+                    os.remove(partition_path)
+                manifest.pop(month, None)
+                continue
+            files.append((partition_path, dump_task_records(group)))
+            open_deadlines = [record["deadline"] for record in group
+                              if record.get("deadline") and not record.get("completed")]
+            manifest[month] = {
+                "count": len(group),
+                "open": sum(1 for record in group if not record.get("completed")),
+                "max_open_deadline": max(open_deadlines, default=None),
+            }
+        files.append((self.manifest_path,
+                      json.dumps(dict(sorted(manifest.items())), ensure_ascii=False, indent=4).encode("utf-8")))
+        (writer or WRITE_COORDINATOR).write(files)
+
+
+def read_user_records(user_name: str, created_from: str = None, created_to: str = None,
+                      open_only: bool = False, directory: str = ".", deadlines_after: str = None) -> List[dict]:
+    """
+    Записи задач пользователя (активные, без архива) из файла или по месяцам, с отбором по периоду создания.
+    directory - каталог данных (например, снимок ReportSnapshot). deadlines_after - при хранении по месяцам
+    читать только месяцы с открытыми задачами со сроком позже этого момента (остальные записи не отбрасываются).
+    """
+    store = PartitionedTaskStore(user_name, directory)
+    filename = os.path.join(directory, task_filename(user_name))
+    if store.exists():
+        with FileLock(store.manifest_path, shared=True):
+            records = store.read(store.select(created_from, created_to, open_only, deadlines_after))
+    elif os.path.exists(filename):
+        records = read_task_records(filename)
+    else:
+        return []
+    return [record for record in records
+            if _in_range(str(record.get("created_at") or ""), created_from, created_to)
+            and not (open_only and record.get("completed"))]
+
+
+def user_data_state(user_name: str):
+    """Признак изменения данных пользователя: (mtime, размер) файла задач или оглавления, и архива."""
+    store = PartitionedTaskStore(user_name)
+    path = store.manifest_path if store.exists() else task_filename(user_name)
+    try:
+        stat = os.stat(path)
+        active = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        active = None
+    return active, TaskArchive(user_name).state()
+
+
+class TaskArchive:
+    """
+    Холодное хранилище выполненных задач пользователя: каталог "<пользователь>_archive" с
+    неизменяемыми сжатыми сегментами (JSON Lines, lzma или gzip) и оглавлением index.json,
+    где для каждого сегмента записаны число задач и диапазоны дат создания и завершения.
+    Чтение идет потоково и распаковывает только сегменты, подходящие под диапазон дат.
+    """
+
+    CODECS = {"xz": "lzma", "gz": "gzip"}
+
+    def __init__(self, user_name: str, directory: str = "."):
+        self.path = os.path.join(directory, f"{user_name.replace(' ', '_')}_archive")
+        self.index_path = os.path.join(self.path, "index.json")
+
+    def segments(self, completed_from: str = None, completed_to: str = None,
+                 created_from: str = None, created_to: str = None) -> List[dict]:
+        """Сегменты, в которых могут быть задачи, завершенные (созданные) в заданном диапазоне дат."""
+        if not os.path.exists(self.index_path):
+            return []
+        with FileLock(self.index_path, shared=True):
+            with open(self.index_path, 'r', encoding='utf-8') as file:
+                segments = json.load(file)
+        return [segment for segment in segments
+                if (completed_from is None or segment["max_completed_at"] >= completed_from)
+                and (completed_to is None or segment["min_completed_at"] <= completed_to)
+                and (created_from is None or segment["max_created_at"] >= created_from)
+                and (created_to is None or segment["min_created_at"] <= created_to)]
+
+    def state(self):
+        """(mtime, размер) оглавления - признак того, что архив изменился."""
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _open(self, filename: str, mode: str, codec: str = None):
+        module = __import__(self.CODECS[codec or filename.rsplit(".", 1)[-1]])
+        return module.open(os.path.join(self.path, filename), mode, encoding='utf-8')
+
+    def iter_records(self, completed_from: str = None, completed_to: str = None,
+                     created_from: str = None, created_to: str = None):
+        for segment in self.segments(completed_from, completed_to, created_from, created_to):
+            with self._open(segment["file"], 'rt') as file:
+                for line in file:
+                    record = json.loads(line)
+                    if _in_range(record.get("completed_at") or "", completed_from, completed_to) and \
+                            _in_range(record.get("created_at") or "", created_from, created_to):
+                        yield record
+
+    def append_segment(self, records: List[dict], codec: str = "xz") -> str:
+        """Записывает новый сегмент и добавляет его в оглавление. Существующие сегменты не изменяются."""
+        os.makedirs(self.path, exist_ok=True)
+        with FileLock(self.index_path) as lock:
+            segments = []
+            if os.path.exists(self.index_path):
+                with open(self.index_path, 'r', encoding='utf-8') as file:
+                    segments = json.load(file)
+            filename = f"segment-{len(segments) + 1:06}.jsonl.{codec}"
+            with self._open(filename + ".tmp", 'wt', codec) as file:
+                for record in records:
+                    file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            os.replace(os.path.join(self.path, filename + ".tmp"), os.path.join(self.path, filename))
+            completed = [record["completed_at"] or "" for record in records]
+            created = [record["created_at"] or "" for record in records]
+            segments.append({
+                "file": filename,
+                "count": len(records),
+                "min_completed_at": min(completed),
+                "max_completed_at": max(completed),
+                "min_created_at": min(created),
+                "max_created_at": max(created),
+            })
+            temporary_path = self.index_path + ".tmp"
+            with open(temporary_path, 'w', encoding='utf-8') as file:
+                json.dump(segments, file, ensure_ascii=False, indent=4)
+            os.replace(temporary_path, self.index_path)
+            lock.write_version(lock.read_version() + 1)
+        return filename
+
+
+TASK_QUERY_HELP = (
+    "Фильтр задач: слова ищутся в названии и описании; status:open|done|overdue; "
+    "#тег, project:проект; created>ГГГГ-ММ-ДД, created<ГГГГ-ММ-ДД, deadline>ГГГГ-ММ-ДД, deadline<ГГГГ-ММ-ДД; пустой фильтр - все задачи."
+)
+
+
+def parse_task_query(query: str):
+    """
+    Превращает строку фильтра (см. TASK_QUERY_HELP) в функцию task -> bool.
+    Все условия объединяются через И. Ошибка в условии - ValueError.
+    """
+    conditions = []
+    for term in query.split():
+        if term.startswith("status:"):
+            status = term[len("status:"):]
+            if status == "open":
+                conditions.append(lambda task: not task.completed)
+            elif status == "done":
+                conditions.append(lambda task: bool(task.completed))
+            elif status == "overdue":
+                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                conditions.append(lambda task: not task.completed and bool(task.deadline) and task.deadline < now)
+            else:
+                raise ValueError(f"Неизвестный статус: {status}")
+        elif term.startswith(("#", "tag:", "project:")):
+            tree = parse_tag_query(term)
+            conditions.append(lambda task, t=tree: match_tag_query(t, task))
+        elif term.startswith(("created<", "created>", "deadline<", "deadline>")):
+            split_at = len(term.split("<", 1)[0].split(">", 1)[0])
+            field, operator, value = term[:split_at], term[split_at], term[split_at + 1:]
+            if not value:
+                raise ValueError(f"Не указана дата в условии: {term}")
+            if operator == "<":
+                conditions.append(lambda task, f=field, v=value: bool(getattr(task, f)) and getattr(task, f) < v)
+            else:
+                conditions.append(lambda task, f=field, v=value: bool(getattr(task, f)) and getattr(task, f) >= v)
+        else:
+            word = term.lower()
+            conditions.append(lambda task, w=word: w in task.title.lower() or w in task.description.lower())
+    return lambda task: all(condition(task) for condition in conditions)
+
+
+class ChangeFeed:
+    """
+    Журнал изменений задач и пользователей для внешних потребителей (BI и т.п.).
+    События получают сквозные номера seq и дописываются в сегменты "segment-<первый seq>.jsonl"
+    каталога directory; когда сегмент набирает segment_events событий, начинается новый.
+    Последний выданный номер хранится как версия блокировки каталога, поэтому номера
+    не повторяются и идут по порядку даже при записи из нескольких процессов.
+    События одной записи файла данных (см. recording) помечены общим полем batch.
+    """
+
+    def __init__(self, directory: str = "changes", segment_events: int = 10000):
+        self.path = directory
+        self.segment_events = segment_events
+        self.lock_path = os.path.join(directory, "feed")
+
+    def segments(self) -> List[tuple]:
+        """Список (первый seq, путь) сегментов по возрастанию."""
+        try:
+            names = os.listdir(self.path)
+        except FileNotFoundError:
+            return []
+        return sorted((int(name[len("segment-"):-len(".jsonl")]), os.path.join(self.path, name))
+                      for name in names if name.startswith("segment-") and name.endswith(".jsonl"))
+
+    def last_seq(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        with FileLock(self.lock_path, shared=True) as lock:
+            return lock.read_version()
+
+    def append(self, events: List[dict]) -> int:
+        """Нумерует и записывает события; возвращает номер последнего из них."""
+        if not events:
+            return 0
+        os.makedirs(self.path, exist_ok=True)
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with FileLock(self.lock_path) as lock:
+            seq = lock.read_version()
+            segments = self.segments()
+            written = 0
+            while written < len(events):
+                if not segments or seq + 1 - segments[-1][0] >= self.segment_events:
+                    segments.append((seq + 1, os.path.join(self.path, f"segment-{seq + 1:012}.jsonl")))
+                # Каждый сегмент открывается один раз на все попадающие в него события
+                part = events[written:written + segments[-1][0] + self.segment_events - seq - 1]
+                with open(segments[-1][1], 'a', encoding='utf-8') as file:
+                    file.write("".join(json.dumps({"seq": number, "time": now, **event}, ensure_ascii=False) + "\n"
+                                       for number, event in enumerate(part, start=seq + 1)))
+                seq += len(part)
+                written += len(part)
+            lock.write_version(seq)
+        return seq
+
+    @contextmanager
+    def recording(self, path: str, version: int, events: List[dict]):
+        """
+        Запись файла данных path (версии version) вместе с ее событиями; вызывается под блокировкой path.
+        Порядок на случай сбоя: события сохраняются в "<path>.events", в теле with записываются данные
+        и их версия, затем события дописываются в журнал и "<path>.events" удаляется.
+        Следы прерванной записи разбирает recover, с которого и начинается recording.
+        """
+        self.recover(path, version - 1)
+        if not events:
+            yield
+            return
+        batch = new_uid()
+        events = [{**event, "batch": batch} for event in events]
+        pending_path = path + ".events"
+        pending = {"version": version, "batch": batch, "after": self.last_seq(), "events": events}
+        write_file_durable(pending_path, json.dumps(pending, ensure_ascii=False).encode("utf-8"))
+        try:
+            yield
+        except Exception:
+            os.remove(pending_path)  # Данные не записаны - событий не было; при прерывании процесса решит recover
+            raise
+        self.append(events)
+        os.remove(pending_path)
+
+    def recover(self, path: str, version: int):
+        """
+        Разбирает "<path>.events", оставшийся от прерванной записи файла данных path текущей версии version
+        (вызывается под блокировкой path). Если данные успели записаться (версия дошла до записанной),
+        а события еще не попали в журнал (нет событий с их batch), события дописываются; иначе отбрасываются.
+        """
+        pending_path = path + ".events"
+        try:
+            with open(pending_path, 'r', encoding='utf-8') as file:
+                pending = json.load(file)
+        except FileNotFoundError:
+            return
+        if version >= pending["version"] and not any(
+                event.get("batch") == pending["batch"] for event in self.read(after=pending["after"])):
+            self.append(pending["events"])
+        os.remove(pending_path)
+
+    def recover_file(self, path: str):
+        """recover под блокировкой path - при загрузке файла данных."""
+        if os.path.exists(path + ".events"):
+            with FileLock(path) as lock:
+                self.recover(path, lock.read_version())
+
+    def read(self, after: int = 0, limit: int = None):
+        """События с seq > after по порядку. Сегменты, целиком лежащие до after, не открываются."""
+        segments = self.segments()
+        count = 0
+        for position, (first_seq, path) in enumerate(segments):
+            if position + 1 < len(segments) and segments[position + 1][0] <= after + 1:
+                continue
+            with open(path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    if not line.endswith("\n"):
+                        return  # Событие еще дописывается
+                    event = json.loads(line)
+                    if event["seq"] <= after:
+                        continue
+                    yield event
+                    count += 1
+                    if limit is not None and count >= limit:
+                        return
+
+
+CHANGE_FEED = ChangeFeed()
+
+
+class SharedTaskList:
+    """
+    Общий список задач команды: одна запись на задачу для всех участников вместо копии в файле каждого.
+    Файл "shared/<название>.json": {"name", "members": [...], "tasks": [записи задач],
+    "done": {uid: {пользователь: время выполнения}}} - статус выполнения у каждого участника свой.
+    Задача с полем "assignees" назначена только перечисленным участникам, без него - всем.
+    """
+
+    def __init__(self, name: str, directory: str = "shared"):
+        self.name = name
+        self.path = os.path.join(directory, f"{name.replace(' ', '_')}.json")
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {"name": self.name, "members": [], "tasks": [], "done": {}}
+
+    def _update(self, change, events=None):
+        """
+        Читает список под блокировкой, применяет change(data) и атомарно записывает; возвращает data.
+        events(data) - события изменения, они попадают в журнал изменений под той же блокировкой.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with FileLock(self.path) as lock:
+            data = self.load()
+            change(data)
+            version = lock.read_version() + 1
+            with CHANGE_FEED.recording(self.path, version, events(data) if events else []):
+                with open(self.path + ".tmp", 'w', encoding='utf-8') as file:
+                    json.dump(data, file, ensure_ascii=False, indent=4)
+                os.replace(self.path + ".tmp", self.path)
+                lock.write_version(version)
+        return data
+
+    def add_members(self, users: List[str]):
+        def change(data):
+            data["members"].extend(user for user in users if user not in data["members"])
+        return self._update(change)
+
+    def add_task(self, title: str, description: str, done: dict = None, assignees: List[str] = None,
+                 created_at: str = None) -> dict:
+        """
+        Добавляет задачу в список (assignees - только этим участникам). Задача с теми же названием
+        и описанием не дублируется: к ней только добавляются отметки выполнения done ({пользователь: время}).
+        """
+        record = {}
+        created = []  # Непусто, если запись создана, а не найдена среди существующих
+
+        def change(data):
+            created.clear()
+            for existing in data["tasks"]:
+                if (existing["title"], existing["description"]) == (title, description):
+                    record.update(existing)
+                    break
+            else:
+                record.update(Task(title, description, created_at=created_at).to_record())
+                if assignees:
+                    record["assignees"] = list(assignees)
+                data["tasks"].append(dict(record))
+                created.append(record["uid"])
+            data["done"].setdefault(record["uid"], {}).update(done or {})
+
+        def events(data):
+            if not created:
+                return []
+            return [{"type": "task_added", "user": user_name, "uid": record["uid"], "title": title,
+                     "shared": self.name, "task": record} for user_name in record.get("assignees", data["members"])]
+        self._update(change, events)
+        return record
+
+    def set_completed(self, uid: str, user_name: str, completed: bool):
+        """Отмечает задачу выполненной (или невыполненной) для одного участника."""
+        completed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S") if completed else None
+
+        def change(data):
+            if not any(record["uid"] == uid for record in data["tasks"]):
+                raise KeyError(uid)
+            marks = data["done"].setdefault(uid, {})
+            if completed:
+                marks[user_name] = completed_at
+            else:
+                marks.pop(user_name, None)
+
+        def events(data):
+            title = next(record["title"] for record in data["tasks"] if record["uid"] == uid)
+            return [{"type": "task_status_changed", "user": user_name, "uid": uid, "title": title,
+                     "shared": self.name, "completed": completed, "completed_at": completed_at}]
+        self._update(change, events)
+
+    @staticmethod
+    def tasks_for(data: dict, user_name: str) -> list:
+        """Задачи списка с точки зрения участника: статус и время выполнения - его собственные."""
+        if user_name not in data["members"]:
+            return []
+        tasks = []
+        for record in data["tasks"]:
+            if user_name not in record.get("assignees", data["members"]):
+                continue
+            completed_at = data["done"].get(record["uid"], {}).get(user_name)
+            tasks.append(Task.from_record({**record, "completed": completed_at is not None,
+                                           "completed_at": completed_at}))
+        return tasks
+
+
+class ReportSnapshot:
+    """
+    Согласованный снимок данных всех пользователей для отчетов: каталог "snapshots/snapshot-*" с жесткими
+    ссылками на файлы задач, месяцы, сегменты архива и общие списки. Файлы данных заменяются только
+    переименованием временного файла (WriteCoordinator), поэтому ссылка продолжает указывать на версию
+    на момент снимка. Разделяемые блокировки всех файлов берутся одновременно (в порядке путей) и держатся
+    только на время создания ссылок: долгий отчет читает снимок и не задерживает сохранения.
+    Используется как контекстный менеджер; на выходе снимок удаляется.
+    """
+
+    def __init__(self, users: List[str], directory: str = "snapshots", source: str = "."):
+        self.users = list(users)
+        self.directory = directory
+        self.source = source
+        self.path = None
+        self.files = 0
+        self.seconds = 0.0
+
+    @property
+    def shared_directory(self) -> str:
+        return os.path.join(self.path, "shared")
+
+    def _sources(self) -> List[tuple]:
+        """(путь блокировки, файлы и каталоги данных под этой блокировкой) для всех пользователей и общих списков."""
+        sources = []
+        for user_name in self.users:
+            store = PartitionedTaskStore(user_name, self.source)
+            filename = os.path.join(self.source, task_filename(user_name))
+            if store.exists():
+                sources.append((store.manifest_path, [store.path]))
+            elif os.path.exists(filename):
+                sources.append((filename, [filename]))
+            archive = TaskArchive(user_name, self.source)
+            if os.path.exists(archive.index_path):
+                sources.append((archive.index_path, [archive.path]))
+        shared = os.path.join(self.source, "shared")
+        if os.path.isdir(shared):
+            sources.extend((os.path.join(shared, name), [os.path.join(shared, name)])
+                           for name in os.listdir(shared) if name.endswith(".json"))
+        return sorted(sources)
+
+    def _link(self, source: str):
+        import shutil
+        names = [os.path.basename(source)]
+        base = os.path.dirname(source)
+        if os.path.isdir(source):
+            base = source
+            names = [name for name in os.listdir(source) if not name.endswith((".lock", ".tmp"))]
+        target = os.path.join(self.path, os.path.relpath(base, self.source))
+        os.makedirs(target, exist_ok=True)
+        for name in names:
+            try:
+                os.link(os.path.join(base, name), os.path.join(target, name))
+            except OSError:
+                shutil.copy2(os.path.join(base, name), os.path.join(target, name))  # Нет жестких ссылок
+            self.files += 1
+
+    def __enter__(self):
+        import tempfile
+        from contextlib import ExitStack
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = tempfile.mkdtemp(prefix="snapshot-", dir=self.directory)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as locks:
+                sources = self._sources()
+                for lock_path, _ in sources:
+                    locks.enter_context(FileLock(lock_path, shared=True))
+                for _, paths in sources:
+                    for source in paths:
+                        if os.path.exists(source):
+                            self._link(source)
+        except BaseException:
+            self.close()
+            raise
+        self.seconds = time.perf_counter() - started
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        import shutil
+        if self.path is not None:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.path = None
+
+
+def load_shared_lists(directory: str = "shared") -> dict:
+    """Все общие списки задач: название -> содержимое. Каждый файл читается один раз."""
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+    except FileNotFoundError:
+        return {}
+    lists = {}
+    for name in names:
+        shared = SharedTaskList(name[:-len(".json")], directory)
+        with FileLock(shared.path, shared=True):
+            data = shared.load()
+        lists[data.get("name", shared.name)] = data
+    return lists
+
+
+class DeadlineIndex:
+    """
+    Общий индекс сроков открытых задач всех пользователей (каталог deadline_index).
+    Сроки разложены по файлам дней "ГГГГ-ММ-ДД.json" ([[срок, пользователь, uid, название], ...]),
+    а в users.json для каждого пользователя записано, в каких днях лежат его задачи. Сохранение
+    задач пользователя переписывает только его дни, поэтому просроченные и срочные задачи всей
+    организации находятся без чтения файлов задач - читаются только дни до нужной даты.
+    """
+
+    def __init__(self, path: str = "deadline_index"):
+        self.path = path
+        self.users_path = os.path.join(path, "users.json")
+
+    def _day_path(self, day: str) -> str:
+        return os.path.join(self.path, f"{day}.json")
+
+    def _days(self) -> List[str]:
+        try:
+            names = os.listdir(self.path)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-5] for name in names if name.endswith(".json") and name != "users.json")
+
+    @staticmethod
+    def _read(path: str, default):
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return default
+
+    @staticmethod
+    def _write(path: str, data):
+        with open(path + ".tmp", 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    @staticmethod
+    def _group(user_name: str, records: List[dict]) -> dict:
+        """Сроки открытых задач из records по дням."""
+        days = {}
+        for record in records:
+            deadline = record.get("deadline")
+            if record.get("completed") or not deadline:
+                continue
+            days.setdefault(deadline[:10], []).append([deadline, user_name, record.get("uid"), record.get("title")])
+        return days
+
+    def update_user(self, user_name: str, records: List[dict]):
+        """Заменяет в индексе задачи пользователя сроками открытых задач из records ([] - удалить пользователя)."""
+        os.makedirs(self.path, exist_ok=True)
+        with FileLock(self.users_path):
+            users = self._read(self.users_path, {})
+            new_days = self._group(user_name, records)
+            for day in set(users.pop(user_name, [])) | set(new_days):
+                path = self._day_path(day)
+                entries = [entry for entry in self._read(path, []) if entry[1] != user_name]
+                entries.extend(new_days.get(day, []))
+                if entries:
+                    self._write(path, entries)
+                elif os.path.exists(path):
+                    os.remove(path)
+            if new_days:
+                users[user_name] = sorted(new_days)
+            self._write(self.users_path, users)
+
+    def rebuild(self, users: List[str]):
+        """Строит индекс заново по файлам задач всех пользователей."""
+        buckets, index_users = {}, {}
+        for user_name in users:
+            records = [Task.from_record(record).to_record() for record in read_user_records(user_name, open_only=True)]
+            days = self._group(user_name, records)
+            for day, entries in days.items():
+                buckets.setdefault(day, []).extend(entries)
+            if days:
+                index_users[user_name] = sorted(days)
+        os.makedirs(self.path, exist_ok=True)
+        with FileLock(self.users_path):
+            for day in self._days():
+                if day not in buckets:
+                    os.remove(self._day_path(day))
+            for day, entries in buckets.items():
+                self._write(self._day_path(day), entries)
+            self._write(self.users_path, index_users)
+        return sum(len(entries) for entries in buckets.values())
+
+    def query(self, before: datetime, after: datetime = None) -> List[dict]:
+        """Открытые задачи со сроком в [after, before) по возрастанию срока."""
+        high = before.strftime("%Y-%m-%d %H:%M:%S")
+        low = after.strftime("%Y-%m-%d %H:%M:%S") if after else ""
+        if not os.path.exists(self.users_path):
+            return []
+        result = []
+        with FileLock(self.users_path, shared=True):
+            for day in self._days():
+                if day > high[:10]:
+                    break
+                if day < low[:10]:
+                    continue
+                result.extend(entry for entry in self._read(self._day_path(day), []) if low <= entry[0] < high)
+        result.sort()
+        return [{"deadline": deadline, "user": user_name, "uid": uid, "title": title}
+                for deadline, user_name, uid, title in result]
+
+    def overdue(self, now: datetime = None) -> List[dict]:
+        return self.query(now or datetime.now())
+
+    def due_soon(self, hours: float, now: datetime = None) -> List[dict]:
+        now = now or datetime.now()
+        return self.query(now + timedelta(hours=hours), now)
+
+
+DEADLINE_INDEX = DeadlineIndex()
+
+
+class TaskManager:
+    def __init__(self, user_name: str, compact: bool = False, history_depth: int = 50,
+                 partitioned: bool = None, window_months: int = None):
+        self.user_name = user_name
+        self.filename = task_filename(user_name)
+        # Хранение по месяцам (PartitionedTaskStore): включается явно или если каталог пользователя уже есть.
+        # window_months - загружать только последние N месяцев и месяцы с открытыми задачами.
+        self.store = PartitionedTaskStore(user_name)
+        if partitioned is None:
+            partitioned = self.store.exists()
+        if partitioned:
+            os.makedirs(self.store.path, exist_ok=True)
+            self.filename = self.store.manifest_path
+        else:
+            self.store = None
+        self.window_months = window_months
+        self._loaded_partitions = set()
+        # compact=True: задачи хранятся как CompactTask (общий пул строк, упакованные даты)
+        self.task_class = CompactTask if compact else Task
+        if compact:
+            SHARED_STRING_POOL.acquire()
+            weakref.finalize(self, SHARED_STRING_POOL.release)  # Пул отпускается вместе с TaskManager
+        self.last_saved = False
+        self._renderer = TaskTableRenderer()
+        self.file_version = 0  # Версия файла на момент последней загрузки/сохранения
+        # Список задач на момент последней загрузки/сохранения - общая часть для слияния с другими сеансами.
+        # PersistentTaskList разделяет узлы с текущим списком, поэтому отдельная копия не хранится
+        self._base_tasks = PersistentTaskList()
+        self._saved_fields = {}  # uid -> (название, статус, срок) на момент последней загрузки/сохранения
+        self._archived_uids = set()  # Задачи, перенесенные в архив после последнего сохранения
+        self.damaged_files = {}  # Поврежденные файлы при последнем чтении: путь -> число потерянных записей
+        self.changes = CHANGE_FEED
+        self.deadline_index = DEADLINE_INDEX
+        self.writer = WRITE_COORDINATOR  # Групповая запись файлов задач с общим сбросом на диск
+        self.archive = TaskArchive(user_name)
+        self.history = TaskHistory(history_depth)
+        self._tag_index = None  # (состояние self.tasks, TagIndex), строится при первом запросе
+        # Куча открытых задач по priority_key: (состояние self.tasks, IndexedHeap, uid -> задача).
+        # Одиночные изменения обновляют ее за O(log n), после массовых, отмены и загрузки она строится заново.
+        self._priority = None
+        self._dependencies = None  # (состояние self.tasks, DependencyGraph), обновляется так же, как куча
+        # Уже построенные структуры обновляются при каждом изменении self.tasks, поэтому просмотры их только
+        # читают (в ThreadSafeTaskManager - под блокировкой чтения); первое построение защищено _index_lock
+        self._index_lock = threading.Lock()
+        self.tasks = PersistentTaskList()
+        self.history.reset(self.tasks, "начало работы")
+        try:  # SCRUM-10
+            if os.path.exists(self.filename):
+                self.load_from_file()
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при инициализации TaskManager: {e}")  #SCRUM-10
+
+    @property
+    def tasks(self) -> PersistentTaskList:
+        return self._tasks
+
+    @tasks.setter
+    def tasks(self, value):
+        self._tasks = value if isinstance(value, PersistentTaskList) else PersistentTaskList(value)
+        for attribute, build in self._DERIVED:
+            derived = getattr(self, attribute)
+            if derived is not None and derived[0] is not self._tasks:
+                setattr(self, attribute, build(self._tasks))
+
+    @staticmethod
+    def _build_tag_index(tasks) -> tuple:
+        return tasks, TagIndex(tasks)
+
+    @staticmethod
+    def _build_priority(tasks) -> tuple:
+        by_uid = {task.uid: task for task in tasks if not task.completed}
+        return tasks, IndexedHeap((priority_key(task), uid) for uid, task in by_uid.items()), by_uid
+
+    @staticmethod
+    def _build_dependencies(tasks) -> tuple:
+        return tasks, DependencyGraph(tasks)
+
+    # Производные структуры списка задач: атрибут (состояние self.tasks, ...) и функция построения
+    _DERIVED = (("_tag_index", _build_tag_index.__func__), ("_priority", _build_priority.__func__),
+                ("_dependencies", _build_dependencies.__func__))
+
+    def _derived(self, attribute: str, build) -> tuple:
+        """Производная структура текущего списка задач; строится при первом запросе."""
+        derived = getattr(self, attribute)
+        if derived is None or derived[0] is not self.tasks:
+            with self._index_lock:  # Первое построение могут запросить несколько просмотров сразу
+                derived = getattr(self, attribute)
+                if derived is None or derived[0] is not self.tasks:
+                    derived = build(self.tasks)
+                    setattr(self, attribute, derived)
+        return derived
+
+    def _edit_tag_index(self, tasks: PersistentTaskList, edit):
+        """Переносит построенный индекс тегов на состояние tasks, изменяя его на месте: edit(индекс)."""
+        if self._tag_index is not None and self._tag_index[0] is self.tasks:
+            edit(self._tag_index[1])
+            self._tag_index = (tasks, self._tag_index[1])
+
+    def _commit(self, tasks: PersistentTaskList, label: str, changes=None):
+        """
+        Делает tasks текущим состоянием списка задач и записывает его в историю.
+        changes - пары (старая задача, новая задача), None вместо задачи при добавлении/удалении;
+        по ним куча приоритетов и граф зависимостей обновляются на месте, без них - строятся заново здесь же.
+        Индекс тегов сохраняется, если задачи заменены на тех же позициях с теми же тегами и проектом;
+        добавление, удаление и смена тегов переносят его сами (_edit_tag_index).
+        """
+        previous = self.tasks
+        if changes is not None and self._tag_index is not None and self._tag_index[0] is previous and all(
+                old is not None and new is not None and old.tags == new.tags and old.project == new.project
+                for old, new in changes):
+            self._tag_index = (tasks, self._tag_index[1])
+        if changes is not None and self._dependencies is not None and self._dependencies[0] is previous:
+            graph = self._dependencies[1]
+            for old, new in changes:
+                graph.update(old, new)
+            self._dependencies = (tasks, graph)
+        if changes is not None and self._priority is not None and self._priority[0] is previous:
+            _, heap, by_uid = self._priority
+            for old, new in changes:
+                if old is not None:
+                    heap.remove(old.uid)
+                    by_uid.pop(old.uid, None)
+                if new is not None and not new.completed:
+                    heap.push(priority_key(new), new.uid)
+                    by_uid[new.uid] = new
+            self._priority = (tasks, heap, by_uid)
+        self.tasks = tasks  # Структуры, не обновленные по changes, перестраиваются здесь
+        self.history.record(tasks, label)
+        self.last_saved = False
+
+    def undo(self):
+        try:  # SCRUM-10
+            step = self.history.undo()
+            if step is None:
+                print("Нет действий для отмены.")
+                return
+            label, self.tasks = step
+            self.last_saved = False
+            print(f"Отменено действие: {label}.")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при отмене действия: {e}")  #SCRUM-10
+
+    def redo(self):
+        try:  # SCRUM-10
+            step = self.history.redo()
+            if step is None:
+                print("Нет отмененных действий для повтора.")
+                return
+            label, self.tasks = step
+            self.last_saved = False
+            print(f"Повторено действие: {label}.")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при повторе действия: {e}")  #SCRUM-10
+
+    def view_tasks_as_of(self, moment: str):
+        """Показывает список задач на момент moment (формат 'ЧЧ:ММ ДД.ММ.ГГГГ') из истории текущего сеанса."""
+        try:
+            tasks = self.history.as_of(datetime.strptime(moment, "%H:%M %d.%m.%Y").replace(second=59))
+            if tasks is None:
+                print("На этот момент в истории текущего сеанса нет данных.")
+            elif not tasks:
+                print("Список задач пуст.")
+            else:
+                print(TaskTableRenderer().render(tasks))
+        except ValueError:
+            print("Некорректный формат даты. Используйте формат 'ЧЧ:ММ ДД.ММ.ГГГГ'.")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при просмотре истории задач: {e}")  #SCRUM-10
+
+    def add_task(self, title: str, description: str):
+        try:  # SCRUM-10
+            task = self.task_class(title, description)
+            tasks = self.tasks.append(task)
+            self._edit_tag_index(tasks, lambda index: index.append(task))
+            self._commit(tasks, f"добавление задачи \"{title}\"", [(None, task)])
+            print("Задача добавлена.")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при добавлении задачи: {e}")  #SCRUM-10
+
+    def remove_task(self, index: int):
+        try:  # SCRUM-10
+            if not self.tasks:
+                print("Список задач пуст. Удаление невозможно.")
+                return
+
+            if 0 <= index < len(self.tasks):
+                removed_task = self.tasks[index]
+                tasks = self.tasks
+                changes = []
+                dependents = self.dependency_graph.dependents(removed_task.uid)
+                if dependents:
+                    # Ссылки на удаляемую задачу убираются из зависимых задач в том же шаге истории
+                    for position, task in enumerate(self.tasks):
+                        if task.uid in dependents:
+                            updated = task.copy()
+                            updated.depends_on = tuple(uid for uid in task.depends_on if uid != removed_task.uid)
+                            tasks = tasks.set(position, updated)
+                            changes.append((task, updated))
+                changes.append((removed_task, None))
+                tasks = tasks.delete(index)
+                self._edit_tag_index(tasks, lambda tag_index: tag_index.delete(index))
+                self._commit(tasks, f"удаление задачи \"{removed_task.title}\"", changes)
+                self._renderer.invalidate(removed_task)
+                print(f"Задача \"{removed_task.title}\" удалена.")
+            else:
+                print("Неверный индекс.")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при удалении задачи: {e}")  #SCRUM-10
+
+    def view_tasks(self, tag_query: str = None):
+        try:  # SCRUM-10
+            if not self.tasks:
+                print("Список задач пуст.")
+            elif tag_query:
+                found = self.filter_by_tags(tag_query)
+                if not found:
+                    print("Задачи не найдены.")
+                    return
+                # Номера задач - как в полном списке, чтобы по ним можно было изменять задачи
+                rows = [{**task.to_dict(position + 1), "Теги": " ".join(f"#{tag}" for tag in task.tags),
+                         "Проект": task.project or ""} for position, task in found]
+                print(tabulate(rows, headers="keys", tablefmt="grid"))
+            else:
+                print(self._renderer.render(self.tasks))
+        except ValueError as e:
+            print(f"Некорректный запрос по тегам: {e}")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при просмотре задач: {e}")  #SCRUM-10
+
+    @property
+    def tag_index(self) -> TagIndex:
+        return self._derived("_tag_index", self._build_tag_index)[1]
+
+    def filter_by_tags(self, tag_query) -> list:
+        """Задачи, подходящие под запрос по тегам (строка или разобранное дерево): список (позиция, задача)."""
+        tree = parse_tag_query(tag_query) if isinstance(tag_query, str) else tag_query
+        tasks = self.tasks
+        positions = list(TagIndex.positions(self.tag_index.evaluate(tree)))
+        if len(positions) * 8 < len(tasks):
+            return [(position, tasks[position]) for position in positions]
+        # Много совпадений: один проход по списку дешевле, чем поиск каждой позиции в дереве
+        selected = set(positions)
+        return [(position, task) for position, task in enumerate(tasks) if position in selected]
+
+    def set_task_priority(self, index: int, priority: int = None):
+        """Устанавливает приоритет задачи (1-4, см. PRIORITY_LEVELS; None - обычный)."""
+        try:  # SCRUM-10
+            if not 0 <= index < len(self.tasks):
+                print("Неверный индекс.")
+                return
+            if priority is not None and priority not in PRIORITY_LEVELS:
+                print(f"Приоритет должен быть от {min(PRIORITY_LEVELS)} до {max(PRIORITY_LEVELS)}.")
+                return
+            task = self.tasks[index].copy()
+            task.priority = priority
+            self._commit(self.tasks.set(index, task), f"изменение приоритета задачи \"{task.title}\"",
+                         [(self.tasks[index], task)])
+            print(f"Приоритет задачи \"{task.title}\": {PRIORITY_LEVELS[priority or DEFAULT_PRIORITY]}.")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при изменении приоритета задачи: {e}")  #SCRUM-10
+
+    @property
+    def priority_queue(self) -> IndexedHeap:
+        return self._derived("_priority", self._build_priority)[1]
+
+    def top_tasks(self, count: int = 10) -> list:
+        """count открытых задач в порядке priority_key (приоритет, срок, давность) - без сортировки всего списка."""
+        _, heap, by_uid = self._derived("_priority", self._build_priority)
+        return [by_uid[uid] for _, uid in heap.smallest(count)]
+
+    def view_top_tasks(self, count: int = 10):
+        try:  # SCRUM-10
+            tasks = self.top_tasks(count)
+            if not tasks:
+                print("Открытых задач нет.")
+                return
+            rows = [{"#": number, "Приоритет": PRIORITY_LEVELS[task.priority or DEFAULT_PRIORITY],
+                     "Время": task.remaining_time(), "Название задачи": task.title,
+                     "Описание задачи": task.description} for number, task in enumerate(tasks, start=1)]
+            print(tabulate(rows, headers="keys", tablefmt="grid"))
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при выборе главных задач: {e}")  #SCRUM-10
+
+    @property
+    def dependency_graph(self) -> DependencyGraph:
+        return self._derived("_dependencies", self._build_dependencies)[1]
+
+    def add_task_dependency(self, index: int, prerequisite_index: int):
+        """Задача index может быть выполнена только после задачи prerequisite_index."""
+        try:  # SCRUM-10
+            if not (0 <= index < len(self.tasks) and 0 <= prerequisite_index < len(self.tasks)):
+                print("Неверный индекс.")
+                return
+            task, prerequisite = self.tasks[index], self.tasks[prerequisite_index]
+            if prerequisite.uid in task.depends_on:
+                print("Такая зависимость уже есть.")
+                return
+            cycle = self.dependency_graph.add_edge(prerequisite.uid, task.uid)
+            if cycle:
+                titles = " -> ".join(self.dependency_graph.tasks[uid].title for uid in cycle)
+                print(f"Зависимость не добавлена: получится цикл {titles}.")
+                return
+            updated = task.copy()
+            updated.depends_on = task.depends_on + (prerequisite.uid,)
+            self._commit(self.tasks.set(index, updated), f"добавление зависимости задачи \"{task.title}\"",
+                         [(task, updated)])
+            print(f"Задача \"{task.title}\" будет доступна после задачи \"{prerequisite.title}\".")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при добавлении зависимости: {e}")  #SCRUM-10
+
+    def remove_task_dependency(self, index: int, prerequisite_index: int):
+        try:  # SCRUM-10
+            if not (0 <= index < len(self.tasks) and 0 <= prerequisite_index < len(self.tasks)):
+                print("Неверный индекс.")
+                return
+            task, prerequisite = self.tasks[index], self.tasks[prerequisite_index]
+            if prerequisite.uid not in task.depends_on:
+                print("Такой зависимости нет.")
+                return
+            updated = task.copy()
+            updated.depends_on = tuple(uid for uid in task.depends_on if uid != prerequisite.uid)
+            self._commit(self.tasks.set(index, updated), f"удаление зависимости задачи \"{task.title}\"",
+                         [(task, updated)])
+            print(f"Задача \"{task.title}\" больше не зависит от задачи \"{prerequisite.title}\".")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при удалении зависимости: {e}")  #SCRUM-10
+
+    def ready_tasks(self) -> list:
+        """Открытые задачи, все предварительные задачи которых выполнены, в порядке priority_key."""
+        return sorted(self.dependency_graph.ready_tasks(), key=priority_key)
+
+    def blocked_tasks(self) -> list:
+        """Открытые задачи с невыполненными предварительными задачами: список (задача, чего она ждет)."""
+        return sorted(self.dependency_graph.blocked_tasks(), key=lambda item: priority_key(item[0]))
+
+    def view_dependencies(self):
+        try:  # SCRUM-10
+            blocked = self.blocked_tasks()
+            ready = self.ready_tasks()
+            if not blocked and not ready:
+                print("Открытых задач нет.")
+                return
+            print("Можно выполнять:")
+            print(tabulate([{"Приоритет": PRIORITY_LEVELS[task.priority or DEFAULT_PRIORITY],
+                             "Время": task.remaining_time(), "Название задачи": task.title}
+                            for task in ready], headers="keys", tablefmt="grid") if ready else "нет")
+            print("Ожидают других задач:")
+            print(tabulate([{"Название задачи": task.title,
+                             "Ожидает": ", ".join(prerequisite.title for prerequisite in waiting)}
+                            for task, waiting in blocked], headers="keys", tablefmt="grid") if blocked else "нет")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при просмотре зависимостей: {e}")  #SCRUM-10
+
+    def set_task_tags(self, index: int, tags, project: str = None):
+        """Заменяет теги задачи (строка через пробел/запятую или список) и проект (пустой - без проекта)."""
+        try:  # SCRUM-10
+            if not 0 <= index < len(self.tasks):
+                print("Неверный индекс.")
+                return
+            task = self.tasks[index].copy()
+            task.tags = normalize_tags(tags)
+            task.project = normalize_tag(project) if project else None
+            previous = self.tasks[index]
+            self._renderer.invalidate(previous)
+            tasks = self.tasks.set(index, task)
+            self._edit_tag_index(tasks, lambda tag_index: tag_index.replace(index, previous, task))
+            self._commit(tasks, f"изменение тегов задачи \"{task.title}\"", [(previous, task)])
+            print(f"Теги задачи \"{task.title}\": {' '.join('#' + tag for tag in task.tags) or 'нет'}; "
+                  f"проект: {task.project or 'нет'}.")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при изменении тегов задачи: {e}")  #SCRUM-10
+
+    def change_task_status(self, index: int):
+        try:  # SCRUM-10
+            if not self.tasks:
+                print("Список задач пуст. Изменение статуса невозможно.")
+                return
+
+            if 0 <= index < len(self.tasks):
+                task = self.tasks[index].copy()
+                waiting = [] if task.completed else self.dependency_graph.open_prerequisites(task.uid)
+                if waiting:
+                    print(f"Задача \"{task.title}\" ожидает выполнения задач: "
+                          f"{', '.join(prerequisite.title for prerequisite in waiting)}.")
+                    return
+                if task.completed:
+                    task.mark_incomplete()
+                    print(f"Статус задачи \"{task.title}\" изменен на невыполненный.")
+                else:
+                    task.mark_completed()
+                    print(f"Задача \"{task.title}\" отмечена как выполненная.")
+                self._renderer.invalidate(self.tasks[index])
+                self._commit(self.tasks.set(index, task), f"изменение статуса задачи \"{task.title}\"",
+                         [(self.tasks[index], task)])
+            else:
+                print("Неверный индекс.")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при изменении статуса задачи: {e}")  #SCRUM-10
+
+    def set_task_deadline(self, index: int, deadline: str):
+        try:  # SCRUM-10
+            if not self.tasks:
+                print("Список задач пуст. Установка срока невозможна.")
+                return
+
+            if 0 <= index < len(self.tasks):
+                task = self.tasks[index].copy()
+                if not task.set_deadline(deadline):
+                    return
+                self._renderer.invalidate(self.tasks[index])
+                self._commit(self.tasks.set(index, task), f"установка срока задачи \"{task.title}\"",
+                         [(self.tasks[index], task)])
+                print(f"Для задачи \"{task.title}\" установлен срок выполнения.")
+            else:
+                print("Неверный индекс.")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при установке срока задачи: {e}")  #SCRUM-10
+
+    def set_task_recurrence(self, index: int, freq: str, interval: int = 1, count: int = None, until: str = None):
+        try:  # SCRUM-10
+            if not 0 <= index < len(self.tasks):
+                print("Неверный индекс.")
+                return
+            task = self.tasks[index].copy()
+            if not task.set_recurrence(freq, interval, count, until):
+                return
+            self._renderer.invalidate(self.tasks[index])
+            self._commit(self.tasks.set(index, task), f"настройка повторения задачи \"{task.title}\"",
+                         [(self.tasks[index], task)])
+            if freq is None:
+                print(f"Повторение задачи \"{task.title}\" отменено.")
+            else:
+                print(f"Задача \"{task.title}\" повторяется: {RECURRENCE_FREQUENCIES[freq]}.")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при настройке повторения задачи: {e}")  #SCRUM-10
+
+    def iter_occurrences(self, start: datetime, end: datetime):
+        """Повторения всех задач в окне [start, end] по возрастанию срока: генератор (срок, выполнено, задача)."""
+        def stream(task):
+            for moment, done in task.occurrences(start, end):
+                yield moment, done, task
+        return heapq.merge(*(stream(task) for task in self.tasks if task.deadline), key=lambda item: item[0])
+
+    def view_occurrences(self, days: int = 7):
+        """Показывает сроки задач (с развернутыми повторениями) на ближайшие days дней."""
+        try:  # SCRUM-10
+            now = datetime.now()
+            rows = [{
+                "Срок": moment.strftime("%d.%m.%Y %H:%M"),
+                "Статус": "[X]" if done else "[ ]",
+                "Название задачи": task.title,
+                "Повтор": RECURRENCE_FREQUENCIES[task.recurrence["freq"]] if task.recurrence else "",
+            } for moment, done, task in self.iter_occurrences(now, now + timedelta(days=days))]
+            if not rows:
+                print(f"В ближайшие {days} дней сроков нет.")
+                return
+            print(tabulate(rows, headers="keys", tablefmt="grid"))
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при просмотре сроков: {e}")  #SCRUM-10
+
+    def _bulk_update(self, query, update, label: str, save: bool = True) -> dict:
+        """
+        Общая часть массовых операций: один проход по задачам, подходящим под query (строка фильтра
+        или функция task -> bool), одна запись в историю и одно сохранение.
+        update(task) возвращает измененную копию, ту же задачу (без изменений) или None (удалить).
+        """
+        predicate = query if callable(query) else parse_task_query(query)
+        summary = {"операция": label, "подходит": 0, "изменено": 0, "без изменений": 0}
+        tasks = []
+        for task in self.tasks:
+            if not predicate(task):
+                tasks.append(task)
+                continue
+            summary["подходит"] += 1
+            updated = update(task)
+            if updated is task:
+                summary["без изменений"] += 1
+            else:
+                summary["изменено"] += 1
+                self._renderer.invalidate(task)
+            if updated is not None:
+                tasks.append(updated)
+        if summary["изменено"]:
+            self._commit(PersistentTaskList(tasks), f"{label} ({summary['изменено']} задач)")
+            if save:
+                self.save_to_file()
+        return summary
+
+    def bulk_set_status(self, query, completed: bool = True, save: bool = True) -> dict:
+        """
+        Отмечает подходящие задачи выполненными (completed=True) или невыполненными.
+        Задачи с невыполненными предварительными задачами, как и в change_task_status, не отмечаются;
+        их число - в поле сводки "ожидают других задач".
+        """
+        graph = self.dependency_graph if completed else None
+        blocked = []
+
+        def update(task):
+            if bool(task.completed) == completed:
+                return task
+            if graph is not None and graph.open_prerequisites(task.uid):
+                blocked.append(task)
+                return task
+            task = task.copy()
+            if completed:
+                task.mark_completed()
+            else:
+                task.mark_incomplete()
+            return task
+        summary = self._bulk_update(query, update, "отметка выполнения" if completed else "снятие отметки", save)
+        if completed:
+            summary["без изменений"] -= len(blocked)
+            summary["ожидают других задач"] = len(blocked)
+        return summary
+
+    def bulk_set_deadline(self, query, deadline: str, save: bool = True) -> dict:
+        """Устанавливает срок deadline (ЧЧ:ММ ДД.ММ.ГГГГ) подходящим невыполненным задачам."""
+        deadline = datetime.strptime(deadline, "%H:%M %d.%m.%Y").strftime("%Y-%m-%d %H:%M:%S")
+
+        def update(task):
+            if task.completed or task.deadline == deadline:
+                return task
+            task = task.copy()
+            task.deadline = deadline
+            if task.recurrence:
+                task.recurrence = reschedule_recurrence(task.recurrence, deadline)
+            return task
+        return self._bulk_update(query, update, "установка срока", save)
+
+    def bulk_shift_deadline(self, query, hours: float, save: bool = True) -> dict:
+        """Сдвигает на hours часов (можно отрицательное) сроки подходящих невыполненных задач."""
+        shift = timedelta(hours=hours)
+
+        def update(task):
+            if task.completed or not task.deadline or not shift:
+                return task
+            task = task.copy()
+            task.deadline = (datetime.strptime(task.deadline, "%Y-%m-%d %H:%M:%S") + shift).strftime("%Y-%m-%d %H:%M:%S")
+            if task.recurrence:  # Сдвигаются невыполненные повторения серии
+                task.recurrence = reschedule_recurrence(task.recurrence, task.deadline)
+            return task
+        return self._bulk_update(query, update, "сдвиг сроков", save)
+
+    def bulk_remove(self, query, save: bool = True) -> dict:
+        """Удаляет подходящие задачи."""
+        return self._bulk_update(query, lambda task: None, "удаление задач", save)
+
+    def _partitions_to_load(self):
+        if self.window_months is None:
+            return self.store.select()
+        today = datetime.now()
+        month_index = today.year * 12 + today.month - 1 - (self.window_months - 1)
+        return self.store.select(created_from=f"{month_index // 12:04}-{month_index % 12 + 1:02}", include_open=True)
+
+    def _read_records(self) -> List[dict]:
+        """Записи задач из файла (или месяцев); поврежденные файлы запоминаются в self.damaged_files."""
+        if self.store is not None:
+            records = self.store.read(self._loaded_partitions)
+            self.damaged_files = self.store.damaged
+        else:
+            records, damaged, _, intact = read_records_file(self.filename)
+            self.damaged_files = {self.filename: damaged} if damaged or not intact else {}
+        return [Task.from_record(data).to_record() for data in records]
+
+    def _write_records(self, records: List[dict]):
+        if self.store is not None:
+            self.store.write(records, self._loaded_partitions, self.writer)
+            self._loaded_partitions |= {self.store.partition_of(record) for record in records}
+        else:
+            self.writer.write([(self.filename, dump_task_records(records))])
+
+    @staticmethod
+    def _fields(record: dict) -> tuple:
+        return record["title"], record["completed"], record["deadline"], (record.get("recurrence") or {}).get("done")
+
+    def _change_events(self, records: List[dict]) -> List[dict]:
+        """События журнала изменений: отличия records от состояния последней загрузки/сохранения."""
+        events = []
+        current = set()
+        for record in records:
+            uid = record["uid"]
+            current.add(uid)
+            before = self._saved_fields.get(uid)
+            event = {"user": self.user_name, "uid": uid, "title": record["title"]}
+            if before is None:
+                events.append({"type": "task_added", **event, "task": record})
+                continue
+            done = (record.get("recurrence") or {}).get("done")
+            if before[1] != record["completed"] or before[3] != done:
+                status = {"occurrences_done": done} if done is not None else {}
+                events.append({"type": "task_status_changed", **event, "completed": record["completed"],
+                               "completed_at": record["completed_at"], **status})
+            if before[2] != record["deadline"] and before[3] == done:
+                events.append({"type": "task_deadline_set", **event, "deadline": record["deadline"]})
+        for uid, (title, *_) in self._saved_fields.items():
+            if uid not in current:
+                kind = "task_archived" if uid in self._archived_uids else "task_removed"
+                events.append({"type": kind, "user": self.user_name, "uid": uid, "title": title})
+        return events
+
+    def _base_record_map(self) -> dict:
+        return {task.uid: task.to_record() for task in self._base_tasks}
+
+    def merge_from_file(self):
+        """
+        Загружает изменения, сохраненные другими сеансами, не теряя несохраненных изменений этого сеанса:
+        изменения разных полей объединяются, в конфликтующих полях остаются значения этого сеанса.
+        После этого сохранение не будет отклонено из-за уже загруженных изменений.
+        """
+        try:
+            with FileLock(self.filename, shared=True) as lock:
+                version = lock.read_version()
+                if version == self.file_version or not os.path.exists(self.filename):
+                    print("Файл задач не изменялся в других сеансах.")
+                    return
+                theirs = self._read_records()
+            ours = [task.to_record() for task in self.tasks]
+            records, conflicts = merge_task_records(self._base_record_map(), ours, theirs, prefer_ours=True)
+            self._commit(PersistentTaskList(self.task_class.from_record(record) for record in records),
+                         "загрузка изменений других сеансов")
+            self._renderer.invalidate()
+            # Общей частью для следующего сохранения становится содержимое файла
+            self._base_tasks = PersistentTaskList(self.task_class.from_record(record) for record in theirs)
+            self._saved_fields = {record["uid"]: self._fields(record) for record in theirs}
+            self.file_version = version
+            self.last_saved = records == theirs
+            print("Изменения других сеансов загружены." +
+                  (f" Конфликтующих задач: {len(conflicts)} - оставлены изменения этого сеанса." if conflicts else ""))
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка загрузки изменений: {e}")  #SCRUM-10
+
+    def save_to_file(self):
+        try:
+            with FileLock(self.filename) as lock:
+                current_version = lock.read_version()
+                records = [task.to_record() for task in self.tasks]
+                events = self._change_events(records)  # Только наши изменения, без изменений другого сеанса
+                if current_version != self.file_version and os.path.exists(self.filename):
+                    # Файл успел сохранить другой процесс - объединяем изменения вместо перезаписи
+                    records, conflicts = merge_task_records(self._base_record_map(), records, self._read_records())
+                    if conflicts:
+                        _update_lock_stats(rejected_saves=1)
+                        print(f"Файл \"{self.filename}\" был изменен в другом сеансе, "
+                              f"изменения {len(conflicts)} задач конфликтуют. Сохранение отменено.")
+                        print("Выберите \"Загрузить изменения других сеансов\" (ваши изменения сохранятся) "
+                              "и сохраните задачи снова.")
+                        return
+                    _update_lock_stats(merged_saves=1)
+                    self._commit(PersistentTaskList(self.task_class.from_record(record) for record in records),
+                                 "слияние с изменениями другого сеанса")
+                    self._renderer.invalidate()
+                    print("Изменения из другого сеанса объединены с текущими.")
+
+                with self.changes.recording(self.filename, current_version + 1, events):
+                    self._write_records(records)
+                    self.file_version = current_version + 1
+                    lock.write_version(self.file_version)
+                self.deadline_index.update_user(self.user_name, records)
+            self._base_tasks = self.tasks
+            self._saved_fields = {record["uid"]: self._fields(record) for record in records}
+            self._archived_uids.clear()
+            self.last_saved = True
+            print(f"Список задач сохранен в файл \"{self.filename}\".")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка сохранения в файл: {e}")  #SCRUM-10
+
+    def iter_archived_tasks(self, completed_from: str = None, completed_to: str = None):
+        """Задачи из архива пользователя (кроме тех, что еще есть в активном списке)."""
+        active = {task.uid for task in self.tasks}
+        for record in self.archive.iter_records(completed_from, completed_to):
+            if record.get("uid") not in active:
+                yield self.task_class.from_record(record)
+
+    def all_tasks(self, shared_lists: dict = None):
+        """
+        Все задачи пользователя: архивные, активные и задачи общих списков команд.
+        shared_lists - уже прочитанные общие списки (load_shared_lists), чтобы не читать их для каждого пользователя.
+        """
+        return itertools.chain(self.iter_archived_tasks(), self.tasks,
+                               (task for _, task in self.shared_tasks(shared_lists)))
+
+    def shared_tasks(self, shared_lists: dict = None) -> List[tuple]:
+        """Задачи общих списков, в которых участвует пользователь: список (название списка, задача)."""
+        if shared_lists is None:
+            shared_lists = load_shared_lists()
+        return [(name, task) for name, data in shared_lists.items()
+                for task in SharedTaskList.tasks_for(data, self.user_name)]
+
+    def view_shared_tasks(self):
+        try:  # SCRUM-10
+            shared_lists = load_shared_lists()
+            rows = []
+            for number, (name, task) in enumerate(self.shared_tasks(shared_lists), start=1):
+                data = shared_lists[name]
+                rows.append({"#": number, "Список": name, "Статус": "[X]" if task.completed else "[ ]",
+                             "Название задачи": task.title, "Описание задачи": task.description,
+                             "Выполнили": f"{len(data['done'].get(task.uid, {}))}/{len(data['members'])}"})
+            if not rows:
+                print("Общих задач нет.")
+                return
+            print(tabulate(rows, headers="keys", tablefmt="grid"))
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при просмотре общих задач: {e}")  #SCRUM-10
+
+    def change_shared_task_status(self, index: int):
+        """Меняет статус общей задачи (номер - как в view_shared_tasks) только для этого пользователя."""
+        try:  # SCRUM-10
+            shared = self.shared_tasks()
+            if not 0 <= index < len(shared):
+                print("Неверный индекс.")
+                return
+            name, task = shared[index]
+            SharedTaskList(name).set_completed(task.uid, self.user_name, not task.completed)
+            if task.completed:
+                print(f"Статус общей задачи \"{task.title}\" изменен на невыполненный.")
+            else:
+                print(f"Общая задача \"{task.title}\" отмечена как выполненная.")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка при изменении статуса общей задачи: {e}")  #SCRUM-10
+
+    def archive_completed_tasks(self, days: int = 30, codec: str = "xz"):
+        """Переносит задачи, выполненные более days дней назад, в сжатый сегмент архива и сохраняет файл задач."""
+        try:
+            threshold = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+            old_tasks = [task for task in self.tasks
+                         if task.completed and task.completed_at and task.completed_at < threshold]
+            if not old_tasks:
+                print(f"Нет задач, выполненных более {days} дней назад.")
+                return 0
+            segment = self.archive.append_segment([task.to_record() for task in old_tasks], codec)
+            archived = {task.uid for task in old_tasks}
+            self._archived_uids |= archived
+            self._commit(PersistentTaskList(task for task in self.tasks if task.uid not in archived),
+                         f"архивирование {len(old_tasks)} задач")
+            print(f"В архив ({segment}) перенесено задач: {len(old_tasks)}.")
+            self.save_to_file()
+            return len(old_tasks)
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка архивирования задач: {e}")  #SCRUM-10
+            return 0
+
+    def search_tasks(self, text: str, include_archive: bool = True):
+        """Ищет text в названии и описании задач. Возвращает список (где найдено, задача)."""
+        needle = text.lower()
+        sources = [("активные", self.tasks)]
+        if include_archive:
+            sources.append(("архив", self.iter_archived_tasks()))
+        return [(where, task) for where, tasks in sources for task in tasks
+                if needle in task.title.lower() or needle in task.description.lower()]
+
+    def view_search_results(self, text: str):
+        try:  # SCRUM-10
+            found = self.search_tasks(text)
+            if not found:
+                print("Задачи не найдены.")
+                return
+            rows = [{"Где": where, **task.to_dict(number)} for number, (where, task) in enumerate(found, start=1)]
+            print(tabulate(rows, headers="keys", tablefmt="grid"))
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка поиска задач: {e}")  #SCRUM-10
+
+    def save_report(self, fmt: str = "txt", compress: bool = False, tag_query: str = None):
+        try:
+            base_filename = f"{self.user_name.replace(' ', '_')}_report_task_completed"
+            tasks = self.all_tasks(load_shared_lists())
+            if tag_query:
+                tree = parse_tag_query(tag_query)
+                tasks = (task for task in tasks if match_tag_query(tree, task))
+            # Пустота проверяется по первой строке отчета: так учитываются и выполненные повторения серий
+            rows = completed_report_rows(tasks)
+            first = next(rows, None)
+            if first is None:
+                print("Нет выполненных задач для сохранения в отчете.")
+                return
+
+            with REPORT_WRITERS[fmt](base_filename, compress, self.user_name) as writer:
+                writer.write_section(itertools.chain([first], rows))
+            print(f"Отчет выполненных задач сохранен в файл \"{writer.filename}\".")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка сохранения отчета: {e}")  #SCRUM-10
+
+    def load_from_file(self):
+        try:
+            self.changes.recover_file(self.filename)  # События сохранения, прерванного сбоем
+            with FileLock(self.filename, shared=True) as lock:
+                if self.store is not None:
+                    self._loaded_partitions = set(self._partitions_to_load())
+                    self._loaded_partitions.add(datetime.now().strftime("%Y-%m"))
+                records = self._read_records()
+                self.file_version = lock.read_version()
+            self.tasks = [self.task_class.from_record(record) for record in records]
+            self.history.reset(self.tasks, "загрузка из файла")
+            self._renderer.invalidate()
+            self._base_tasks = self.tasks
+            self._saved_fields = {record["uid"]: self._fields(record) for record in records}
+            self.last_saved = not self.damaged_files
+            print(f"Список задач загружен из файла \"{self.filename}\".")
+            for path, damaged in self.damaged_files.items():
+                # Уцелевшие задачи загружены; копия поврежденного файла остается для разбора,
+                # а при сохранении файл будет перезаписан только целыми задачами
+                import shutil
+                shutil.copy2(path, path + ".corrupt")
+                print(f"Файл \"{path}\" поврежден: загружены уцелевшие задачи, потеряно записей: {damaged}. "
+                      f"Копия поврежденного файла: \"{path}.corrupt\". Сохраните задачи, чтобы исправить файл.")
+        except FileNotFoundError:
+            print(f"Файл \"{self.filename}\" не найден. Будет создан новый файл при сохранении.")
+        except json.JSONDecodeError:
+            print("Ошибка чтения данных из файла.")  #SCRUM-10
+        except Exception as e:  #SCRUM-10
+            print(f"Произошла ошибка при загрузке: {e}")  #SCRUM-10
+
+    def overdue_summary(self):
+        """Возвращает (число открытых задач, число просроченных из них)."""
+        open_count = 0
+        overdue_count = 0
+        for t in self.tasks:
+            if not t.completed:
+                open_count += 1
+                if t.remaining_time() == "[Срок истек]":
+                    overdue_count += 1
+        return open_count, overdue_count
+
+    # SCRUM-6: Методы уведомления об открытых или просроченных задачах вызывается при входе в меню (например, в main)
+    def notify_overdue_tasks(self):
+        """
+        SCRUM-6: Подсчитывает, сколько открытых задач, и сколько из них просрочено.
+        Выводит сообщение пользователю.
+        """
+        open_count, overdue_count = self.overdue_summary()
+        if open_count > 0:
+            print(f"У вас есть {open_count} открытых задач.")
+            if overdue_count > 0:
+                print(f"Из них {overdue_count} просрочены!\n")
+            else:
+                print("Просроченных задач нет.\n")
+
+
+class UserManager:
+    def __init__(self):
+        self.filename = "users.txt"
+        self.file_version = 0
+        self._base_users = []
+        self._users = None  # users.txt читается при первом обращении к self.users
+        self.changes = CHANGE_FEED
+        self.deadline_index = DEADLINE_INDEX
+        self.analytics = TaskAnalytics()
+
+    @property
+    def users(self) -> List[str]:
+        if self._users is None:
+            self._users = self.load_users()
+        return self._users
+
+    @users.setter
+    def users(self, value: List[str]):
+        self._users = value
+
+    def add_user(self, first_name: str, last_name: str):
+        user_name = f"{first_name} {last_name}"
+        if user_name in self.users:
+            print(f"Пользователь {user_name} уже существует.")
+        else:
+            self.users.append(user_name)
+            self.save_users()
+            print(f"Пользователь {user_name} добавлен.")
+
+    def remove_user(self, user_name: str):
+        if user_name in self.users:
+            self.users.remove(user_name)
+            self.save_users()
+            print(f"Пользователь {user_name} удален.")
+        else:
+            print("Такого пользователя не существует.")
+
+    def list_users(self):
+        if not self.users:
+            print("Список пользователей пуст.")
+        else:
+            print("=" * 36)
+            print("Список пользователей:")
+            for i, user in enumerate(self.users, 1):
+                print(f"{i}. {user}")
+        print("=" * 36)
+
+    def _read_users(self):
+        with open(self.filename, 'r', encoding='utf-8') as file:
+            return [line.strip() for line in file if line.strip()]
+
+    def save_users(self):
+        try:  #SCRUM-10
+            with FileLock(self.filename) as lock:
+                current_version = lock.read_version()
+                if current_version != self.file_version and os.path.exists(self.filename):
+                    # Список изменен в другом сеансе: сохраняем чужие добавления и удаления вместе с нашими
+                    theirs = self._read_users()
+                    removed = set(self._base_users) - set(self.users)
+                    merged = [user for user in theirs if user not in removed]
+                    merged += [user for user in self.users if user not in self._base_users and user not in merged]
+                    self.users = merged
+                    _update_lock_stats(merged_saves=1)
+                base = set(self._base_users)
+                events = [{"type": "user_removed", "user": user} for user in self._base_users if user not in self.users]
+                events += [{"type": "user_added", "user": user} for user in self.users if user not in base]
+                with self.changes.recording(self.filename, current_version + 1, events):
+                    WRITE_COORDINATOR.write([(self.filename, "\n".join(self.users).encode("utf-8"))])
+                    self.file_version = current_version + 1
+                    lock.write_version(self.file_version)
+                for user in self._base_users:
+                    if user not in self.users:
+                        self.deadline_index.update_user(user, [])
+            self._base_users = list(self.users)
+            print("Список пользователей сохранен.")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка сохранения списка пользователей: {e}")  #SCRUM-10
+
+    def load_users(self):
+        if os.path.exists(self.filename):
+            try:  #SCRUM-10
+                self.changes.recover_file(self.filename)  # События сохранения, прерванного сбоем
+                with FileLock(self.filename, shared=True) as lock:
+                    users = self._read_users()
+                    self.file_version = lock.read_version()
+                self._base_users = list(users)
+                return users
+            except Exception as e:  #SCRUM-10
+                print(f"Ошибка загрузки списка пользователей: {e}")  #SCRUM-10
+        return []
+
+    def save_report_all_users(self, fmt: str = "txt", compress: bool = False,
+                              created_from: str = None, created_to: str = None, tag_query: str = None):
+        """
+        Общий отчет о выполненных задачах по согласованному снимку данных всех пользователей (ReportSnapshot).
+        Если задан период создания задач (created_from/created_to, "ГГГГ-ММ" или "ГГГГ-ММ-ДД"),
+        читаются только подходящие месяцы хранилища и сегменты архива.
+        tag_query - отбор задач по тегам и проектам (см. TAG_QUERY_HELP).
+        """
+        try:  #SCRUM-10
+            tree = parse_tag_query(tag_query) if tag_query else None
+            with SHARED_STRING_POOL, ReportSnapshot(self.users) as snapshot, REPORT_WRITERS[fmt]("report", compress) as writer:
+                shared_lists = load_shared_lists(snapshot.shared_directory)  # Один раз на весь отчет
+                for user_name in snapshot.users:
+                    shared = [task for data in shared_lists.values() for task in SharedTaskList.tasks_for(data, user_name)
+                              if _in_range(task.created_at, created_from, created_to)]
+                    records = read_user_records(user_name, created_from, created_to, directory=snapshot.path)
+                    active = {Task.from_record(record).uid for record in records}
+                    archived = [record for record in TaskArchive(user_name, snapshot.path).iter_records(
+                        created_from=created_from, created_to=created_to) if record.get("uid") not in active]
+                    tasks = itertools.chain((CompactTask.from_record(record) for record in archived + records), shared)
+                    if tree is not None:
+                        tasks = (task for task in tasks if match_tag_query(tree, task))
+                    writer.write_section(completed_report_rows(tasks), user_name)
+            print(f"Общий отчет о выполненных задачах всех пользователей сохранен в файл \"{writer.filename}\" "
+                  f"(снимок данных: {snapshot.files} файлов за {snapshot.seconds * 1000:.0f} мс).")
+        except Exception as e:  #SCRUM-10
+            print(f"Ошибка сохранения общего отчета: {e}")  #SCRUM-10
+
+class ThreadSafeTaskManager(TaskManager):
+    """
+    Потокобезопасный TaskManager: просмотр, отчеты и проверка сроков выполняются параллельно
+    под блокировкой чтения, изменения списка задач - по одному под блокировкой записи.
+    """
+
+    def __init__(self, user_name: str, compact: bool = False, history_depth: int = 50,
+                 partitioned: bool = None, window_months: int = None):
+        self._rw_lock = ReadWriteLock()
+        with self._rw_lock.write_locked():
+            super().__init__(user_name, compact, history_depth, partitioned, window_months)
+
+    add_task = _synchronized("write")(TaskManager.add_task)
+    remove_task = _synchronized("write")(TaskManager.remove_task)
+    change_task_status = _synchronized("write")(TaskManager.change_task_status)
+    set_task_deadline = _synchronized("write")(TaskManager.set_task_deadline)
+    set_task_recurrence = _synchronized("write")(TaskManager.set_task_recurrence)
+    set_task_tags = _synchronized("write")(TaskManager.set_task_tags)
+    set_task_priority = _synchronized("write")(TaskManager.set_task_priority)
+    top_tasks = _synchronized("read")(TaskManager.top_tasks)
+    view_top_tasks = _synchronized("read")(TaskManager.view_top_tasks)
+    add_task_dependency = _synchronized("write")(TaskManager.add_task_dependency)
+    remove_task_dependency = _synchronized("write")(TaskManager.remove_task_dependency)
+    ready_tasks = _synchronized("read")(TaskManager.ready_tasks)
+    blocked_tasks = _synchronized("read")(TaskManager.blocked_tasks)
+    view_dependencies = _synchronized("read")(TaskManager.view_dependencies)
+    view_shared_tasks = _synchronized("read")(TaskManager.view_shared_tasks)
+    change_shared_task_status = _synchronized("write")(TaskManager.change_shared_task_status)
+    filter_by_tags = _synchronized("read")(TaskManager.filter_by_tags)
+    view_occurrences = _synchronized("read")(TaskManager.view_occurrences)
+    bulk_set_status = _synchronized("write")(TaskManager.bulk_set_status)
+    bulk_set_deadline = _synchronized("write")(TaskManager.bulk_set_deadline)
+    bulk_shift_deadline = _synchronized("write")(TaskManager.bulk_shift_deadline)
+    bulk_remove = _synchronized("write")(TaskManager.bulk_remove)
+    undo = _synchronized("write")(TaskManager.undo)
+    redo = _synchronized("write")(TaskManager.redo)
+    load_from_file = _synchronized("write")(TaskManager.load_from_file)
+    merge_from_file = _synchronized("write")(TaskManager.merge_from_file)
+    save_to_file = _synchronized("write")(TaskManager.save_to_file)
+    view_tasks = _synchronized("read")(TaskManager.view_tasks)
+    view_tasks_as_of = _synchronized("read")(TaskManager.view_tasks_as_of)
+    archive_completed_tasks = _synchronized("write")(TaskManager.archive_completed_tasks)
+    search_tasks = _synchronized("read")(TaskManager.search_tasks)
+    save_report = _synchronized("read")(TaskManager.save_report)
+    overdue_summary = _synchronized("read")(TaskManager.overdue_summary)
+    notify_overdue_tasks = _synchronized("read")(TaskManager.notify_overdue_tasks)
+
+
+class ThreadSafeUserManager(UserManager):
+    """Потокобезопасный UserManager с той же схемой блокировок, что и ThreadSafeTaskManager."""
+
+    def __init__(self):
+        self._rw_lock = ReadWriteLock()
+        with self._rw_lock.write_locked():
+            super().__init__()
+
+    add_user = _synchronized("write")(UserManager.add_user)
+    remove_user = _synchronized("write")(UserManager.remove_user)
+    save_users = _synchronized("write")(UserManager.save_users)
+    list_users = _synchronized("read")(UserManager.list_users)
+    save_report_all_users = _synchronized("read")(UserManager.save_report_all_users)
+
+
+class TimerWheel:
+    """
+    Иерархическое колесо таймеров: levels уровней по slots ячеек, один тик = tick_seconds.
+    Таймер на уровне L попадает в ячейку по due // slots**L, при переходе границы уровня
+    ячейка перераспределяется на нижние уровни. Добавление и отмена - O(1),
+    перераспределение - амортизированно O(1) на таймер.
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 64, levels: int = 5, start: float = None):
+        self.tick_seconds = tick_seconds
+        self.slots = slots
+        self.levels = levels
+        self.current_tick = int((start if start is not None else time.time()) // tick_seconds)
+        self._wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._overflow = {}  # Таймеры дальше полного оборота верхнего уровня
+        self._buckets = {}  # handle -> ячейка, в которой сейчас лежит таймер
+        self._handles = itertools.count(1)
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def schedule(self, when: float, payload) -> int:
+        """Планирует payload на момент when (timestamp). Возвращает идентификатор для cancel()."""
+        handle = next(self._handles)
+        self._place(handle, max(int(when // self.tick_seconds), self.current_tick), payload)
+        return handle
+
+    def cancel(self, handle: int) -> bool:
+        bucket = self._buckets.pop(handle, None)
+        if bucket is None:
+            return False
+        del bucket[handle]
+        return True
+
+    def _place(self, handle: int, due_tick: int, payload):
+        delta = due_tick - self.current_tick
+        bucket = self._overflow
+        for level in range(self.levels):
+            if delta < self.slots ** (level + 1):
+                bucket = self._wheels[level][(due_tick // self.slots ** level) % self.slots]
+                break
+        bucket[handle] = (due_tick, payload)
+        self._buckets[handle] = bucket
+
+    def _cascade(self, bucket: dict):
+        entries = list(bucket.items())
+        bucket.clear()
+        for handle, (due_tick, payload) in entries:
+            self._place(handle, due_tick, payload)
+
+    def advance(self, now: float = None) -> list:
+        """Продвигает колесо до момента now и возвращает payload всех сработавших таймеров."""
+        target_tick = int((now if now is not None else time.time()) // self.tick_seconds)
+        fired = []
+        while self.current_tick <= target_tick:
+            if not self._buckets:
+                self.current_tick = target_tick + 1
+                break
+            bucket = self._wheels[0][self.current_tick % self.slots]
+            for handle, (_, payload) in bucket.items():
+                del self._buckets[handle]
+                fired.append(payload)
+            bucket.clear()
+            self.current_tick += 1
+            for level in range(1, self.levels):
+                if self.current_tick % self.slots ** level:
+                    break
+                self._cascade(self._wheels[level][(self.current_tick // self.slots ** level) % self.slots])
+            if self.current_tick % self.slots ** self.levels == 0:
+                self._cascade(self._overflow)
+        return fired
+
+
+class LogFileSink:
+    """Приемник событий планировщика: дописывает события строками JSON в лог-файл."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def emit(self, event: dict):
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+class UnixSocketSink:
+    """Приемник событий планировщика: отправляет события датаграммами в локальный UNIX-сокет."""
+
+    def __init__(self, path: str):
+        import socket
+        self.path = path
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+    def emit(self, event: dict):
+        try:
+            self._socket.sendto(json.dumps(event, ensure_ascii=False).encode("utf-8"), self.path)
+        except OSError as e:
+            print(f"Ошибка отправки события в сокет \"{self.path}\": {e}")
+
+
+def make_event_sink(spec: str):
+    """Создает приемник по описанию "log:<путь>" или "socket:<путь>"."""
+    kind, _, path = spec.partition(":")
+    if kind == "log" and path:
+        return LogFileSink(path)
+    if kind == "socket" and path:
+        return UnixSocketSink(path)
+    raise ValueError(f"Неизвестный приемник событий: {spec}")
+
+
+class ChangeFeedConsumer:
+    """
+    Эталонный потребитель журнала изменений: передает новые события в sink (лог-файл или
+    UNIX-сокет, см. make_event_sink) и после каждой порции запоминает последний переданный seq
+    в файле "<каталог журнала>/consumers/<name>.checkpoint". После перезапуска чтение
+    продолжается с этого места, уже переданные события повторно не отправляются.
+    """
+
+    def __init__(self, feed: ChangeFeed, name: str, sink, batch_size: int = 1000):
+        self.feed = feed
+        self.sink = sink
+        self.batch_size = batch_size
+        self.checkpoint_path = os.path.join(feed.path, "consumers", f"{name}.checkpoint")
+        self.position = self._load_checkpoint()
+
+    def _load_checkpoint(self) -> int:
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as file:
+                return int(file.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _save_checkpoint(self):
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        with open(self.checkpoint_path + ".tmp", 'w', encoding='utf-8') as file:
+            file.write(str(self.position))
+        os.replace(self.checkpoint_path + ".tmp", self.checkpoint_path)
+
+    def poll(self) -> int:
+        """Передает все накопившиеся события; возвращает их число."""
+        delivered = 0
+        while True:
+            batch = list(self.feed.read(self.position, self.batch_size))
+            if not batch:
+                return delivered
+            for event in batch:
+                self.sink.emit(event)
+            self.position = batch[-1]["seq"]
+            self._save_checkpoint()
+            delivered += len(batch)
+
+    def run(self, poll_interval: float = 1.0, stop_event: threading.Event = None):
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            self.poll()
+            stop_event.wait(poll_interval)
+
+
+class DeadlineScheduler:
+    """
+    Планировщик сроков для всех пользователей из users.txt.
+    Держит сроки открытых задач в колесе таймеров и отправляет в sink событие "overdue"
+    в момент истечения срока и "due_soon" за каждый из lead_minutes до него.
+    Файлы задач перечитываются только при изменении (по mtime и размеру).
+    """
+
+    def __init__(self, sink, lead_minutes=(), poll_interval: float = 30.0, tick_seconds: float = 1.0):
+        self.sink = sink
+        self.lead_minutes = tuple(lead_minutes)
+        self.poll_interval = poll_interval
+        self.wheel = TimerWheel(tick_seconds)
+        self._timers = {}  # пользователь -> идентификаторы его таймеров
+        self._file_states = {}  # пользователь -> (mtime, размер) прочитанного файла
+
+    def reschedule_user(self, user_name: str, records: List[dict], now: float = None):
+        now = now if now is not None else time.time()
+        for handle in self._timers.pop(user_name, []):
+            self.wheel.cancel(handle)
+        handles = []
+        for record in records:
+            if record.get("completed") or not record.get("deadline"):
+                continue
+            try:
+                deadline = datetime.strptime(record["deadline"], "%Y-%m-%d %H:%M:%S").timestamp()
+            except (TypeError, ValueError):
+                continue
+            for lead in (0,) + self.lead_minutes:
+                when = deadline - lead * 60
+                if when <= now:
+                    continue
+                handles.append(self.wheel.schedule(when, {
+                    "event": "overdue" if lead == 0 else "due_soon",
+                    "lead_minutes": lead,
+                    "user": user_name,
+                    "uid": record.get("uid"),
+                    "title": record.get("title"),
+                    "deadline": record["deadline"],
+                }))
+        self._timers[user_name] = handles
+
+    def sync_users(self):
+        users = UserManager().users
+        for user_name in set(self._timers) - set(users):
+            for handle in self._timers.pop(user_name):
+                self.wheel.cancel(handle)
+            self._file_states.pop(user_name, None)
+        for user_name in users:
+            state = user_data_state(user_name)
+            if state[0] is None or self._file_states.get(user_name) == state:
+                continue
+            try:
+                # Месяцы, где все сроки открытых задач уже прошли, не читаются: событий по ним больше не будет
+                deadlines_after = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                self.reschedule_user(user_name, read_user_records(user_name, open_only=True,
+                                                                  deadlines_after=deadlines_after))
+                self._file_states[user_name] = state
+            except (OSError, ValueError) as e:
+                print(f"Ошибка чтения задач пользователя {user_name}: {e}")
+
+    def run(self, stop_event: threading.Event = None):
+        stop_event = stop_event or threading.Event()
+        next_sync = 0.0
+        while not stop_event.is_set():
+            now = time.time()
+            if now >= next_sync:
+                self.sync_users()
+                next_sync = now + self.poll_interval
+            for event in self.wheel.advance(now):
+                event["fired_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                self.sink.emit(event)
+            stop_event.wait(self.wheel.tick_seconds)
+
+
+def _percentiles(values, quantiles):
+    """Перцентили (линейная интерполяция); при наличии numpy считаются векторно."""
+    if not values:
+        return [None] * len(quantiles)
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+    if numpy is not None:
+        return [float(value) for value in numpy.percentile(numpy.asarray(values, dtype=float), quantiles)]
+    ordered = sorted(values)
+    result = []
+    for quantile in quantiles:
+        position = (len(ordered) - 1) * quantile / 100
+        lower = int(position)
+        upper = min(lower + 1, len(ordered) - 1)
+        result.append(ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower))
+    return result
+
+
+class TaskAnalytics:
+    """
+    Метрики выполнения задач: доля выполненных, время выполнения (created_at -> completed_at),
+    доля просроченных и число выполненных задач по неделям - для каждого пользователя и в целом.
+    Файл каждого пользователя (вместе с архивом) читается за один проход; промежуточные итоги кэшируются
+    и пересчитываются только для пользователей, чьи файлы изменились.
+    """
+
+    TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self):
+        self._rollups = {}  # пользователь -> ((mtime, размер) файла, промежуточные итоги)
+
+    def _parse(self, value):
+        try:
+            return datetime.strptime(value, self.TIME_FORMAT) if value else None
+        except (TypeError, ValueError):
+            return None
+
+    def _rollup(self, records: List[dict]) -> dict:
+        rollup = {
+            "tasks": 0,
+            "completed": 0,
+            "with_deadline": 0,
+            "completed_late": 0,
+            "open_deadlines": [],
+            "lead_times": [],
+            "weekly": Counter(),
+        }
+        for record in records:
+            rollup["tasks"] += 1
+            deadline = self._parse(record.get("deadline"))
+            if deadline:
+                rollup["with_deadline"] += 1
+            if not record.get("completed"):
+                if deadline:
+                    rollup["open_deadlines"].append(deadline.timestamp())
+                continue
+            rollup["completed"] += 1
+            completed_at = self._parse(record.get("completed_at"))
+            if not completed_at:
+                continue
+            created_at = self._parse(record.get("created_at"))
+            if created_at:
+                rollup["lead_times"].append((completed_at - created_at).total_seconds())
+            if deadline and completed_at > deadline:
+                rollup["completed_late"] += 1
+            year, week, _ = completed_at.isocalendar()
+            rollup["weekly"][f"{year}-W{week:02}"] += 1
+        rollup["open_deadlines"].sort()
+        return rollup
+
+    def refresh(self, users: List[str]):
+        """Обновляет кэш: перечитывает только файлы, изменившиеся с прошлого вызова."""
+        for user_name in set(self._rollups) - set(users):
+            del self._rollups[user_name]
+        for user_name in users:
+            state = user_data_state(user_name)
+            cached = self._rollups.get(user_name)
+            if cached and cached[0] == state:
+                continue
+            try:
+                records = read_user_records(user_name)
+                active = {Task.from_record(record).uid for record in records}
+                records += [record for record in TaskArchive(user_name).iter_records() if record.get("uid") not in active]
+                self._rollups[user_name] = (state, self._rollup(records))
+            except (OSError, ValueError) as e:
+                print(f"Ошибка чтения задач пользователя {user_name}: {e}")
+
+    def _metrics(self, rollups: List[dict], now: float) -> dict:
+        tasks = sum(r["tasks"] for r in rollups)
+        completed = sum(r["completed"] for r in rollups)
+        with_deadline = sum(r["with_deadline"] for r in rollups)
+        overdue = sum(r["completed_late"] + bisect.bisect_left(r["open_deadlines"], now) for r in rollups)
+        lead_times = [value for r in rollups for value in r["lead_times"]]
+        weekly = Counter()
+        for r in rollups:
+            weekly.update(r["weekly"])
+        lead_hours = [None if value is None else round(value / 3600, 2)
+                      for value in _percentiles(lead_times, self.PERCENTILES)]
+        return {
+            "tasks": tasks,
+            "completed": completed,
+            "completion_rate": round(completed / tasks, 4) if tasks else 0.0,
+            "overdue_ratio": round(overdue / with_deadline, 4) if with_deadline else 0.0,
+            **{f"lead_time_p{q}_hours": value for q, value in zip(self.PERCENTILES, lead_hours)},
+            "weekly_throughput": dict(sorted(weekly.items())),
+        }
+
+    def compute(self, users: List[str], now: float = None) -> dict:
+        self.refresh(users)
+        now = now if now is not None else time.time()
+        return {
+            "users": {user: self._metrics([self._rollups[user][1]], now) for user in users if user in self._rollups},
+            "total": self._metrics([rollup for _, rollup in self._rollups.values()], now),
+        }
+
+    @staticmethod
+    def table_rows(result: dict) -> List[dict]:
+        rows = []
+        for name, metrics in list(result["users"].items()) + [("ВСЕГО", result["total"])]:
+            weeks = metrics["weekly_throughput"]
+            row = {"user": name}
+            row.update({key: value for key, value in metrics.items() if key != "weekly_throughput"})
+            row["avg_weekly_throughput"] = round(sum(weeks.values()) / len(weeks), 2) if weeks else 0.0
+            rows.append(row)
+        return rows
+
+    def export(self, result: dict, path: str):
+        """Экспорт результатов: .csv - таблица по пользователям, иначе полный JSON."""
+        if path.endswith(".csv"):
+            import csv
+            rows = self.table_rows(result)
+            with open(path, 'w', encoding='utf-8', newline='') as file:
+                writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(result, file, ensure_ascii=False, indent=4)
+
+
+LEGACY_SCRIPTS = {
+    "TaskManager.py": "old",  # Первая версия: без users.txt, имена файлов с пробелами, срок в часах
+    "TaskManager4.py": "viktor",
+    "TaskManager_Last_version.py": "1.0",
+}
+LEGACY_DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S.%f",
+                       "%Y-%m-%d %H:%M", "%H:%M %d.%m.%Y", "%d.%m.%Y %H:%M", "%d.%m.%Y %H:%M:%S", "%Y-%m-%d")
+
+
+def discover_legacy_sources(roots: List[str]) -> List[dict]:
+    """
+    Находит каталоги с файлами *_tasks.json и определяет их формат по файлу программы.
+    Возвращает задания миграции: файл задач, имя пользователя, формат каталога.
+    """
+    sources = []
+    for root in roots:
+        for directory, _, files in sorted(os.walk(root)):
+            task_files = sorted(name for name in files if name.endswith("_tasks.json"))
+            if not task_files:
+                continue
+            layout = next((LEGACY_SCRIPTS[name] for name in files if name in LEGACY_SCRIPTS), "unknown")
+            registered = {}
+            if "users.txt" in files:
+                with open(os.path.join(directory, "users.txt"), 'r', encoding='utf-8-sig') as file:
+                    registered = {task_filename(line.strip()): line.strip() for line in file if line.strip()}
+            for name in task_files:
+                # В первой версии имя файла - имя пользователя как есть (с пробелами или "_")
+                user_name = registered.get(name) or name[:-len("_tasks.json")].replace("_", " ").strip()
+                sources.append({"path": os.path.join(directory, name), "user": user_name, "layout": layout})
+    return sources
+
+
+def normalize_timestamp(value):
+    """Приводит дату из старых версий к формату "ГГГГ-ММ-ДД ЧЧ:ММ:СС"; некорректную заменяет на None."""
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value).strftime("%Y-%m-%d %H:%M:%S")
+    for date_format in LEGACY_DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip(), date_format).strftime("%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            continue
+    return None
+
+
+def normalize_legacy_record(data, fallback_created_at: str):
+    """Проверяет и нормализует запись задачи из старой версии. Возвращает запись или None, если она непригодна."""
+    if not isinstance(data, dict) or not str(data.get("title") or "").strip():
+        return None
+    completed = data.get("completed")
+    if isinstance(completed, str):
+        completed = completed.strip().lower() in ("true", "1", "yes", "x", "[x]")
+    completed = bool(completed)
+    created_at = normalize_timestamp(data.get("created_at")) or fallback_created_at
+    completed_at = normalize_timestamp(data.get("completed_at")) if completed else None
+    return Task(
+        str(data["title"]).strip(),
+        str(data.get("description") or "").strip(),
+        completed,
+        created_at,
+        completed_at,
+        normalize_timestamp(data.get("deadline")),
+        data.get("uid") or None,
+    ).to_record()
+
+
+def records_checksum(records: List[dict]) -> str:
+    import hashlib
+    canonical = json.dumps(records, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def append_task_records(filename: str, records: List[dict], user_name: str = None, index: DeadlineIndex = None) -> int:
+    """
+    Добавляет записи в файл задач под эксклюзивной блокировкой, пропуская задачи с уже имеющимися uid.
+    Если передан index, сроки задач пользователя user_name в нем заменяются сроками из обновленного файла.
+    """
+    with FileLock(filename) as lock:
+        existing = []
+        if os.path.exists(filename):
+            existing = read_records_file(filename)[0]
+        known = {Task.from_record(record).uid for record in existing}
+        new_records = [record for record in records if record["uid"] not in known]
+        if new_records:
+            WRITE_COORDINATOR.write([(filename, dump_task_records(existing + new_records))])
+            lock.write_version(lock.read_version() + 1)
+            if index is not None:
+                index.update_user(user_name, [Task.from_record(record).to_record() for record in existing + new_records])
+    return len(new_records)
+
+
+class LegacyMigrator:
+    """
+    Перенос данных из каталогов старых версий TaskManager в текущее хранилище target.
+    Файлы обрабатываются пулом потоков; записи проверяются и нормализуются, дубликаты (по uid)
+    пропускаются. Обработанные файлы с их sha256 записываются в migration_state.json,
+    поэтому прерванную миграцию можно запустить повторно - готовые файлы не перечитываются.
+    """
+
+    STATE_FILENAME = "migration_state.json"
+    REPORT_FILENAME = "migration_report.txt"
+
+    def __init__(self, target: str = ".", workers: int = 4):
+        self.target = target
+        self.workers = workers
+        self.state_path = os.path.join(target, self.STATE_FILENAME)
+        self.deadline_index = DeadlineIndex(os.path.join(target, "deadline_index"))
+        self._state_lock = threading.Lock()
+        self.state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as file:
+                self.state = json.load(file)
+
+    def _save_state(self):
+        temporary_path = self.state_path + ".tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump(self.state, file, ensure_ascii=False, indent=4)
+        os.replace(temporary_path, self.state_path)
+
+    def migrate_source(self, source: dict) -> dict:
+        import hashlib
+        with open(source["path"], 'rb') as file:
+            raw = file.read()
+        source_sha256 = hashlib.sha256(raw).hexdigest()
+        done = self.state.get(os.path.abspath(source["path"]))
+        if done and done["source_sha256"] == source_sha256:
+            return {**done, "status": "пропущен (уже перенесен)"}
+
+        result = {"source": source["path"], "layout": source["layout"], "user": source["user"],
+                  "source_sha256": source_sha256, "read": 0, "migrated": 0, "duplicates": 0, "rejected": 0}
+        try:
+            data = json.loads(raw.decode("utf-8-sig"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            return {**result, "status": f"ошибка чтения: {e}", "checksum": ""}
+        if not isinstance(data, list):
+            data = [data]
+        fallback_created_at = datetime.fromtimestamp(os.path.getmtime(source["path"])).strftime("%Y-%m-%d %H:%M:%S")
+        records = []
+        for item in data:
+            result["read"] += 1
+            record = normalize_legacy_record(item, fallback_created_at)
+            if record is None:
+                result["rejected"] += 1
+            else:
+                records.append(record)
+        result["migrated"] = append_task_records(os.path.join(self.target, task_filename(source["user"])), records,
+                                                 source["user"], self.deadline_index)
+        result["duplicates"] = len(records) - result["migrated"]
+        result["checksum"] = records_checksum(records)
+        result["status"] = "перенесен"
+        with self._state_lock:
+            self.state[os.path.abspath(source["path"])] = result
+            self._save_state()
+        return result
+
+    def run(self, roots: List[str]) -> List[dict]:
+        from concurrent.futures import ThreadPoolExecutor
+
+        sources = discover_legacy_sources(roots)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(self.migrate_source, sources))
+
+        user_manager = UserManager()
+        user_manager.filename = os.path.join(self.target, "users.txt")
+        new_users = [user for user in dict.fromkeys(r["user"] for r in results) if user not in user_manager.users]
+        if new_users:
+            user_manager.users = user_manager.users + new_users
+            user_manager.save_users()
+        self.write_report(results)
+        return results
+
+    def write_report(self, results: List[dict]):
+        columns = ("source", "layout", "user", "read", "migrated", "duplicates", "rejected", "status", "checksum")
+        rows = [{column: result.get(column, "") for column in columns} for result in results]
+        totals = {column: sum(result.get(column, 0) for result in results)
+                  for column in ("read", "migrated", "duplicates", "rejected")}
+        rows.append({"source": "ИТОГО", **totals})
+        with open(os.path.join(self.target, self.REPORT_FILENAME), 'w', encoding='utf-8') as file:
+            file.write(f"Отчет о миграции от {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            file.write(tabulate(rows, headers="keys", tablefmt="grid"))
+            file.write("\n")
+
+
+def print_deadline_overview(index: DeadlineIndex, hours: float = 24):
+    """Таблицы просроченных и срочных (срок в ближайшие hours часов) задач всех пользователей по общему индексу."""
+    now = datetime.now()
+    for caption, entries in (("Просроченные задачи", index.overdue(now)),
+                             (f"Срок в ближайшие {hours:g} ч.", index.due_soon(hours, now))):
+        print(f"{caption}: {len(entries)}")
+        if entries:
+            rows = [{"Срок": entry["deadline"], "Пользователь": entry["user"], "Название задачи": entry["title"]}
+                    for entry in entries]
+            print(tabulate(rows, headers="keys", tablefmt="grid"))
+
+
+def convert_to_partitions(user_name: str):
+    """Переводит файл задач пользователя на хранение по месяцам; исходный файл переименовывается в *.bak."""
+    filename = task_filename(user_name)
+    store = PartitionedTaskStore(user_name)
+    if store.exists():
+        print(f"Задачи пользователя {user_name} уже хранятся по месяцам.")
+        return
+    if not os.path.exists(filename):
+        print(f"Файл \"{filename}\" не найден.")
+        return
+    with FileLock(filename):
+        records = [Task.from_record(data).to_record() for data in read_records_file(filename)[0]]
+        os.makedirs(store.path, exist_ok=True)
+        with FileLock(store.manifest_path):
+            store.write(records, set())
+        os.replace(filename, filename + ".bak")
+    print(f"Задачи пользователя {user_name} разбиты по месяцам: {len(store.manifest())} в \"{store.path}\".")
+
+
+def share_duplicate_tasks(name: str, users: List[str], min_users: int = 2) -> int:
+    """
+    Переносит задачи, скопированные нескольким (не менее min_users) из users пользователям - одинаковые
+    название и описание, - в общий список name: задача хранится один раз и назначается владельцам копий,
+    отметки выполнения копий становятся отметками участников, копии удаляются.
+    Повторяющиеся задачи и задачи с зависимостями не переносятся. Возвращает число общих задач.
+    """
+    managers = [TaskManager(user_name) for user_name in users]
+    copies = {}  # (название, описание) -> {пользователь: [копии]}
+    for manager in managers:
+        for task in manager.tasks:
+            if task.recurrence or task.depends_on:
+                continue
+            copies.setdefault((task.title, task.description), {}).setdefault(manager.user_name, []).append(task)
+    common = {key: owners for key, owners in copies.items() if len(owners) >= max(2, min_users)}
+    if not common:
+        print("Задач, скопированных нескольким пользователям, не найдено.")
+        return 0
+    shared = SharedTaskList(name)
+    members = shared.add_members([user_name for user_name in users
+                                  if any(user_name in owners for owners in common.values())])["members"]
+    moved = set()
+    for (title, description), owners in common.items():
+        done = {}
+        for user_name, tasks in owners.items():
+            completed = [task.completed_at or "" for task in tasks if task.completed]
+            if completed:
+                done[user_name] = max(completed) or None
+            moved.update(task.uid for task in tasks)
+        created_at = min(task.created_at for tasks in owners.values() for task in tasks)
+        shared.add_task(title, description, done, None if set(owners) == set(members) else list(owners), created_at)
+    for manager in managers:
+        if not any(manager.user_name in owners for owners in common.values()):
+            continue
+        remaining = PersistentTaskList(task for task in manager.tasks if task.uid not in moved)
+        manager._commit(remaining, f"перенос задач в общий список \"{name}\"")
+        manager.save_to_file()
+    print(f"В общий список \"{name}\" перенесено задач: {len(common)} (удалено копий: {len(moved)}).")
+    return len(common)
+
+
+def check_user_data(user_name: str, repair: bool = False) -> dict:
+    """
+    Проверка данных одного пользователя для fsck: файл задач или месяцы с оглавлением (контрольные суммы
+    записей, повторяющиеся uid, совпадение оглавления с файлами) и сегменты архива. repair=True
+    перезаписывает поврежденные файлы уцелевшими записями (копия - "*.corrupt") и добавляет контрольные
+    суммы записям старых версий. Выполняется в процессах пула, поэтому возвращает только словарь.
+    """
+    result = {"Пользователь": user_name, "Файлов": 0, "Задач": 0, "Повреждено": 0, "Без суммы": 0,
+              "Проблемы": [], "Исправлено": []}
+
+    def check(path: str):
+        records, damaged, unsigned, intact = read_records_file(path)
+        result["Файлов"] += 1
+        result["Задач"] += len(records)
+        result["Повреждено"] += damaged
+        result["Без суммы"] += unsigned
+        if not intact:
+            result["Проблемы"].append(f"{os.path.basename(path)}: файл не разбирается, извлечено записей {len(records)}")
+        elif damaged:
+            result["Проблемы"].append(f"{os.path.basename(path)}: неверная контрольная сумма у {damaged} записей")
+        unique = {}
+        for record in records:
+            unique.setdefault(Task.from_record(record).uid, record)
+        if len(unique) != len(records):
+            result["Проблемы"].append(f"{os.path.basename(path)}: повторяющихся uid {len(records) - len(unique)}")
+        needs_repair = damaged or not intact or unsigned or len(unique) != len(records)
+        if needs_repair and repair and (damaged or not intact):
+            import shutil
+            shutil.copy2(path, path + ".corrupt")
+        return [Task.from_record(record).to_record() for record in unique.values()], needs_repair
+
+    store = PartitionedTaskStore(user_name)
+    filename = task_filename(user_name)
+    if store.exists():
+        with FileLock(store.manifest_path, shared=not repair) as lock:
+            months = sorted(name[:-len(".json")] for name in os.listdir(store.path)
+                            if name.endswith(".json") and name != "manifest.json")
+            records, needs_repair = [], False
+            for month in months:
+                found, broken = check(os.path.join(store.path, f"{month}.json"))
+                records.extend(found)
+                needs_repair = needs_repair or broken
+            try:
+                manifest = store.manifest()
+            except ValueError:
+                manifest = None
+            if manifest is None:
+                result["Проблемы"].append("manifest.json не разбирается")
+                needs_repair = True
+            elif sorted(manifest) != months or any(
+                    manifest[month]["count"] != sum(1 for record in records if store.partition_of(record) == month)
+                    for month in months):
+                result["Проблемы"].append("оглавление не совпадает с файлами месяцев")
+                needs_repair = True
+            if repair and needs_repair:
+                store.write(records, months)
+                lock.write_version(lock.read_version() + 1)  # Открытые сеансы объединят изменения при сохранении
+                DEADLINE_INDEX.update_user(user_name, records)
+                result["Исправлено"].append(f"месяцы и оглавление перезаписаны ({len(records)} задач)")
+    elif os.path.exists(filename):
+        with FileLock(filename, shared=not repair) as lock:
+            records, needs_repair = check(filename)
+            if repair and needs_repair:
+                write_file_durable(filename, dump_task_records(records))
+                lock.write_version(lock.read_version() + 1)  # Открытые сеансы объединят изменения при сохранении
+                DEADLINE_INDEX.update_user(user_name, records)
+                result["Исправлено"].append(f"файл перезаписан ({len(records)} задач)")
+
+    archive = TaskArchive(user_name)
+    try:
+        segments = archive.segments()
+    except ValueError:
+        segments = []
+        result["Проблемы"].append("оглавление архива не разбирается")
+    for segment in segments:
+        result["Файлов"] += 1
+        try:
+            with archive._open(segment["file"], 'rt') as file:
+                count = sum(1 for line in file if json.loads(line))
+            if count != segment["count"]:
+                result["Проблемы"].append(f"архив {segment['file']}: {count} записей вместо {segment['count']}")
+        except (OSError, EOFError, ValueError) as e:
+            result["Проблемы"].append(f"архив {segment['file']}: {e}")
+    return result
+
+
+def check_user_registry(users: List[str], repair: bool = False) -> dict:
+    """Проверка users.txt: повторы имен и данные задач пользователей, которых нет в списке."""
+    result = {"Пользователь": "users.txt", "Файлов": 1, "Задач": 0, "Повреждено": 0, "Без суммы": 0,
+              "Проблемы": [], "Исправлено": []}
+    duplicates = sorted({user for user in users if users.count(user) > 1})
+    if duplicates:
+        result["Проблемы"].append(f"повторяются: {', '.join(duplicates)}")
+    found = set()
+    for name in os.listdir("."):
+        for suffix, marker in (("_tasks.json", None), ("_tasks", "manifest.json"), ("_archive", "index.json")):
+            if name.endswith(suffix) and (marker is None or os.path.exists(os.path.join(name, marker))):
+                found.add(name[:-len(suffix)].replace("_", " "))
+    orphans = sorted(found - set(users))
+    if orphans:
+        result["Проблемы"].append(f"есть данные, но нет в списке: {', '.join(orphans)}")
+    if repair and (duplicates or orphans):
+        user_manager = UserManager()
+        user_manager.users = list(dict.fromkeys(user_manager.users)) + orphans
+        user_manager.save_users()
+        result["Исправлено"].append("список пользователей восстановлен")
+    return result
+
+
+def run_fsck(repair: bool = False, workers: int = 4) -> List[dict]:
+    """Проверяет данные всех пользователей пулом процессов (и users.txt); возвращает строки отчета."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    users = UserManager()._read_users() if os.path.exists("users.txt") else []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(check_user_data, list(dict.fromkeys(users)), itertools.repeat(repair)))
+    results.append(check_user_registry(users, repair))
+    return results
+
+
+def validate_name(prompt):
+    while True:
+        try:  #SCRUM-10
+            name = input(prompt).strip()
+        except EOFError:  #SCRUM-10
+            print("Ввод прерван. Попробуйте снова.")  #SCRUM-10
+            continue
+
+        if name.isalpha() and name.isascii():
+            return name
+        print("Введите корректное имя (только латинские буквы).")
+
+REPORT_FORMAT_PROMPT = "Формат отчета (txt, csv, jsonl, html; добавьте .gz для сжатия; Enter - txt): "
+
+
+def main(window_months: int = None):
+    """
+    Интерактивное меню. window_months - для задач, хранящихся по месяцам, загружать только
+    последние N месяцев и месяцы с открытыми задачами (см. TaskManager).
+    """
+    user_manager = UserManager()
+
+    while True:
+        print("\n===========Главное меню:============")
+        print("1. Добавить пользователя")
+        print("2. Удалить пользователя")
+        print("3. Просмотреть список пользователей")
+        print("4. Менеджер задач пользователя")
+        print("5. Отчет о работе всех пользователей")
+        print("6. Аналитика выполнения задач")
+        print("7. Просроченные и срочные задачи всех пользователей")
+        print("8. Общий список задач команды")
+        print("0. Завершение программы")
+
+        choice = input("Выберите действие: ").strip().lower()
+
+        if choice == "1":
+            first_name = validate_name("Введите имя пользователя: ")
+            last_name = validate_name("Введите фамилию пользователя: ")
+            user_manager.add_user(first_name, last_name)
+
+        elif choice == "2":
+            user_manager.list_users()
+            try:  #SCRUM-10
+                user_index = int(input("Введите номер пользователя для удаления: ").strip()) - 1
+                if 0 <= user_index < len(user_manager.users):
+                    user_name = user_manager.users[user_index]
+                    user_manager.remove_user(user_name)
+                else:
+                    print("Неверный номер пользователя.")
+            except ValueError:  #SCRUM-10
+                print("Введите корректный номер пользователя для удаления.")  #SCRUM-10
+
+        elif choice == "3":
+            user_manager.list_users()
+
+        elif choice == "4":
+            user_manager.list_users()
+            try:  #SCRUM-10
+                user_index = int(input("Выберите номер пользователя для управления задачами: ").strip()) - 1
+                if 0 <= user_index < len(user_manager.users):
+                    user_name = user_manager.users[user_index]
+                    task_manager = TaskManager(user_name, window_months=window_months)
+
+                    # SCRUM-6: Вызываем уведомление о просроченных и открытых задачах при входе в меню
+                    task_manager.notify_overdue_tasks()
+
+                    while True:
+                        print(f"\nМеню задач для пользователя: {user_name}")
+                        print("1. Просмотреть список задач")
+                        print("2. Добавить задачу")
+                        print("3. Удалить задачу")
+                        print("4. Сохранить задачи в файл")
+                        print("5. Изменить статус задачи")
+                        print("6. Установить срок выполнения задачи")
+                        print("7. Сохранить отчет выполненных задач")
+                        print("8. Отменить последнее действие")
+                        print("9. Повторить отмененное действие")
+                        print("10. Просмотреть задачи на момент времени")
+                        print("11. Перенести старые выполненные задачи в архив")
+                        print("12. Поиск задач (включая архив)")
+                        print("13. Массовые операции над задачами")
+                        print("14. Настроить повторение задачи")
+                        print("15. Сроки на ближайшие дни (с повторениями)")
+                        print("16. Теги и проект задачи")
+                        print("17. Задачи по тегам и проектам")
+                        print("18. Установить приоритет задачи")
+                        print("19. Главные задачи (по приоритету и сроку)")
+                        print("20. Добавить или удалить зависимость между задачами")
+                        print("21. Готовые и ожидающие задачи")
+                        print("22. Общие задачи команд")
+                        print("23. Изменить статус общей задачи")
+                        print("24. Загрузить изменения других сеансов")
+                        print("0. Вернуться к списку пользователей")
+
+                        task_choice = input("Выберите действие: ").strip()
+
+                        if task_choice == "1":
+                            task_manager.view_tasks()
+
+                        elif task_choice == "2":
+                            title = input("Введите название задачи: ").strip()
+                            description = input("Введите описание задачи: ").strip()
+                            task_manager.add_task(title, description)
+
+                        elif task_choice == "3":
+                            task_manager.view_tasks()
+                            try:  #SCRUM-10
+                                index = int(input("Введите номер задачи для удаления: ").strip()) - 1
+                                task_manager.remove_task(index)
+                            except ValueError:  #SCRUM-10
+                                print("Введите корректный номер задачи для удаления.")  #SCRUM-10
+
+                        elif task_choice == "4":
+                            task_manager.save_to_file()
+
+                        elif task_choice == "5":
+                            task_manager.view_tasks()
+                            try:  #SCRUM-10
+                                index = int(input("Введите номер задачи для изменения статуса: ").strip()) - 1
+                                task_manager.change_task_status(index)
+                            except ValueError:  #SCRUM-10
+                                print("Введите корректный номер задачи для изменения статуса.")  #SCRUM-10
+
+                        elif task_choice == "6":
+                            task_manager.view_tasks()
+                            try:  #SCRUM-10
+                                index = int(input("Введите номер задачи для установки срока выполнения: ").strip()) - 1
+                                if task_manager.tasks[index].completed:
+                                    print("Задача уже выполнена. Установка срока невозможна.")
+                                    continue
+                                deadline = input("Введите срок выполнения (формат ЧЧ:ММ ДД.ММ.ГГГГ): ").strip()
+                                task_manager.set_task_deadline(index, deadline)
+                            except ValueError:
+                                print("Введите корректные данные о задаче.")  #SCRUM-10
+                            except IndexError:
+                                print("Неверный номер задачи.")  #SCRUM-10
+                            except Exception as e:
+                                print(f"Произошла непредвиденная ошибка: {e}")  #SCRUM-10
+
+                        elif task_choice == "7":
+                            try:  #SCRUM-10
+                                fmt, compress = parse_report_format(input(REPORT_FORMAT_PROMPT))
+                                task_manager.save_report(fmt, compress)
+                            except ValueError as e:  #SCRUM-10
+                                print(e)
+
+                        elif task_choice == "8":
+                            task_manager.undo()
+
+                        elif task_choice == "9":
+                            task_manager.redo()
+
+                        elif task_choice == "10":
+                            moment = input("Введите момент времени (формат ЧЧ:ММ ДД.ММ.ГГГГ): ").strip()
+                            task_manager.view_tasks_as_of(moment)
+
+                        elif task_choice == "11":
+                            try:  #SCRUM-10
+                                days = int(input("Архивировать задачи, выполненные более N дней назад. N = ").strip())
+                                task_manager.archive_completed_tasks(days)
+                            except ValueError:  #SCRUM-10
+                                print("Введите целое число дней.")  #SCRUM-10
+
+                        elif task_choice == "12":
+                            text = input("Введите текст для поиска: ").strip()
+                            task_manager.view_search_results(text)
+
+                        elif task_choice == "13":
+                            print(TASK_QUERY_HELP)
+                            try:  #SCRUM-10
+                                query = input("Введите фильтр: ").strip()
+                                predicate = parse_task_query(query)
+                                print(f"Подходит задач: {sum(1 for task in task_manager.tasks if predicate(task))}")
+                                print("1. Отметить выполненными  2. Отметить невыполненными  3. Установить срок  "
+                                      "4. Сдвинуть сроки  5. Удалить  0. Отмена")
+                                action = input("Выберите действие: ").strip()
+                                if action == "1":
+                                    summary = task_manager.bulk_set_status(predicate, True)
+                                elif action == "2":
+                                    summary = task_manager.bulk_set_status(predicate, False)
+                                elif action == "3":
+                                    deadline = input("Введите срок выполнения (формат ЧЧ:ММ ДД.ММ.ГГГГ): ").strip()
+                                    summary = task_manager.bulk_set_deadline(predicate, deadline)
+                                elif action == "4":
+                                    hours = float(input("Сдвинуть сроки на N часов (можно отрицательное). N = ").strip())
+                                    summary = task_manager.bulk_shift_deadline(predicate, hours)
+                                elif action == "5":
+                                    summary = task_manager.bulk_remove(predicate)
+                                else:
+                                    continue
+                                print(tabulate([summary], headers="keys", tablefmt="grid"))
+                            except ValueError as e:  #SCRUM-10
+                                print(f"Некорректные данные: {e}")  #SCRUM-10
+
+                        elif task_choice == "14":
+                            task_manager.view_tasks()
+                            try:  #SCRUM-10
+                                index = int(input("Введите номер задачи: ").strip()) - 1
+                                freq = input("Периодичность (daily, weekly, monthly; пусто - отменить повторение): ").strip()
+                                if not freq:
+                                    task_manager.set_task_recurrence(index, None)
+                                    continue
+                                interval = int(input("Интервал (каждые N периодов), N = ").strip() or 1)
+                                count = int(input("Число повторений (пусто - без ограничения): ").strip() or 0)
+                                until = input("Повторять до даты ДД.ММ.ГГГГ (пусто - без ограничения): ").strip()
+                                task_manager.set_task_recurrence(index, freq, interval, count, until)
+                            except ValueError:  #SCRUM-10
+                                print("Введите корректные данные о повторении.")  #SCRUM-10
+
+                        elif task_choice == "15":
+                            try:  #SCRUM-10
+                                days = int(input("Показать сроки на N дней вперед. N = ").strip())
+                                task_manager.view_occurrences(days)
+                            except ValueError:  #SCRUM-10
+                                print("Введите целое число дней.")  #SCRUM-10
+
+                        elif task_choice == "16":
+                            task_manager.view_tasks()
+                            try:  #SCRUM-10
+                                index = int(input("Введите номер задачи: ").strip()) - 1
+                                tags = input("Теги через пробел (например: #срочно #отчет): ").strip()
+                                project = input("Проект (Enter - без проекта): ").strip()
+                                task_manager.set_task_tags(index, tags, project)
+                            except ValueError:  #SCRUM-10
+                                print("Введите корректный номер задачи.")  #SCRUM-10
+
+                        elif task_choice == "17":
+                            print(TAG_QUERY_HELP)
+                            task_manager.view_tasks(input("Введите запрос: ").strip())
+
+                        elif task_choice == "18":
+                            task_manager.view_tasks()
+                            try:  #SCRUM-10
+                                index = int(input("Введите номер задачи: ").strip()) - 1
+                                levels = ", ".join(f"{level} - {name}" for level, name in PRIORITY_LEVELS.items())
+                                priority = input(f"Приоритет ({levels}): ").strip()
+                                task_manager.set_task_priority(index, int(priority) if priority else None)
+                            except ValueError:  #SCRUM-10
+                                print("Введите корректные данные о задаче.")  #SCRUM-10
+
+                        elif task_choice == "19":
+                            try:  #SCRUM-10
+                                count = int(input("Сколько задач показать: ").strip() or 10)
+                                task_manager.view_top_tasks(count)
+                            except ValueError:  #SCRUM-10
+                                print("Введите целое число.")  #SCRUM-10
+
+                        elif task_choice == "20":
+                            task_manager.view_tasks()
+                            try:  #SCRUM-10
+                                index = int(input("Введите номер задачи: ").strip()) - 1
+                                prerequisite = input("Номер задачи, которую нужно выполнить раньше "
+                                                     "(со знаком минус - удалить зависимость): ").strip()
+                                if prerequisite.startswith("-"):
+                                    task_manager.remove_task_dependency(index, int(prerequisite[1:]) - 1)
+                                else:
+                                    task_manager.add_task_dependency(index, int(prerequisite) - 1)
+                            except ValueError:  #SCRUM-10
+                                print("Введите корректные номера задач.")  #SCRUM-10
+
+                        elif task_choice == "21":
+                            task_manager.view_dependencies()
+
+                        elif task_choice == "22":
+                            task_manager.view_shared_tasks()
+
+                        elif task_choice == "23":
+                            task_manager.view_shared_tasks()
+                            try:  #SCRUM-10
+                                index = int(input("Введите номер общей задачи: ").strip()) - 1
+                                task_manager.change_shared_task_status(index)
+                            except ValueError:  #SCRUM-10
+                                print("Введите корректный номер задачи.")  #SCRUM-10
+
+                        elif task_choice == "24":
+                            task_manager.merge_from_file()
+
+                        elif task_choice == "0":
+                            if not task_manager.last_saved:
+                                while True:
+                                    save_choice = input("Сохранить изменения для текущего пользователя? (Yes (Y)/No (N)): ").strip().lower()
+                                    if save_choice in ("y", "yes"):
+                                        task_manager.save_to_file()
+                                        break
+                                    elif save_choice in ("n", "no"):
+                                        break
+                                    else:
+                                        print("Неверный выбор. Пожалуйста, введите Yes (Y) или No (N).")
+                            break
+
+                        else:
+                            print("Неверный выбор, попробуйте снова.")
+                else:
+                    print("Неверный номер пользователя.")
+            except ValueError:  #SCRUM-10
+                print("Введите корректный номер пользователя.")  #SCRUM-10
+
+        elif choice == "5":
+            try:  #SCRUM-10
+                fmt, compress = parse_report_format(input(REPORT_FORMAT_PROMPT))
+                user_manager.save_report_all_users(fmt, compress)
+            except ValueError as e:  #SCRUM-10
+                print(e)
+
+        elif choice == "6":
+            try:  #SCRUM-10
+                result = user_manager.analytics.compute(user_manager.users)
+                print(tabulate(TaskAnalytics.table_rows(result), headers="keys", tablefmt="grid"))
+                export_path = input("Файл для экспорта (.csv или .json, Enter - без экспорта): ").strip()
+                if export_path:
+                    user_manager.analytics.export(result, export_path)
+                    print(f"Аналитика сохранена в файл \"{export_path}\".")
+            except Exception as e:  #SCRUM-10
+                print(f"Ошибка расчета аналитики: {e}")  #SCRUM-10
+
+        elif choice == "7":
+            try:  #SCRUM-10
+                hours = float(input("Срочные - со сроком в ближайшие N часов. N = ").strip() or 24)
+                print_deadline_overview(user_manager.deadline_index, hours)
+            except ValueError:  #SCRUM-10
+                print("Введите число часов.")  #SCRUM-10
+
+        elif choice == "8":
+            name = input("Название общего списка: ").strip()
+            if name:
+                shared = SharedTaskList(name)
+                if not shared.exists():
+                    user_manager.list_users()
+                    try:  #SCRUM-10
+                        numbers = input("Номера участников через пробел: ").split()
+                        members = [user_manager.users[int(number) - 1] for number in numbers]
+                        shared.add_members(members)
+                        print(f"Создан общий список \"{name}\" ({len(members)} участников).")
+                    except (ValueError, IndexError):  #SCRUM-10
+                        print("Введите корректные номера пользователей.")  #SCRUM-10
+                        continue
+                title = input("Название задачи (Enter - не добавлять): ").strip()
+                if title:
+                    shared.add_task(title, input("Введите описание задачи: ").strip())
+                    print("Общая задача добавлена.")
+
+        elif choice == "0":
+            print("Завершение программы. До свидания!")
+            break
+
+        else:
+            print("Неверный выбор. Попробуйте снова.")
+
+STRESS_MIN_SCALING = 0.5  # Чтений/с при нескольких читателях - не меньше этой доли от одного читателя
+
+
+def stress_test_thread_safe(thread_counts=(1, 2, 4, 8), task_count: int = 2000, duration: float = 2.0,
+                            writers: int = 2, writes_per_writer: int = 200):
+    """
+    Нагрузочная проверка ThreadSafeTaskManager: для каждого числа потоков-читателей замеряет
+    пропускную способность чтения при параллельных писателях и проверяет, что ни одна добавленная
+    писателями задача не потеряна. Читатели чередуют overdue_summary() с методами, которые
+    вызывают другие читающие методы (notify_overdue_tasks, view_tasks с запросом по тегам),
+    и с просмотрами по куче приоритетов и графу зависимостей (top_tasks, ready_tasks).
+    Возвращает список строк результатов; scaling - доля пропускной способности первого числа
+    читателей, которую сохранило текущее (сравнивается с STRESS_MIN_SCALING).
+    """
+    import io
+    from contextlib import redirect_stdout
+
+    results = []
+    with redirect_stdout(io.StringIO()):
+        for readers in thread_counts:
+            manager = ThreadSafeTaskManager(f"stress test {new_uid()}")
+            for i in range(task_count):
+                manager.add_task(f"Задача {i}", "нагрузочный тест")
+            manager.set_task_tags(0, "стресс")
+            stop = threading.Event()
+            read_counts = [0] * readers
+            reads = (manager.overdue_summary, manager.notify_overdue_tasks, lambda: manager.view_tasks("#стресс"),
+                     manager.top_tasks, manager.ready_tasks)
+
+            def reader(slot):
+                while not stop.is_set():
+                    reads[read_counts[slot] % len(reads)]()
+                    read_counts[slot] += 1
+
+            def writer(number):
+                for i in range(writes_per_writer):
+                    manager.add_task(f"Писатель {number} - {i}", "нагрузочный тест")
+                    manager.change_task_status(i % task_count)
+
+            threads = [threading.Thread(target=reader, args=(slot,)) for slot in range(readers)]
+            threads += [threading.Thread(target=writer, args=(number,)) for number in range(writers)]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            time.sleep(duration)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+            expected = {f"Писатель {n} - {i}" for n in range(writers) for i in range(writes_per_writer)}
+            lost = len(expected - {task.title for task in manager.tasks})
+            lost += abs(task_count + len(expected) - len(manager.tasks))
+            reads_per_second = sum(read_counts) / elapsed
+            baseline = results[0]["reads_per_second"] if results else reads_per_second
+            results.append({
+                "readers": readers,
+                "reads_per_second": round(reads_per_second, 1),
+                "scaling": round(reads_per_second / baseline, 2) if baseline else 1.0,
+                "lost_updates": lost,
+            })
+    return results
+
+
+class ScriptedSession:
+    """
+    Интерактивный сеанс main() в отдельном процессе: ввод подается в stdin построчно,
+    вывод читается до очередного приглашения к вводу. Используется run_load_test().
+    """
+
+    PROMPT = "Выберите действие: "
+    SAVE_PROMPT = "(Yes (Y)/No (N)): "
+
+    def __init__(self, script: str, cwd: str, timeout: float = 30.0):
+        import subprocess
+        self.timeout = timeout
+        self.process = subprocess.Popen(
+            [sys.executable, "-u", script], cwd=cwd, stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            env={**os.environ, "PYTHONIOENCODING": "utf-8"},
+        )
+
+    def read_until(self, prompts=(PROMPT,)) -> str:
+        import select
+        prompts = [prompt.encode("utf-8") for prompt in prompts]
+        output = bytearray()
+        deadline = time.monotonic() + self.timeout
+        descriptor = self.process.stdout.fileno()
+        while not any(output.endswith(prompt) for prompt in prompts):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"нет приглашения к вводу за {self.timeout} с")
+            if not select.select([descriptor], [], [], remaining)[0]:
+                continue
+            chunk = os.read(descriptor, 65536)
+            if not chunk:
+                raise EOFError("процесс завершился")
+            output += chunk
+        return output.decode("utf-8", "replace")
+
+    def send(self, lines, prompts=(PROMPT,)) -> str:
+        self.process.stdin.write(("\n".join(lines) + "\n").encode("utf-8"))
+        self.process.stdin.flush()
+        return self.read_until(prompts)
+
+    def finish(self, lines) -> int:
+        """Подает последние строки ввода и ждет завершения процесса; возвращает код выхода."""
+        self.process.stdin.write(("\n".join(lines) + "\n").encode("utf-8"))
+        self.process.stdin.close()
+        self.process.stdout.read()
+        return self.process.wait(self.timeout)
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+
+
+LOAD_TEST_MIX = {"add": 40, "view": 20, "status": 15, "save": 15, "report": 10}
+
+
+def parse_load_mix(value: str) -> dict:
+    """Смесь операций "add=40,view=20,..." -> {операция: вес}."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in LOAD_TEST_MIX:
+            raise ValueError(f"Неизвестная операция: {name}. Возможные: {', '.join(LOAD_TEST_MIX)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def run_load_test(sessions: int = 8, users: int = 2, operations: int = 50, mix: dict = None,
+                  think_ms: float = 50.0, data_dir: str = None, seed: int = None, timeout: float = 30.0):
+    """
+    Нагрузочный тест интерактивного меню: sessions процессов main() одновременно работают
+    с одним каталогом данных (по users пользователям на всех, то есть сеансы делят файлы задач).
+    Каждый сеанс выполняет operations случайных операций из mix с паузой "на раздумье"
+    до 2 * think_ms мс, замеряя время от ввода до следующего приглашения.
+    В конце проверяется целостность файлов задач: JSON читается, uid не повторяются,
+    не пропала ни одна задача, сохраненная сеансом. Возвращает (строки по операциям, сводка).
+    Без data_dir сеансы работают во временном каталоге, который удаляется после проверки.
+    """
+    import random
+    import tempfile
+
+    mix = mix or LOAD_TEST_MIX
+    temporary = None if data_dir else tempfile.TemporaryDirectory(prefix="taskmanager-load-")
+    data_dir = data_dir or temporary.name
+    try:
+        os.makedirs(data_dir, exist_ok=True)
+        user_names = [f"Load User{chr(ord('A') + number % 26)}{number // 26 or ''}" for number in range(users)]
+        with open(os.path.join(data_dir, "users.txt"), 'w', encoding='utf-8') as file:
+            file.write("\n".join(user_names))
+        script = ENTRY_SCRIPT
+        latencies = {name: [] for name in ["start"] + list(mix) + ["exit"]}
+        errors = Counter()
+        saved_titles = {user_name: set() for user_name in user_names}
+        stats_lock = threading.Lock()
+
+        def session(number: int):
+            generator = random.Random(None if seed is None else seed + number)
+            user_index = number % users
+            added, unsaved = 0, []
+
+            def measure(name, lines, prompts=(ScriptedSession.PROMPT,)):
+                started = time.perf_counter()
+                output = runner.send(lines, prompts) if lines else runner.read_until(prompts)
+                elapsed = (time.perf_counter() - started) * 1000
+                with stats_lock:
+                    latencies[name].append(elapsed)
+                    if "Ошибка" in output or "ошибка" in output:
+                        errors[name] += 1
+                    if "Сохранение отменено" in output:
+                        errors["save_rejected"] += 1
+                    if "Изменения из другого сеанса объединены" in output:
+                        errors["save_merged"] += 1
+                if "Список задач сохранен" in output:
+                    with stats_lock:
+                        saved_titles[user_names[user_index]].update(unsaved)
+                    unsaved.clear()
+                return output
+
+            runner = ScriptedSession(script, data_dir, timeout)
+            try:
+                measure("start", None)
+                runner.send(["4", str(user_index + 1)])
+                for step in range(operations):
+                    time.sleep(generator.uniform(0, 2 * think_ms) / 1000)
+                    name = generator.choices(list(mix), weights=list(mix.values()))[0]
+                    if name == "add":
+                        title = f"Сеанс {number} - {step}"
+                        unsaved.append(title)
+                        added += 1
+                        measure(name, ["2", title, "нагрузочный тест"])
+                    elif name == "view":
+                        measure(name, ["1"])
+                    elif name == "status":
+                        measure(name, ["5", str(generator.randint(1, max(1, added)))])
+                    elif name == "save":
+                        measure(name, ["4"])
+                    elif name == "report":
+                        measure(name, ["7", "txt"])
+                output = measure("exit", ["0"], (ScriptedSession.PROMPT, ScriptedSession.SAVE_PROMPT))
+                if output.endswith(ScriptedSession.SAVE_PROMPT):
+                    measure("exit", ["y"])
+                if runner.finish(["0"]) != 0:
+                    raise EOFError("процесс завершился с ошибкой")
+            except (TimeoutError, EOFError, OSError) as e:
+                with stats_lock:
+                    errors["session"] += 1
+                print(f"Сеанс {number}: {e}")
+            finally:
+                runner.close()
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=session, args=(number,)) for number in range(sessions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        lost = duplicates = broken = 0
+        for user_name in user_names:
+            filename = os.path.join(data_dir, task_filename(user_name))
+            try:
+                with open(filename, 'r', encoding='utf-8') as file:
+                    records = json.load(file)
+            except FileNotFoundError:
+                records = []
+            except ValueError:
+                broken += 1
+                continue
+            uids = [record.get("uid") for record in records]
+            duplicates += len(uids) - len(set(uids))
+            lost += len(saved_titles[user_name] - {record.get("title") for record in records})
+
+        rows = []
+        for name, values in latencies.items():
+            if not values:
+                continue
+            p50, p95, p99 = _percentiles(values, (50, 95, 99))
+            rows.append({
+                "операция": name,
+                "количество": len(values),
+                "ошибок": errors[name],
+                "p50, мс": round(p50, 1),
+                "p95, мс": round(p95, 1),
+                "p99, мс": round(p99, 1),
+                "макс, мс": round(max(values), 1),
+            })
+        summary = {
+            "data_dir": data_dir if temporary is None else "временный, удален",
+            "elapsed": round(elapsed, 2),
+            "operations_per_second": round(sum(len(v) for v in latencies.values()) / elapsed, 1),
+            "session_failures": errors["session"],
+            "saves_merged": errors["save_merged"],
+            "saves_rejected": errors["save_rejected"],
+            "broken_files": broken,
+            "duplicate_uids": duplicates,
+            "lost_tasks": lost,
+        }
+        return rows, summary
+    finally:
+        if temporary is not None:
+            temporary.cleanup()  # Каталог, заданный через data_dir, остается для разбора
+
+
+def benchmark_report_export(rows: int = 100000, repeat: int = 1):
+    """
+    Сравнивает скорость записи отчета о выполненных задачах во всех форматах
+    (txt - прежний путь через tabulate). Возвращает список результатов.
+    """
+    import tempfile
+
+    tasks = []
+    for i in range(rows):
+        task = Task(f"Задача {i}", f"Описание задачи номер {i}", True, "2024-12-21 10:25:52", "2024-12-22 21:17:30")
+        tasks.append(task)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in REPORT_FORMATS:
+            for compress in (False, True):
+                best = None
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    with REPORT_WRITERS[fmt](os.path.join(directory, "report"), compress) as writer:
+                        writer.write_section(completed_report_rows(tasks), "Benchmark User")
+                    elapsed = time.perf_counter() - started
+                    best = elapsed if best is None else min(best, elapsed)
+                results.append({
+                    "format": fmt + (".gz" if compress else ""),
+                    "seconds": round(best, 3),
+                    "rows_per_second": round(rows / best),
+                    "bytes": os.path.getsize(writer.filename),
+                })
+    return results
+
+
+def benchmark_group_commit(writers: int = 16, saves: int = 20, tasks: int = 200):
+    """
+    Сравнивает сохранение файлов задач из writers потоков: отдельный fsync на каждое сохранение
+    и групповая запись через WriteCoordinator. Каждый поток сохраняет свой файл saves раз.
+    """
+    import tempfile
+
+    data = json.dumps([Task(f"Задача {i}", f"Описание задачи номер {i}").to_record() for i in range(tasks)],
+                      ensure_ascii=False, indent=4).encode("utf-8")
+    coordinator = WriteCoordinator()
+    modes = {"fsync на сохранение": lambda path: write_file_durable(path, data),
+             "групповая запись": lambda path: coordinator.write([(path, data)])}
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for mode, save in modes.items():
+            def writer(number):
+                path = os.path.join(directory, f"User_{number}_tasks.json")
+                for _ in range(saves):
+                    save(path)
+            threads = [threading.Thread(target=writer, args=(number,)) for number in range(writers)]
+            barriers = coordinator.stats["barriers"]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            results.append({
+                "mode": mode,
+                "saves": writers * saves,
+                "seconds": round(elapsed, 3),
+                "saves_per_second": round(writers * saves / elapsed),
+                "barriers": coordinator.stats["barriers"] - barriers if mode == "групповая запись" else writers * saves,
+            })
+    return results
+
+
+STARTUP_PROMPT = "Выберите действие: "
+STARTUP_BUDGET_MS = 60.0  # Бюджет запуска до первого приглашения (исходная версия 1.1 - не быстрее 76 мс)
+
+
+def measure_startup(runs: int = 5):
+    """
+    Время холодного запуска меню: от старта интерпретатора до первого приглашения ввода (лучшее из runs),
+    и самые медленные импорты по данным "python -X importtime".
+    """
+    import py_compile
+    import subprocess
+
+    # Байт-код модуля готовится заранее (в том числе при PYTHONDONTWRITEBYTECODE): замеряется обычный запуск,
+    # а не первый запуск после изменения кода
+    py_compile.compile(os.path.abspath(__file__))
+
+    command = [sys.executable, ENTRY_SCRIPT]
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL, env={**os.environ, "PYTHONUNBUFFERED": "1"})
+        output = b""
+        prompt = STARTUP_PROMPT.encode("utf-8")
+        while not output.endswith(prompt):
+            chunk = process.stdout.read(1)
+            if not chunk:
+                break
+            output += chunk
+        elapsed = time.perf_counter() - started
+        process.communicate(b"0\n")
+        best = elapsed if best is None else min(best, elapsed)
+
+    profile = subprocess.run(command[:1] + ["-X", "importtime"] + command[1:], input=b"0\n",
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    imports = []
+    for line in profile.stderr.decode("utf-8", "replace").splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # Импорты верхнего уровня выводятся с одним пробелом отступа, вложенные - с большим
+        if cumulative_us.strip().isdigit() and not name.startswith("  "):
+            imports.append((int(cumulative_us), name.strip()))
+    return best * 1000, sorted(imports, reverse=True)
+
+
+def benchmark_memory(users: List[str]):
+    """
+    Замеряет через tracemalloc память, занятую задачами всех пользователей после загрузки
+    обычным способом и в режиме compact. Возвращает список результатов.
+    """
+    import gc
+    import io
+    import tracemalloc
+    from contextlib import redirect_stdout
+
+    with redirect_stdout(io.StringIO()):
+        [TaskManager(user_name) for user_name in users]  # Прогрев: разовые импорты и кэши не попадают в замер
+    results = []
+    for compact in (False, True):
+        gc.collect()
+        tracemalloc.start()
+        with redirect_stdout(io.StringIO()):
+            managers = [TaskManager(user_name, compact) for user_name in users]
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append({
+            "режим": "compact" if compact else "обычный",
+            "задач": sum(len(manager.tasks) for manager in managers),
+            "занято, КБ": round(retained / 1024, 1),
+            "пик, КБ": round(peak / 1024, 1),
+        })
+        del managers
+    return results
+
+
+class MemoryProfiler:
+    """
+    Режим профилирования памяти (включается явно: переменная окружения TASKMANAGER_MEMORY_PROFILE=<файл
+    отчета> или команда profile-memory). Оборачивает открытые методы TaskManager и UserManager и
+    через tracemalloc замеряет для каждого вызова пик памяти относительно начала вызова, в том числе
+    для вложенных операций (пик save_report_all_users раскладывается на загрузку TaskManager,
+    all_tasks и т.д.). Для операций верхнего уровня снимки tracemalloc до и после вызова дают
+    удержанную память по местам выделения (цепочка вызовов из frames кадров); сравнение снимков
+    дорогое, поэтому оно делается, только если операция удержала не меньше min_retained байт.
+    Отчет с операциями по убыванию пика пишется в report_path при выходе из программы.
+    """
+
+    def __init__(self, report_path: str = "memory_profile.txt", frames: int = 6, top: int = 10,
+                 min_retained: int = 64 * 1024):
+        self.report_path = report_path
+        self.frames = frames
+        self.min_retained = min_retained
+        self.top = top
+        self.stats = {}
+        self._stack = []
+        self._lock = threading.RLock()
+
+    def start(self, classes=None):
+        import atexit
+        import tracemalloc
+        tracemalloc.start(self.frames)
+        for cls in classes or (TaskManager, UserManager):
+            self.install(cls)
+        atexit.register(self.write_report)
+
+    def install(self, cls):
+        for name, attribute in list(vars(cls).items()):
+            if (name.startswith("_") and name != "__init__") or not callable(attribute) or isinstance(attribute, type):
+                continue
+            setattr(cls, name, self.wrap(f"{cls.__name__}.{name}", attribute))
+
+    def _fold_peak(self, tracemalloc):
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._stack:
+            frame["peak"] = max(frame["peak"], peak)
+
+    def wrap(self, name: str, method):
+        import tracemalloc
+        profiler = self
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if not tracemalloc.is_tracing():
+                return method(*args, **kwargs)
+            with profiler._lock:  # Измерения ведутся в одном потоке: пик tracemalloc общий для процесса
+                top_level = not profiler._stack
+                before = tracemalloc.take_snapshot() if top_level else None
+                profiler._fold_peak(tracemalloc)
+                tracemalloc.reset_peak()
+                frame = {"baseline": tracemalloc.get_traced_memory()[0], "peak": 0}
+                profiler._stack.append(frame)
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    profiler._fold_peak(tracemalloc)
+                    profiler._stack.pop()
+                    retained = tracemalloc.get_traced_memory()[0] - frame["baseline"]
+                    sites = []
+                    if top_level and retained >= profiler.min_retained:
+                        sites = tracemalloc.take_snapshot().compare_to(before, "traceback")
+                    before = None
+                    profiler._record(name, frame["peak"] - frame["baseline"], retained, sites)
+        return wrapper
+
+    def _record(self, name: str, peak: int, retained: int, sites):
+        entry = self.stats.setdefault(name, {"calls": 0, "peak_max": 0, "peak_total": 0, "retained": 0,
+                                             "sites": Counter()})
+        entry["calls"] += 1
+        entry["peak_max"] = max(entry["peak_max"], peak)
+        entry["peak_total"] += peak
+        entry["retained"] += retained
+        for stat in sites:
+            if stat.size_diff > 0 and not stat.traceback[-1].filename.endswith("tracemalloc.py"):
+                path = " <- ".join(f"{os.path.basename(frame.filename)}:{frame.lineno}"
+                                   for frame in reversed(stat.traceback))
+                entry["sites"][path] += stat.size_diff
+
+    def report_rows(self) -> List[dict]:
+        return [{
+            "операция": name,
+            "вызовов": entry["calls"],
+            "пик макс, КБ": round(entry["peak_max"] / 1024, 1),
+            "пик средний, КБ": round(entry["peak_total"] / entry["calls"] / 1024, 1),
+            "удержано, КБ": round(entry["retained"] / 1024, 1),
+        } for name, entry in sorted(self.stats.items(), key=lambda item: -item[1]["peak_max"])]
+
+    def write_report(self):
+        if not self.stats:
+            return
+        with open(self.report_path, 'w', encoding='utf-8') as file:
+            file.write("Профиль памяти операций TaskManager/UserManager (по убыванию пика)\n")
+            file.write(tabulate(self.report_rows(), headers="keys", tablefmt="grid") + "\n")
+            for name, entry in sorted(self.stats.items(), key=lambda item: -item[1]["peak_max"]):
+                if not entry["sites"]:
+                    continue
+                file.write(f"\n{name}: удержанная память по местам выделения (от места выделения к вызывающему коду)\n")
+                for path, size in entry["sites"].most_common(self.top):
+                    file.write(f"{size / 1024:>12.1f} КБ  {path}\n")
+        print(f"Профиль памяти сохранен в файл \"{self.report_path}\".")
+
+
+def profile_memory_workload(report_path: str = "memory_profile.txt"):
+    """
+    Сценарий для команды profile-memory: загрузка, просмотр и отчет каждого пользователя,
+    затем общий отчет и аналитика - под MemoryProfiler. Сценарий прогоняется дважды, замеряется
+    второй прогон, чтобы разовые импорты модулей не заслоняли память самих операций.
+    Возвращает профилировщик.
+    """
+    import io
+    import tracemalloc
+    from contextlib import redirect_stdout
+
+    def workload():
+        user_manager = UserManager()
+        for user_name in user_manager.users:
+            task_manager = TaskManager(user_name)
+            task_manager.view_tasks()
+            task_manager.save_report()
+        user_manager.save_report_all_users()
+        TaskAnalytics().compute(user_manager.users)
+
+    profiler = MemoryProfiler(report_path)
+    with redirect_stdout(io.StringIO()):
+        workload()
+        profiler.start()
+        workload()
+    tracemalloc.stop()
+    return profiler
+
+
+def _write_synthetic_users(user_count: int, task_count: int):
+    """Создает в текущем каталоге users.txt и файлы задач с повторяющимися шаблонами задач."""
+    templates = [("Ознакомиться", "с новой версией кода"), ("Созвон", "еженедельная встреча команды"),
+                 ("Отчет", "подготовить отчет за неделю"), ("Ревью", "проверить изменения коллег")]
+    users = [f"User{number} Synthetic" for number in range(user_count)]
+    with open("users.txt", 'w', encoding='utf-8') as file:
+        file.write("\n".join(users))
+    for user_name in users:
+        records = []
+        for i in range(task_count):
+            title, description = templates[i % len(templates)]
+            created_at = f"2024-{i % 12 + 1:02}-{i % 28 + 1:02} 10:{i % 60:02}:00"
+            records.append(Task(title, description, i % 2 == 0, created_at,
+                                created_at if i % 2 == 0 else None).to_record())
+        with open(task_filename(user_name), 'w', encoding='utf-8') as file:
+            json.dump(records, file, ensure_ascii=False)
+    return users
+
+
+def run_tool(argv):
+    """Служебные команды для запуска из командной строки (без аргументов запускается меню main())."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Служебные команды TaskManager")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    menu = commands.add_parser("menu", help="Интерактивное меню с настройками загрузки задач")
+    menu.add_argument("--window-months", type=int, default=None,
+                      help="Загружать только последние N месяцев и месяцы с открытыми задачами (хранение по месяцам)")
+
+    stress = commands.add_parser("stress", help="Нагрузочная проверка потокобезопасного TaskManager")
+    stress.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    stress.add_argument("--tasks", type=int, default=2000)
+    stress.add_argument("--duration", type=float, default=2.0)
+    stress.add_argument("--writers", type=int, default=2)
+
+    scheduler = commands.add_parser("scheduler", help="Демон уведомлений о сроках задач всех пользователей")
+    scheduler.add_argument("--sink", default="log:deadlines.log", help="log:<файл> или socket:<путь>")
+    scheduler.add_argument("--lead", type=int, nargs="*", default=[], help="Предупреждать за N минут до срока")
+    scheduler.add_argument("--poll", type=float, default=30.0, help="Период проверки изменений файлов, с")
+
+    analytics = commands.add_parser("analytics", help="Метрики выполнения задач всех пользователей")
+    analytics.add_argument("--output", default="analytics.json", help="Файл .csv или .json")
+
+    bench_export = commands.add_parser("bench-export", help="Сравнение скорости форматов отчета")
+    bench_export.add_argument("--rows", type=int, default=100000)
+    bench_export.add_argument("--repeat", type=int, default=1)
+
+    bench_save = commands.add_parser("bench-save", help="Сравнение отдельных и групповых сохранений файлов задач")
+    bench_save.add_argument("--writers", type=int, default=16, help="Число одновременно сохраняющих потоков")
+    bench_save.add_argument("--saves", type=int, default=20, help="Сохранений на поток")
+
+    startup = commands.add_parser("startup", help="Проверка времени запуска меню и импортов")
+    startup.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS,
+                         help="Допустимое время до первого приглашения")
+    startup.add_argument("--runs", type=int, default=5)
+
+    bench_memory = commands.add_parser("bench-memory", help="Память при загрузке задач всех пользователей")
+    bench_memory.add_argument("--synthetic-users", type=int, default=0,
+                              help="Замер на сгенерированных данных во временном каталоге")
+    bench_memory.add_argument("--tasks", type=int, default=2000, help="Задач на пользователя для --synthetic-users")
+
+    migrate = commands.add_parser("migrate", help="Перенос данных из каталогов старых версий")
+    migrate.add_argument("sources", nargs="+", help="Каталоги со старыми данными (просматриваются рекурсивно)")
+    migrate.add_argument("--target", default=".", help="Каталог текущего хранилища")
+    migrate.add_argument("--workers", type=int, default=4)
+
+    archive = commands.add_parser("archive", help="Перенос старых выполненных задач всех пользователей в архив")
+    archive.add_argument("--days", type=int, default=30, help="Архивировать задачи, выполненные более N дней назад")
+    archive.add_argument("--codec", choices=sorted(TaskArchive.CODECS), default="xz")
+
+    partition = commands.add_parser("partition", help="Перевод задач пользователей на хранение по месяцам")
+    partition.add_argument("users", nargs="*", help="Пользователи (по умолчанию все из users.txt)")
+
+    report = commands.add_parser("report", help="Общий отчет о выполненных задачах")
+    report.add_argument("--format", default="txt", help="txt, csv, jsonl, html; с .gz - сжатый")
+    report.add_argument("--since", help="Задачи, созданные не раньше (ГГГГ-ММ или ГГГГ-ММ-ДД)")
+    report.add_argument("--until", help="Задачи, созданные не позже (ГГГГ-ММ или ГГГГ-ММ-ДД)")
+    report.add_argument("--tags", help="Отбор по тегам и проектам, например \"#срочно AND NOT project:архив\"")
+
+    changes = commands.add_parser("changes", help="Передача журнала изменений задач потребителю")
+    changes.add_argument("--consumer", default="default", help="Имя потребителя (для контрольной точки)")
+    changes.add_argument("--sink", default="log:changes.log", help="log:<файл> или socket:<путь>")
+    changes.add_argument("--follow", action="store_true", help="Не завершаться, ждать новых событий")
+    changes.add_argument("--poll", type=float, default=1.0, help="Период проверки новых событий, с")
+
+    deadlines = commands.add_parser("deadlines", help="Просроченные и срочные задачи всех пользователей по общему индексу")
+    deadlines.add_argument("--hours", type=float, default=24.0, help="Срочные - со сроком в ближайшие N часов")
+    deadlines.add_argument("--rebuild", action="store_true", help="Построить индекс заново по файлам задач")
+
+    loadtest = commands.add_parser("loadtest", help="Нагрузочный тест меню: параллельные сеансы main() через stdin")
+    loadtest.add_argument("--sessions", type=int, default=8)
+    loadtest.add_argument("--users", type=int, default=2, help="Сколько пользователей делят сеансы")
+    loadtest.add_argument("--operations", type=int, default=50, help="Операций на сеанс")
+    loadtest.add_argument("--mix", default="add=40,view=20,status=15,save=15,report=10")
+    loadtest.add_argument("--think-ms", type=float, default=50.0, help="Средняя пауза между операциями, мс")
+    loadtest.add_argument("--data-dir", help="Каталог данных (по умолчанию временный)")
+    loadtest.add_argument("--seed", type=int)
+    loadtest.add_argument("--timeout", type=float, default=30.0, help="Ожидание ответа меню, с")
+
+    profile_memory = commands.add_parser("profile-memory", help="Профиль памяти операций с местами выделения")
+    profile_memory.add_argument("--report", default="memory_profile.txt", help="Файл отчета")
+
+    fsck = commands.add_parser("fsck", help="Проверка целостности файлов задач всех пользователей и users.txt")
+    fsck.add_argument("--repair", action="store_true", help="Исправить найденные повреждения")
+    fsck.add_argument("--workers", type=int, default=4, help="Число процессов проверки")
+
+    share = commands.add_parser("share", help="Перенос задач, скопированных каждому участнику, в общий список")
+    share.add_argument("name", help="Название общего списка")
+    share.add_argument("users", nargs="*", help="Участники (по умолчанию все из users.txt)")
+    share.add_argument("--min-users", type=int, default=2, help="Переносить задачи, скопированные не менее чем N пользователям")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "menu":
+        main(args.window_months)
+
+    if args.command == "stress":
+        results = stress_test_thread_safe(args.threads, args.tasks, args.duration, args.writers)
+        for result in results:
+            print(f"Читателей: {result['readers']:>3} | чтений/с: {result['reads_per_second']:>10} | "
+                  f"доля: {result['scaling']:>5} | потеряно изменений: {result['lost_updates']}")
+        return 1 if any(result["lost_updates"] or result["scaling"] < STRESS_MIN_SCALING for result in results) else 0
+
+    if args.command == "scheduler":
+        daemon = DeadlineScheduler(make_event_sink(args.sink), args.lead, args.poll)
+        print("Планировщик сроков запущен. Остановка - Ctrl+C.")
+        try:
+            daemon.run()
+        except KeyboardInterrupt:
+            print("Планировщик сроков остановлен.")
+
+    if args.command == "analytics":
+        engine = TaskAnalytics()
+        engine.export(engine.compute(UserManager().users), args.output)
+        print(f"Аналитика сохранена в файл \"{args.output}\".")
+
+    if args.command == "bench-export":
+        print(tabulate(benchmark_report_export(args.rows, args.repeat), headers="keys", tablefmt="grid"))
+
+    if args.command == "bench-save":
+        print(tabulate(benchmark_group_commit(args.writers, args.saves), headers="keys", tablefmt="grid"))
+
+    if args.command == "startup":
+        elapsed_ms, imports = measure_startup(args.runs)
+        print("Самые медленные импорты (суммарно, мс):")
+        for cumulative_us, name in imports[:10]:
+            print(f"{cumulative_us / 1000:>8.1f}  {name}")
+        print(f"Запуск до первого приглашения: {elapsed_ms:.1f} мс (бюджет {args.budget_ms:.0f} мс)")
+        if elapsed_ms > args.budget_ms:
+            print("Бюджет времени запуска превышен!")
+            return 1
+
+    if args.command == "bench-memory":
+        if args.synthetic_users:
+            import tempfile
+            previous_directory = os.getcwd()
+            with tempfile.TemporaryDirectory() as directory:
+                os.chdir(directory)
+                try:
+                    results = benchmark_memory(_write_synthetic_users(args.synthetic_users, args.tasks))
+                finally:
+                    os.chdir(previous_directory)
+        else:
+            results = benchmark_memory(UserManager().users)
+        print(tabulate(results, headers="keys", tablefmt="grid"))
+
+    if args.command == "migrate":
+        migrator = LegacyMigrator(args.target, args.workers)
+        results = migrator.run(args.sources)
+        migrated = [r for r in results if r["status"] == "перенесен"]
+        print(f"Обработано файлов: {len(results)} (перенесено сейчас: {len(migrated)}), "
+              f"перенесено задач: {sum(r['migrated'] for r in migrated)}.")
+        print(f"Отчет о миграции сохранен в файл \"{os.path.join(args.target, migrator.REPORT_FILENAME)}\".")
+        return 1 if any(not r["status"].startswith(("перенесен", "пропущен")) for r in results) else 0
+
+    if args.command == "fsck":
+        results = run_fsck(args.repair, args.workers)
+        print(tabulate([{**row, "Проблемы": "; ".join(row["Проблемы"]), "Исправлено": "; ".join(row["Исправлено"])}
+                        for row in results], headers="keys", tablefmt="grid"))
+        unresolved = [row for row in results if row["Проблемы"] and not row["Исправлено"]]
+        print(f"Проверено: {len(results) - 1} пользователей, файлов: {sum(row['Файлов'] for row in results)}, "
+              f"с проблемами: {sum(1 for row in results if row['Проблемы'])}.")
+        return 1 if unresolved else 0
+
+    if args.command == "share":
+        share_duplicate_tasks(args.name, args.users or UserManager().users, args.min_users)
+
+    if args.command == "archive":
+        for user_name in UserManager().users:
+            TaskManager(user_name).archive_completed_tasks(args.days, args.codec)
+
+    if args.command == "partition":
+        for user_name in args.users or UserManager().users:
+            convert_to_partitions(user_name)
+
+    if args.command == "report":
+        fmt, compress = parse_report_format(args.format)
+        UserManager().save_report_all_users(fmt, compress, args.since, args.until, args.tags)
+
+    if args.command == "changes":
+        consumer = ChangeFeedConsumer(CHANGE_FEED, args.consumer, make_event_sink(args.sink))
+        if args.follow:
+            try:
+                consumer.run(args.poll)
+            except KeyboardInterrupt:
+                pass
+        else:
+            print(f"Передано событий: {consumer.poll()} (последний seq: {consumer.position}).")
+
+    if args.command == "deadlines":
+        if args.rebuild:
+            print(f"Индекс сроков построен заново: {DEADLINE_INDEX.rebuild(UserManager().users)} задач.")
+        print_deadline_overview(DEADLINE_INDEX, args.hours)
+
+    if args.command == "loadtest":
+        rows, summary = run_load_test(args.sessions, args.users, args.operations, parse_load_mix(args.mix),
+                                      args.think_ms, args.data_dir, args.seed, args.timeout)
+        print(tabulate(rows, headers="keys", tablefmt="grid"))
+        for key, value in summary.items():
+            print(f"{key}: {value}")
+        return 1 if summary["session_failures"] or summary["broken_files"] or summary["duplicate_uids"] \
+            or summary["lost_tasks"] else 0
+
+    if args.command == "profile-memory":
+        profiler = profile_memory_workload(args.report)
+        print(tabulate(profiler.report_rows(), headers="keys", tablefmt="grid"))
+    return 0
+
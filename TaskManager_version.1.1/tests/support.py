@@ -0,0 +1,27 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+
+class DataDirTestCase(unittest.TestCase):
+    """
+    Тест в отдельном рабочем каталоге: TaskManager хранит данные по относительным путям
+    (файлы задач, users.txt, changes/, deadline_index/), поэтому каждый тест получает пустой каталог.
+    """
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._directory = tempfile.TemporaryDirectory(prefix="taskmanager-test-")
+        self.path = self._directory.name
+        os.chdir(self.path)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._directory.cleanup()
+
+    @staticmethod
+    def quiet():
+        """Подавляет сообщения TaskManager в консоль."""
+        return contextlib.redirect_stdout(io.StringIO())
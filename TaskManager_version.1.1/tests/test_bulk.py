@@ -0,0 +1,65 @@
+import taskmanager
+from tests.support import DataDirTestCase
+
+
+class BulkOperationsTest(DataDirTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.quiet():
+            self.manager = taskmanager.TaskManager("Массовые Тестов")
+            for title in ("Отчет за март", "Отчет за апрель", "Позвонить", "Купить"):
+                self.manager.add_task(title, "")
+            self.manager.add_task_dependency(1, 2)  # "Отчет за апрель" ждет "Позвонить"
+            self.manager.save_to_file()
+
+    def test_status_is_one_history_step_and_one_save(self):
+        with taskmanager.FileLock(self.manager.filename, shared=True) as lock:
+            version = lock.read_version()
+        with self.quiet():
+            summary = self.manager.bulk_set_status("отчет")
+        self.assertEqual((summary["подходит"], summary["изменено"], summary["ожидают других задач"]), (2, 1, 1))
+        self.assertEqual([task.completed for task in self.manager.tasks], [True, False, False, False])
+        with taskmanager.FileLock(self.manager.filename, shared=True) as lock:
+            self.assertEqual(lock.read_version(), version + 1)
+        with self.quiet():
+            self.manager.undo()
+        self.assertFalse(any(task.completed for task in self.manager.tasks))
+
+    def test_deadlines_and_removal_by_query(self):
+        with self.quiet():
+            self.manager.bulk_set_deadline("отчет", "10:00 01.06.2030", save=False)
+            self.manager.bulk_shift_deadline("deadline>2030-01-01", -24, save=False)
+            summary = self.manager.bulk_remove("status:open deadline<2030-01-01", save=False)
+        self.assertEqual(summary["изменено"], 0)
+        self.assertEqual([task.deadline for task in list(self.manager.tasks)[:2]], ["2030-05-31 10:00:00"] * 2)
+        with self.quiet():
+            summary = self.manager.bulk_remove(lambda task: task.deadline is None, save=False)
+        self.assertEqual(summary["изменено"], 2)
+        self.assertEqual([task.title for task in self.manager.tasks], ["Отчет за март", "Отчет за апрель"])
+        # Удаленная предварительная задача больше не блокирует зависимую
+        self.assertEqual(sorted(task.title for task in self.manager.ready_tasks()), ["Отчет за апрель", "Отчет за март"])
+
+    def test_invalid_query_is_reported(self):
+        with self.assertRaises(ValueError):
+            taskmanager.parse_task_query("created<")
+
+
+class TableRendererTest(DataDirTestCase):
+    def test_cached_table_matches_fresh_rendering(self):
+        with self.quiet():
+            manager = taskmanager.TaskManager("Таблица Тестов")
+            for i in range(5):
+                manager.add_task(f"Задача {i}", "короткое")
+        renderer = taskmanager.TaskTableRenderer()
+        renderer.render(manager.tasks)
+        with self.quiet():
+            manager.set_task_tags(1, "тег")
+            manager.change_task_status(2)
+            manager.add_task("Задача с очень длинным названием, которое расширяет колонку", "много\nстрок")
+            manager.remove_task(0)
+        table = renderer.render(manager.tasks)
+        self.assertEqual(table, taskmanager.TaskTableRenderer().render(manager.tasks))
+        lines = table.splitlines()
+        self.assertEqual(len({len(line) for line in lines}), 1)  # Все строки одной ширины
+        self.assertEqual(len(lines), 3 + 2 * len(manager.tasks))
+        self.assertIn("много строк", table)
@@ -0,0 +1,63 @@
+import json
+import os
+
+import taskmanager
+from tests.support import DataDirTestCase
+
+
+class ChangeFeedTest(DataDirTestCase):
+    def test_events_are_numbered_across_segments(self):
+        feed = taskmanager.ChangeFeed(segment_events=4)
+        feed.append([{"type": "e", "n": n} for n in range(3)])
+        self.assertEqual(feed.append([{"type": "e", "n": n} for n in range(3, 10)]), 10)
+        self.assertEqual([first for first, _ in feed.segments()], [1, 5, 9])
+        self.assertEqual([event["n"] for event in feed.read()], list(range(10)))
+        self.assertEqual([event["seq"] for event in feed.read(after=6, limit=2)], [7, 8])
+
+    def test_save_writes_events_with_data(self):
+        with self.quiet():
+            manager = taskmanager.TaskManager("Журнал Тестов")
+            manager.add_task("Задача", "")
+            manager.save_to_file()
+        events = list(taskmanager.CHANGE_FEED.read())
+        self.assertEqual([event["type"] for event in events], ["task_added"])
+        self.assertIn("batch", events[0])
+        self.assertFalse(os.path.exists(manager.filename + ".events"))
+
+    def interrupted_save(self, data_written: bool, feed_written: bool):
+        """Сохранение, прерванное после записи "<файл>.events": данные и журнал - по флагам."""
+        feed = taskmanager.CHANGE_FEED
+        path = taskmanager.task_filename("Сбой Тестов")
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump([], file)
+        with taskmanager.FileLock(path) as lock:
+            version = lock.read_version() + 1
+            recording = feed.recording(path, version, [{"type": "task_added", "user": "Сбой Тестов", "uid": "x"}])
+            recording.__enter__()
+            if data_written:
+                lock.write_version(version)
+            if feed_written:
+                with open(path + ".events", 'r', encoding='utf-8') as file:
+                    feed.append(json.load(file)["events"])
+        self.assertTrue(os.path.exists(path + ".events"))
+        with self.quiet():
+            taskmanager.TaskManager("Сбой Тестов")  # Загрузка разбирает следы сбоя
+        self.assertFalse(os.path.exists(path + ".events"))
+        return [event["uid"] for event in feed.read()]
+
+    def test_recovery_appends_events_of_written_data(self):
+        self.assertEqual(self.interrupted_save(data_written=True, feed_written=False), ["x"])
+
+    def test_recovery_drops_events_of_unwritten_data(self):
+        self.assertEqual(self.interrupted_save(data_written=False, feed_written=False), [])
+
+    def test_recovery_does_not_repeat_appended_events(self):
+        self.assertEqual(self.interrupted_save(data_written=True, feed_written=True), ["x"])
+
+    def test_shared_list_events_are_recorded(self):
+        shared = taskmanager.SharedTaskList("команда")
+        shared.add_members(["Анна Тестова"])
+        record = shared.add_task("Общая", "")
+        shared.set_completed(record["uid"], "Анна Тестова", True)
+        self.assertEqual([event["type"] for event in taskmanager.CHANGE_FEED.read()],
+                         ["task_added", "task_status_changed"])
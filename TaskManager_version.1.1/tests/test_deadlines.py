@@ -0,0 +1,82 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+
+import taskmanager
+from tests.support import DataDirTestCase
+
+
+class TimerWheelTest(unittest.TestCase):
+    def test_timers_fire_at_their_tick_across_levels(self):
+        rng = random.Random(2)
+        wheel = taskmanager.TimerWheel(tick_seconds=1, slots=4, levels=3, start=0)
+        due = {}
+        for number in range(200):
+            when = rng.uniform(0, 200)  # Дальше полного оборота (4 ** 3 тиков) - через переполнение
+            due[wheel.schedule(when, number)] = (int(when), number)
+        cancelled = set(rng.sample(sorted(due), 20))
+        for handle in cancelled:
+            self.assertTrue(wheel.cancel(handle))
+            self.assertFalse(wheel.cancel(handle))
+        fired = {}
+        for now in range(0, 204, 3):
+            for number in wheel.advance(now):
+                fired[number] = now
+        expected = {number: tick for handle, (tick, number) in due.items() if handle not in cancelled}
+        self.assertEqual(set(fired), set(expected))
+        for number, now in fired.items():
+            self.assertTrue(expected[number] <= now < expected[number] + 3, (number, now))
+        self.assertEqual(len(wheel), 0)
+
+    def test_past_timer_fires_on_next_advance(self):
+        wheel = taskmanager.TimerWheel(start=100)
+        wheel.schedule(50, "просрочен")
+        self.assertEqual(wheel.advance(100), ["просрочен"])
+
+
+class DeadlineSchedulerTest(unittest.TestCase):
+    def test_overdue_and_lead_events(self):
+        sink = []
+        scheduler = taskmanager.DeadlineScheduler(sink, lead_minutes=(10,))
+        now = scheduler.wheel.current_tick + 1.0
+        deadline = lambda minutes: datetime.fromtimestamp(now + minutes * 60).strftime("%Y-%m-%d %H:%M:%S")
+        records = [{"uid": "a", "title": "Скоро", "completed": False, "deadline": deadline(30)},
+                   {"uid": "b", "title": "Готово", "completed": True, "deadline": deadline(30)},
+                   {"uid": "c", "title": "Через 5 минут", "completed": False, "deadline": deadline(5)},
+                   {"uid": "d", "title": "Просрочена", "completed": False, "deadline": deadline(-5)}]
+        scheduler.reschedule_user("Анна", records, now)
+        events = [(event["event"], event["uid"]) for event in scheduler.wheel.advance(now + 25 * 60)]
+        self.assertEqual(sorted(events), [("due_soon", "a"), ("overdue", "c")])  # Моменты в прошлом не планируются
+        scheduler.reschedule_user("Анна", records[:1], now)  # Прежние таймеры пользователя отменяются
+        self.assertEqual(len(scheduler.wheel), 2)
+
+
+class DeadlineIndexTest(DataDirTestCase):
+    def test_index_follows_saves_of_all_users(self):
+        now = datetime.now()
+        soon = (now + timedelta(hours=2)).strftime("%H:%M %d.%m.%Y")
+        later = (now + timedelta(days=3)).strftime("%H:%M %d.%m.%Y")
+        with self.quiet():
+            first = taskmanager.TaskManager("Анна Срокова")
+            first.add_task("Скоро", "")
+            first.add_task("Позже", "")
+            first.set_task_deadline(0, soon)
+            first.set_task_deadline(1, later)
+            first.save_to_file()
+            second = taskmanager.TaskManager("Иван Сроков")
+            second.add_task("Тоже скоро", "")
+            second.set_task_deadline(0, soon)
+            second.save_to_file()
+        index = taskmanager.DEADLINE_INDEX
+        titles = lambda entries: sorted(entry["title"] for entry in entries)
+        self.assertEqual(titles(index.due_soon(24)), ["Скоро", "Тоже скоро"])
+        self.assertEqual(titles(index.overdue(now + timedelta(days=4))), ["Позже", "Скоро", "Тоже скоро"])
+
+        with self.quiet():
+            first.change_task_status(0)
+            first.save_to_file()
+        self.assertEqual(titles(index.due_soon(24)), ["Тоже скоро"])
+        files = sorted(taskmanager.os.listdir(index.path))
+        self.assertEqual(index.rebuild(["Анна Срокова", "Иван Сроков"]), 2)
+        self.assertEqual(sorted(taskmanager.os.listdir(index.path)), files)
+        self.assertEqual(titles(index.overdue(now + timedelta(days=4))), ["Позже", "Тоже скоро"])
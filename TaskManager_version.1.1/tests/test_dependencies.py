@@ -0,0 +1,89 @@
+import random
+import unittest
+
+import taskmanager
+from tests.support import DataDirTestCase
+
+
+def reaches(graph, start, target):
+    """Есть ли путь start -> target по ребрам графа (простой обход для сверки)."""
+    stack, seen = [start], {start}
+    while stack:
+        uid = stack.pop()
+        if uid == target:
+            return True
+        for dependent in graph._dependents[uid] - seen:
+            seen.add(dependent)
+            stack.append(dependent)
+    return False
+
+
+class DependencyGraphTest(unittest.TestCase):
+    def test_incremental_order_stays_topological_and_rejects_cycles(self):
+        rng = random.Random(3)
+        tasks = [taskmanager.Task(f"Задача {i}", "", uid=f"t{i}") for i in range(30)]
+        graph = taskmanager.DependencyGraph(tasks)
+        for _ in range(300):
+            prerequisite, dependent = rng.sample([task.uid for task in tasks], 2)
+            closes_cycle = reaches(graph, dependent, prerequisite)
+            edges = {uid: set(prerequisites) for uid, prerequisites in graph._prerequisites.items()}
+            cycle = graph.add_edge(prerequisite, dependent)
+            if closes_cycle:
+                self.assertEqual((cycle[0], cycle[-1]), (dependent, dependent))
+                self.assertEqual(graph._prerequisites, edges)  # Граф не изменился
+            else:
+                self.assertIsNone(cycle)
+            for uid, prerequisites in graph._prerequisites.items():
+                for before in prerequisites:
+                    self.assertLess(graph._order[before], graph._order[uid])
+
+    def test_ready_and_blocked_follow_completion(self):
+        first = taskmanager.Task("Первая", "", uid="a")
+        second = taskmanager.Task("Вторая", "", uid="b", depends_on=["a", "архивная"])
+        graph = taskmanager.DependencyGraph([first, second])
+        self.assertEqual((graph.ready, graph.blocked), ({"a"}, {"b"}))
+        done = first.copy()
+        done.mark_completed()
+        graph.update(first, done)
+        self.assertEqual((graph.ready, graph.blocked), ({"b"}, set()))
+        graph.update(done, first)
+        self.assertEqual((graph.ready, graph.blocked), ({"a"}, {"b"}))
+
+
+class TaskManagerDependenciesTest(DataDirTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.quiet():
+            self.manager = taskmanager.TaskManager("Граф Тестов")
+            for title in ("Проект", "Код", "Релиз"):
+                self.manager.add_task(title, "")
+            self.manager.add_task_dependency(1, 0)
+            self.manager.add_task_dependency(2, 1)
+
+    def titles(self, tasks):
+        return [task.title for task in tasks]
+
+    def test_cycle_is_not_added(self):
+        with self.quiet():
+            self.manager.add_task_dependency(0, 2)
+        self.assertEqual(self.manager.tasks[0].depends_on, ())
+
+    def test_blocked_task_cannot_be_completed(self):
+        with self.quiet():
+            self.manager.change_task_status(1)
+        self.assertFalse(self.manager.tasks[1].completed)
+        with self.quiet():
+            self.manager.change_task_status(0)
+            self.manager.change_task_status(1)
+        self.assertTrue(self.manager.tasks[1].completed)
+        self.assertEqual(self.titles(self.manager.ready_tasks()), ["Релиз"])
+
+    def test_removed_prerequisite_is_dropped_and_restored_by_undo(self):
+        with self.quiet():
+            self.manager.remove_task(0)
+        self.assertEqual(self.manager.tasks[0].depends_on, ())
+        self.assertEqual(self.titles(self.manager.ready_tasks()), ["Код"])
+        with self.quiet():
+            self.manager.undo()
+        self.assertEqual(self.titles(self.manager.ready_tasks()), ["Проект"])
+        self.assertEqual(sorted(self.titles(task for task, _ in self.manager.blocked_tasks())), ["Код", "Релиз"])
@@ -0,0 +1,26 @@
+import threading
+
+import taskmanager
+from tests.support import DataDirTestCase
+
+
+class WriteCoordinatorTest(DataDirTestCase):
+    def test_concurrent_writes_share_batches_and_last_write_wins(self):
+        coordinator = taskmanager.WriteCoordinator(max_delay=0.05)
+        writers = [threading.Thread(target=coordinator.write, args=([(f"file{i % 4}.txt", str(i).encode())],))
+                   for i in range(16)]
+        for thread in writers:
+            thread.start()
+        for thread in writers:
+            thread.join(5)
+        self.assertEqual(coordinator.stats["requests"], 16)
+        self.assertLess(coordinator.stats["batches"], 16)
+        self.assertEqual(coordinator.stats["files"] + coordinator.stats["coalesced"], 16)
+        coordinator.write([("file0.txt", b"last")])
+        with open("file0.txt", 'rb') as file:
+            self.assertEqual(file.read(), b"last")
+
+    def test_failed_write_is_raised_to_caller(self):
+        coordinator = taskmanager.WriteCoordinator()
+        with self.assertRaises(OSError):
+            coordinator.write([("нет/такой/папки.txt", b"data")])
@@ -0,0 +1,72 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+
+import taskmanager
+from tests.support import DataDirTestCase
+
+
+def height(node):
+    return node.height if node else 0
+
+
+class PersistentTaskListTest(unittest.TestCase):
+    def assert_balanced(self, node):
+        if node is None:
+            return
+        self.assertLessEqual(abs(height(node.left) - height(node.right)), 1)
+        self.assertEqual(node.size, (node.left.size if node.left else 0) + (node.right.size if node.right else 0) + 1)
+        self.assert_balanced(node.left)
+        self.assert_balanced(node.right)
+
+    def test_matches_list_and_keeps_old_versions(self):
+        rng = random.Random(5)
+        model = list(range(50))
+        current = taskmanager.PersistentTaskList(model)
+        versions = [(current, list(model))]
+        for step in range(500):
+            operation = rng.random()
+            if operation < 0.3 and model:
+                index = rng.randrange(len(model))
+                current, model[index] = current.set(index, -step), -step
+            elif operation < 0.6:
+                index = rng.randint(0, len(model))
+                current = current.insert(index, step)
+                model.insert(index, step)
+            elif operation < 0.8 or not model:
+                current = current.append(step)
+                model.append(step)
+            else:
+                index = rng.randrange(len(model))
+                current = current.delete(index)
+                del model[index]
+            versions.append((current, list(model)))
+        self.assert_balanced(current._root)
+        for version, expected in versions:
+            self.assertEqual(list(version), expected)
+            self.assertEqual(len(version), len(expected))
+        self.assertEqual(current[-1], model[-1])
+
+
+class TaskHistoryTest(DataDirTestCase):
+    def test_undo_redo_and_as_of(self):
+        with self.quiet():
+            manager = taskmanager.TaskManager("История Тестов", history_depth=2)
+            started = datetime.now()
+            for title in ("А", "Б", "В"):
+                manager.add_task(title, "")
+        titles = lambda tasks: [task.title for task in tasks]
+        self.assertEqual(titles(manager.history.as_of(started + timedelta(minutes=1))), ["А", "Б", "В"])
+        with self.quiet():
+            manager.undo()
+            manager.undo()
+            manager.undo()  # Глубина истории - 2 действия
+        self.assertEqual(titles(manager.tasks), ["А"])
+        with self.quiet():
+            manager.redo()
+        self.assertEqual(titles(manager.tasks), ["А", "Б"])
+        with self.quiet():
+            manager.add_task("Г", "")
+            manager.redo()  # Новое действие отменяет повтор
+        self.assertEqual(titles(manager.tasks), ["А", "Б", "Г"])
+        self.assertIsNone(manager.history.as_of(started - timedelta(minutes=1)))
@@ -0,0 +1,23 @@
+import glob
+import os
+import tempfile
+
+import taskmanager
+from tests.support import DataDirTestCase
+
+
+class LoadTestTest(DataDirTestCase):
+    def test_temporary_data_directory_is_removed(self):
+        pattern = os.path.join(tempfile.gettempdir(), "taskmanager-load-*")
+        before = set(glob.glob(pattern))
+        with self.quiet():
+            _, summary = taskmanager.run_load_test(sessions=2, operations=4, think_ms=0, seed=1)
+        self.assertEqual(set(glob.glob(pattern)), before)
+        self.assertEqual((summary["session_failures"], summary["broken_files"], summary["lost_tasks"]), (0, 0, 0))
+
+    def test_given_data_directory_is_kept(self):
+        with self.quiet():
+            _, summary = taskmanager.run_load_test(sessions=1, operations=2, think_ms=0, data_dir="load", seed=1)
+        self.assertEqual(summary["data_dir"], "load")
+        self.assertTrue(os.path.exists(os.path.join("load", "users.txt")))
+
@@ -0,0 +1,35 @@
+import gc
+import os
+
+import taskmanager
+from tests.support import DataDirTestCase
+
+
+class SharedStringPoolTest(DataDirTestCase):
+    def test_compact_managers_share_strings_until_released(self):
+        with self.quiet():
+            first = taskmanager.TaskManager("первый", compact=True)
+            second = taskmanager.TaskManager("второй", compact=True)
+            first.add_task("".join(["Ознак", "омиться"]), "с новой версией кода")
+            second.add_task("".join(["Ознак", "омиться"]), "с новой версией кода")
+        self.assertIs(first.tasks[0].title, second.tasks[0].title)
+        self.assertEqual(first.tasks[0].to_record()["title"], "Ознакомиться")
+
+        del first
+        gc.collect()
+        self.assertEqual(len(taskmanager.SHARED_STRING_POOL), 2)  # Второй TaskManager еще пользуется пулом
+        del second
+        gc.collect()
+        self.assertEqual(len(taskmanager.SHARED_STRING_POOL), 0)
+
+    def test_report_releases_pool(self):
+        with self.quiet():
+            manager = taskmanager.TaskManager("Анна Отчетова")
+            manager.add_task("Задача", "")
+            manager.change_task_status(0)
+            manager.save_to_file()
+            users = taskmanager.UserManager()
+            users.add_user("Анна", "Отчетова")
+            users.save_report_all_users()
+        self.assertTrue(any(name.startswith("report") for name in os.listdir(self.path)))
+        self.assertEqual(len(taskmanager.SHARED_STRING_POOL), 0)
@@ -0,0 +1,82 @@
+import unittest
+
+import taskmanager
+from tests.support import DataDirTestCase
+
+
+def record(uid, **fields):
+    return {"title": uid, "description": "", "completed": False, "created_at": "2025-01-01 10:00:00",
+            "completed_at": None, "deadline": None, "uid": uid, **fields}
+
+
+class MergeRecordsTest(unittest.TestCase):
+    def test_tasks_added_on_both_sides_are_kept(self):
+        merged, conflicts = taskmanager.merge_task_records({}, [record("a")], [record("b")])
+        self.assertEqual(sorted(item["uid"] for item in merged), ["a", "b"])
+        self.assertEqual(conflicts, [])
+
+    def test_different_fields_of_one_task_are_merged(self):
+        base = {"a": record("a")}
+        ours = [record("a", deadline="2025-02-01 10:00:00")]
+        theirs = [record("a", completed=True, completed_at="2025-01-02 10:00:00")]
+        merged, conflicts = taskmanager.merge_task_records(base, ours, theirs)
+        self.assertEqual(conflicts, [])
+        self.assertEqual(merged, [record("a", completed=True, completed_at="2025-01-02 10:00:00",
+                                         deadline="2025-02-01 10:00:00")])
+
+    def test_same_field_changed_on_both_sides_conflicts(self):
+        base = {"a": record("a")}
+        ours = [record("a", deadline="2025-02-01 10:00:00")]
+        theirs = [record("a", deadline="2025-03-01 10:00:00")]
+        merged, conflicts = taskmanager.merge_task_records(base, ours, theirs)
+        self.assertEqual((merged, conflicts), ([], ["a"]))
+        merged, conflicts = taskmanager.merge_task_records(base, ours, theirs, prefer_ours=True)
+        self.assertEqual((merged, conflicts), (ours, ["a"]))
+
+    def test_removed_task_changed_elsewhere_conflicts(self):
+        base = {"a": record("a")}
+        merged, conflicts = taskmanager.merge_task_records(base, [], [record("a", title="новое")])
+        self.assertEqual((merged, conflicts), ([], ["a"]))
+
+    def test_removal_of_unchanged_task_is_kept(self):
+        base = {"a": record("a"), "b": record("b")}
+        merged, conflicts = taskmanager.merge_task_records(base, [record("a")], [record("a"), record("b")])
+        self.assertEqual(([item["uid"] for item in merged], conflicts), (["a"], []))
+
+
+class ConcurrentSessionsTest(DataDirTestCase):
+    def open_sessions(self):
+        with self.quiet():
+            first = taskmanager.TaskManager("Тест")
+            first.add_task("Отчет", "")
+            first.save_to_file()
+            second = taskmanager.TaskManager("Тест")
+        return first, second
+
+    def test_status_and_deadline_changes_are_merged_on_save(self):
+        first, second = self.open_sessions()
+        with self.quiet():
+            first.change_task_status(0)
+            first.save_to_file()
+            second.set_task_deadline(0, "10:00 01.12.2026")
+            second.save_to_file()
+            reloaded = taskmanager.TaskManager("Тест")
+        self.assertTrue(second.last_saved)
+        self.assertTrue(reloaded.tasks[0].completed)
+        self.assertEqual(reloaded.tasks[0].deadline, "2026-12-01 10:00:00")
+
+    def test_merge_from_file_keeps_local_edits_and_unblocks_save(self):
+        first, second = self.open_sessions()
+        with self.quiet():
+            first.set_task_deadline(0, "10:00 01.12.2026")
+            first.add_task("Созвон", "")
+            first.save_to_file()
+            second.set_task_deadline(0, "11:00 02.12.2026")
+            second.save_to_file()
+            self.assertFalse(second.last_saved)
+            second.merge_from_file()
+            second.save_to_file()
+            reloaded = taskmanager.TaskManager("Тест")
+        self.assertTrue(second.last_saved)
+        self.assertEqual([(task.title, task.deadline) for task in reloaded.tasks],
+                         [("Отчет", "2026-12-02 11:00:00"), ("Созвон", None)])
@@ -0,0 +1,44 @@
+import json
+import os
+
+import taskmanager
+from tests.support import DataDirTestCase
+
+
+class LegacyMigratorTest(DataDirTestCase):
+    def write_legacy(self, directory, script, files):
+        os.makedirs(directory)
+        open(os.path.join(directory, script), 'w').close()
+        for name, records in files.items():
+            with open(os.path.join(directory, name), 'w', encoding='utf-8') as file:
+                json.dump(records, file, ensure_ascii=False)
+
+    def test_records_are_normalized_deduplicated_and_rerun_is_skipped(self):
+        same = {"title": "Общая", "description": "", "completed": False, "created_at": "2023-05-01 10:00:00"}
+        self.write_legacy(os.path.join("legacy", "old"), "TaskManager.py", {"Анна Старая_tasks.json": [
+            same,
+            {"title": "Готово", "completed": "true", "created_at": "2023-05-02T09:30:00", "completed_at": "01.06.2023 12:00"},
+            {"title": "  ", "completed": False},
+            "не задача",
+        ]})
+        self.write_legacy(os.path.join("legacy", "viktor"), "TaskManager4.py", {"Анна_Старая_tasks.json": [same]})
+        os.makedirs("target")
+
+        results = taskmanager.LegacyMigrator("target", workers=2).run(["legacy"])
+        by_layout = {result["layout"]: result for result in results}
+        self.assertEqual({layout: (result["read"], result["rejected"]) for layout, result in by_layout.items()},
+                         {"old": (4, 2), "viktor": (1, 0)})
+        # Файлы одного пользователя обрабатываются параллельно: одинаковая задача переносится один раз
+        self.assertEqual((sum(result["migrated"] for result in results), sum(result["duplicates"] for result in results)),
+                         (2, 1))
+
+        records = taskmanager.read_task_records(os.path.join("target", taskmanager.task_filename("Анна Старая")))
+        done = next(record for record in records if record["title"] == "Готово")
+        self.assertEqual((done["completed"], done["created_at"], done["completed_at"]),
+                         (True, "2023-05-02 09:30:00", "2023-06-01 12:00:00"))
+        with open(os.path.join("target", "users.txt"), encoding='utf-8') as file:
+            self.assertEqual(file.read().split("\n"), ["Анна Старая"])
+
+        again = taskmanager.LegacyMigrator("target").run(["legacy"])
+        self.assertTrue(all(result["status"].startswith("пропущен") for result in again))
+        self.assertEqual(len(taskmanager.read_task_records(os.path.join("target", taskmanager.task_filename("Анна Старая")))), 2)
@@ -0,0 +1,41 @@
+import random
+import unittest
+
+import taskmanager
+from tests.support import DataDirTestCase
+
+
+class IndexedHeapTest(unittest.TestCase):
+    def test_matches_sorted_items_after_pushes_and_removals(self):
+        rng = random.Random(11)
+        heap = taskmanager.IndexedHeap((rng.random(), uid) for uid in range(100))
+        items = {uid: key for key, uid in heap._heap}
+        for _ in range(1000):
+            uid = rng.randrange(150)
+            if rng.random() < 0.6:
+                items[uid] = rng.random()
+                heap.push(items[uid], uid)
+            else:
+                self.assertEqual(heap.remove(uid), items.pop(uid, None) is not None)
+        expected = sorted((key, uid) for uid, key in items.items())
+        self.assertEqual(len(heap), len(expected))
+        self.assertEqual(heap.peek(), expected[0])
+        self.assertEqual(list(heap.smallest(10)), expected[:10])
+        self.assertEqual(list(heap.smallest(len(expected) + 5)), expected)
+
+
+class TopTasksTest(DataDirTestCase):
+    def test_order_by_priority_then_deadline(self):
+        with self.quiet():
+            manager = taskmanager.TaskManager("Приоритет Тестов")
+            for title in ("Обычная", "Срочная", "Со сроком", "Низкая", "Выполненная"):
+                manager.add_task(title, "")
+            manager.set_task_priority(1, 1)
+            manager.set_task_deadline(2, "10:00 01.01.2030")
+            manager.set_task_priority(3, 4)
+            manager.set_task_priority(4, 1)
+            manager.change_task_status(4)
+        self.assertEqual([task.title for task in manager.top_tasks(3)], ["Срочная", "Со сроком", "Обычная"])
+        self.assertEqual([task.title for task in manager.top_tasks()][-1], "Низкая")
+        self.assertEqual(manager.top_tasks(), sorted((task for task in manager.tasks if not task.completed),
+                                                     key=taskmanager.priority_key))
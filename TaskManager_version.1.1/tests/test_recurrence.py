@@ -0,0 +1,77 @@
+import unittest
+from datetime import datetime
+
+import taskmanager
+from tests.support import DataDirTestCase
+
+
+def weekly_task(count=None):
+    task = taskmanager.Task("Планерка", "")
+    task.deadline = "2026-01-05 09:00:00"
+    task.set_recurrence("weekly", count=count)
+    return task
+
+
+class RecurrenceTest(unittest.TestCase):
+    def test_completion_moves_deadline_to_next_occurrence(self):
+        task = weekly_task()
+        task.mark_completed()
+        self.assertEqual(task.deadline, "2026-01-12 09:00:00")
+        self.assertFalse(task.completed)
+
+    def test_series_closes_after_last_occurrence(self):
+        task = weekly_task(count=2)
+        task.mark_completed()
+        task.mark_completed()
+        self.assertTrue(task.completed)
+
+    def test_reschedule_keeps_completed_occurrences(self):
+        task = weekly_task(count=5)
+        for _ in range(3):
+            task.mark_completed()
+        self.assertTrue(task.set_deadline("10:00 01.03.2026"))
+
+        rows = list(taskmanager.completed_report_rows([task]))
+        self.assertEqual([row["Название задачи"] for row in rows],
+                         ["Планерка (05.01.2026)", "Планерка (12.01.2026)", "Планерка (19.01.2026)"])
+        moments = [moment for _, moment in taskmanager.iter_occurrences(task.recurrence)]
+        self.assertEqual(moments[3:], [datetime(2026, 3, 1, 10), datetime(2026, 3, 8, 10)])
+
+    def test_reschedule_keeps_count_budget(self):
+        task = weekly_task(count=4)
+        for _ in range(3):
+            task.mark_completed()
+        task.set_deadline("10:00 01.03.2026")
+        task.mark_completed()
+        self.assertTrue(task.completed)
+
+    def test_window_skips_earlier_occurrences(self):
+        task = weekly_task()
+        window = list(taskmanager.iter_occurrences(task.recurrence, datetime(2026, 2, 1), datetime(2026, 2, 28)))
+        self.assertEqual([number for number, _ in window], [4, 5, 6, 7])
+
+
+class BulkRescheduleTest(DataDirTestCase):
+    def test_bulk_deadline_keeps_completed_occurrences(self):
+        with self.quiet():
+            manager = taskmanager.TaskManager("Тест")
+            manager.add_task("Планерка", "")
+            manager.set_task_deadline(0, "09:00 05.01.2026")
+            manager.set_task_recurrence(0, "weekly")
+            manager.change_task_status(0)
+            manager.change_task_status(0)
+            manager.bulk_set_deadline(lambda task: True, "09:00 02.03.2026", save=False)
+        self.assertEqual(len(list(taskmanager.completed_report_rows(manager.tasks))), 2)
+        self.assertEqual(manager.tasks[0].deadline, "2026-03-02 09:00:00")
+
+    def test_bulk_shift_moves_only_pending_occurrences(self):
+        with self.quiet():
+            manager = taskmanager.TaskManager("Тест")
+            manager.add_task("Планерка", "")
+            manager.set_task_deadline(0, "09:00 05.01.2026")
+            manager.set_task_recurrence(0, "weekly")
+            manager.change_task_status(0)
+            manager.bulk_shift_deadline(lambda task: True, 24, save=False)
+        moments = [moment for _, moment in taskmanager.iter_occurrences(manager.tasks[0].recurrence,
+                                                                           end=datetime(2026, 1, 21))]
+        self.assertEqual(moments, [datetime(2026, 1, 5, 9), datetime(2026, 1, 13, 9), datetime(2026, 1, 20, 9)])
@@ -0,0 +1,117 @@
+import csv
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+import taskmanager
+from tests.support import DataDirTestCase
+
+
+def completed_record(title, created_at, completed_at, deadline=None):
+    return taskmanager.Task(title, "описание", True, created_at, completed_at, deadline).to_record()
+
+
+class ReportWritersTest(DataDirTestCase):
+    ROWS = [{"#": 1, "Название задачи": "Первая, с запятой", "Описание задачи": "<b>", "Создано": "2025-01-01 10:00:00",
+             "Завершено": "2025-01-02 10:00:00"},
+            {"#": 2, "Название задачи": "Вторая", "Описание задачи": "", "Создано": "2025-01-01 11:00:00",
+             "Завершено": "2025-01-03 10:00:00"}]
+
+    def write(self, fmt, compress=False):
+        with taskmanager.REPORT_WRITERS[fmt]("report", compress) as writer:
+            self.assertEqual(writer.write_section(iter(self.ROWS), "Анна"), 2)
+            self.assertEqual(writer.write_section(iter([]), "Иван"), 0)
+        return writer.filename
+
+    def test_all_formats_carry_the_same_rows(self):
+        with open(self.write("csv"), encoding='utf-8', newline='') as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(rows[0], list(taskmanager.CsvReportWriter.COLUMNS))
+        self.assertEqual(rows[1:], [["Анна", *map(str, row.values())] for row in self.ROWS])
+
+        with gzip.open(self.write("jsonl", compress=True), 'rt', encoding='utf-8') as file:
+            self.assertEqual([json.loads(line) for line in file], [{"Пользователь": "Анна", **row} for row in self.ROWS])
+
+        with open(self.write("html"), encoding='utf-8') as file:
+            html = file.read()
+        self.assertEqual(html.count("<tr><td>"), 2)
+        self.assertIn("&lt;b&gt;", html)
+        self.assertTrue(html.rstrip().endswith("</html>"))
+
+        with open(self.write("txt"), encoding='utf-8') as file:
+            text = file.read()
+        self.assertIn("Отчет для пользователя: Анна", text)
+        self.assertIn("Нет выполненных задач для пользователя Иван", text)
+
+
+class ReportSnapshotTest(DataDirTestCase):
+    def test_snapshot_keeps_state_while_saves_continue(self):
+        with self.quiet():
+            manager = taskmanager.TaskManager("Снимок Тестов")
+            manager.add_task("До снимка", "")
+            manager.save_to_file()
+            with taskmanager.ReportSnapshot(["Снимок Тестов"]) as snapshot:
+                manager.add_task("После снимка", "")
+                manager.save_to_file()  # Не ждет окончания отчета
+                records = taskmanager.read_user_records("Снимок Тестов", directory=snapshot.path)
+                path = snapshot.path
+        self.assertEqual([record["title"] for record in records], ["До снимка"])
+        self.assertEqual(len(taskmanager.read_user_records("Снимок Тестов")), 2)
+        self.assertFalse(os.path.exists(path))
+
+
+class AnalyticsTest(DataDirTestCase):
+    def test_metrics_match_records_and_only_changed_users_are_reread(self):
+        base = datetime(2025, 3, 3, 9, 0)
+        stamp = lambda hours: (base + timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
+        records = {
+            "Анна Метрикова": [completed_record("Вовремя", stamp(0), stamp(2), stamp(5)),
+                               completed_record("Поздно", stamp(0), stamp(10), stamp(5)),
+                               taskmanager.Task("Открыта", "", created_at=stamp(0), deadline=stamp(1)).to_record()],
+            "Иван Метриков": [completed_record("Через неделю", stamp(0), stamp(24 * 7 + 4))],
+        }
+        for user_name, user_records in records.items():
+            with open(taskmanager.task_filename(user_name), 'wb') as file:
+                file.write(taskmanager.dump_task_records(user_records))
+        analytics = taskmanager.TaskAnalytics()
+        result = analytics.compute(list(records), now=(base + timedelta(days=30)).timestamp())
+        anna, total = result["users"]["Анна Метрикова"], result["total"]
+        self.assertEqual((anna["tasks"], anna["completed"], anna["completion_rate"]), (3, 2, round(2 / 3, 4)))
+        self.assertEqual(anna["overdue_ratio"], round(2 / 3, 4))  # Выполнена поздно и открыта после срока
+        self.assertEqual(total["weekly_throughput"], {"2025-W10": 2, "2025-W11": 1})
+        self.assertEqual(total["lead_time_p50_hours"], 10.0)
+
+        cached = analytics._rollups["Иван Метриков"][1]
+        with self.quiet():
+            manager = taskmanager.TaskManager("Анна Метрикова")
+            manager.remove_task(2)
+            manager.save_to_file()
+        result = analytics.compute(list(records))
+        self.assertIs(analytics._rollups["Иван Метриков"][1], cached)
+        self.assertEqual(result["users"]["Анна Метрикова"]["tasks"], 2)
+
+
+class SharedTaskListTest(DataDirTestCase):
+    def test_copies_become_one_task_with_per_member_status(self):
+        users = ["Анна Общая", "Иван Общий", "Петр Отдельный"]
+        with self.quiet():
+            for user_name in users:
+                manager = taskmanager.TaskManager(user_name)
+                manager.add_task("Ознакомиться", "с новой версией кода")
+                manager.add_task(f"Своя задача {user_name}", "")
+                if user_name == users[0]:
+                    manager.change_task_status(0)
+                manager.save_to_file()
+            self.assertEqual(taskmanager.share_duplicate_tasks("команда", users[:2]), 1)
+            anna, ivan, petr = (taskmanager.TaskManager(user_name) for user_name in users)
+        data = taskmanager.SharedTaskList("команда").load()
+        self.assertEqual((len(data["tasks"]), data["members"]), (1, users[:2]))
+        self.assertEqual([task.title for task in anna.tasks], ["Своя задача Анна Общая"])
+        self.assertEqual(len(petr.tasks), 2)  # Не участвовал в переносе
+        self.assertEqual([task.completed for _, task in anna.shared_tasks()], [True])
+        self.assertEqual([task.completed for _, task in ivan.shared_tasks()], [False])
+        with self.quiet():
+            ivan.change_shared_task_status(0)
+        self.assertEqual([task.completed for _, task in ivan.shared_tasks()], [True])
+        self.assertEqual(petr.shared_tasks(), [])
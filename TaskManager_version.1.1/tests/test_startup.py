@@ -0,0 +1,13 @@
+import taskmanager
+from tests.support import DataDirTestCase
+
+
+class StartupTest(DataDirTestCase):
+    def test_menu_starts_within_budget(self):
+        elapsed_ms, imports = taskmanager.measure_startup(runs=5)
+        self.assertLess(elapsed_ms, taskmanager.STARTUP_BUDGET_MS,
+                        f"запуск {elapsed_ms:.1f} мс, самые медленные импорты: {imports[:5]}")
+
+    def test_tabulate_is_not_imported_at_startup(self):
+        _, imports = taskmanager.measure_startup(runs=1)
+        self.assertNotIn("tabulate", [name for _, name in imports])
@@ -0,0 +1,116 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+import taskmanager
+from tests.support import DataDirTestCase
+
+
+def record(title, created_at, completed=False, completed_at=None, deadline=None):
+    return taskmanager.Task(title, "", completed, created_at, completed_at, deadline).to_record()
+
+
+class ChecksumTest(DataDirTestCase):
+    def save_tasks(self, user_name, titles):
+        with self.quiet():
+            manager = taskmanager.TaskManager(user_name)
+            for title in titles:
+                manager.add_task(title, "")
+            manager.save_to_file()
+        return manager.filename
+
+    def test_damaged_record_is_skipped_and_truncated_file_salvaged(self):
+        filename = self.save_tasks("Сумма Тестов", ["Первая", "Вторая", "Третья"])
+        with open(filename, 'rb') as file:
+            data = file.read()
+        with open(filename, 'wb') as file:
+            file.write(data.replace("Вторая".encode("utf-8"), "Втораю".encode("utf-8")))
+        records, damaged, unsigned, intact = taskmanager.read_records_file(filename)
+        self.assertEqual(([item["title"] for item in records], damaged, unsigned, intact), (["Первая", "Третья"], 1, 0, True))
+
+        with open(filename, 'wb') as file:
+            file.write(data[:data.index("Третья".encode("utf-8"))])  # Оборванная последняя запись
+        with self.quiet():
+            manager = taskmanager.TaskManager("Сумма Тестов")
+        self.assertEqual([task.title for task in manager.tasks], ["Первая", "Вторая"])
+        self.assertTrue(os.path.exists(filename + ".corrupt"))
+        with self.quiet():
+            manager.save_to_file()
+        self.assertEqual(taskmanager.read_records_file(filename)[1:], (0, 0, True))
+
+    def test_fsck_repairs_damaged_file_and_signs_old_records(self):
+        filename = self.save_tasks("Проверка Тестов", ["Первая", "Вторая"])
+        with open(filename, 'r', encoding='utf-8') as file:
+            records = json.load(file)
+        records[0]["title"] = "Испорчена"
+        del records[1]["checksum"]  # Запись старой версии
+        with open(filename, 'w', encoding='utf-8') as file:
+            json.dump(records, file, ensure_ascii=False)
+        with taskmanager.FileLock(filename, shared=True) as lock:
+            version = lock.read_version()
+
+        result = taskmanager.check_user_data("Проверка Тестов")
+        self.assertEqual((result["Повреждено"], result["Без суммы"], result["Исправлено"]), (1, 1, []))
+        result = taskmanager.check_user_data("Проверка Тестов", repair=True)
+        self.assertTrue(result["Исправлено"])
+        self.assertTrue(os.path.exists(filename + ".corrupt"))
+        result = taskmanager.check_user_data("Проверка Тестов")
+        self.assertEqual((result["Задач"], result["Повреждено"], result["Без суммы"], result["Проблемы"]),
+                         (1, 0, 0, []))
+        with taskmanager.FileLock(filename, shared=True) as lock:
+            self.assertEqual(lock.read_version(), version + 1)
+
+
+class PartitionedStoreTest(DataDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user_name = "Месяцы Тестов"
+        self.store = taskmanager.PartitionedTaskStore(self.user_name)
+        done = (datetime.now() - timedelta(days=500)).strftime("%Y-%m-%d %H:%M:%S")
+        old = (datetime.now() - timedelta(days=400)).strftime("%Y-%m-%d %H:%M:%S")
+        self.months = [done[:7], old[:7], datetime.now().strftime("%Y-%m")]
+        self.records = [record("Старая выполненная", done, True, done),
+                        record("Старая открытая", old, deadline="2000-01-01 10:00:00"),
+                        record("Новая", datetime.now().strftime("%Y-%m-%d %H:%M:%S"), deadline="2100-01-01 10:00:00")]
+        os.makedirs(self.store.path)
+        with taskmanager.FileLock(self.store.manifest_path):
+            self.store.write(self.records, [])
+
+    def test_manifest_prunes_months(self):
+        _, old_month, current_month = self.months
+        self.assertEqual(self.store.select(), self.months)
+        self.assertEqual(self.store.select(created_from=current_month), [current_month])
+        self.assertEqual(self.store.select(open_only=True), [old_month, current_month])
+        # Самый поздний срок открытых задач старого месяца уже прошел
+        self.assertEqual(self.store.select(deadlines_after="2020-01-01 00:00:00"), [current_month])
+        titles = [item["title"] for item in taskmanager.read_user_records(self.user_name, open_only=True)]
+        self.assertEqual(sorted(titles), ["Новая", "Старая открытая"])
+
+    def test_window_loads_recent_and_open_months_and_save_keeps_others(self):
+        with self.quiet():
+            manager = taskmanager.TaskManager(self.user_name, window_months=1)
+        self.assertEqual(sorted(task.title for task in manager.tasks), ["Новая", "Старая открытая"])
+        with self.quiet():
+            manager.add_task("Еще одна", "")
+            manager.save_to_file()
+            full = taskmanager.TaskManager(self.user_name)
+        self.assertEqual(len(full.tasks), 4)
+
+
+class ArchiveTest(DataDirTestCase):
+    def test_old_completed_tasks_move_to_archive_and_stay_searchable(self):
+        user_name = "Архив Тестов"
+        long_ago = (datetime.now() - timedelta(days=90)).strftime("%Y-%m-%d %H:%M:%S")
+        with open(taskmanager.task_filename(user_name), 'wb') as file:
+            file.write(taskmanager.dump_task_records([record("Давняя", long_ago, True, long_ago),
+                                                      record("Открытая", long_ago)]))
+        with self.quiet():
+            manager = taskmanager.TaskManager(user_name)
+            self.assertEqual(manager.archive_completed_tasks(days=30), 1)
+        self.assertEqual([task.title for task in manager.tasks], ["Открытая"])
+        self.assertEqual([item["title"] for item in manager.archive.iter_records()], ["Давняя"])
+        self.assertEqual(manager.archive.segments(completed_from=datetime.now().strftime("%Y-%m-%d")), [])
+        self.assertEqual([(where, task.title) for where, task in manager.search_tasks("давняя")], [("архив", "Давняя")])
+        with self.quiet():
+            reloaded = taskmanager.TaskManager(user_name)
+        self.assertEqual([task.title for task in reloaded.tasks], ["Открытая"])
@@ -0,0 +1,34 @@
+import random
+
+import taskmanager
+from tests.support import DataDirTestCase
+
+
+class TagIndexTest(DataDirTestCase):
+    def test_index_is_updated_in_place_and_matches_rebuild(self):
+        rng = random.Random(7)
+        tags = ["работа", "дом", "срочно", "идея"]
+        with self.quiet():
+            manager = taskmanager.TaskManager("Теги Тестов")
+            for i in range(40):
+                manager.add_task(f"Задача {i}", "")
+            index = manager.tag_index
+            for step in range(200):
+                operation = rng.random()
+                if operation < 0.4:
+                    manager.set_task_tags(rng.randrange(len(manager.tasks)), rng.sample(tags, rng.randint(0, 2)),
+                                          rng.choice([None, "альфа", "бета"]))
+                elif operation < 0.6:
+                    manager.add_task(f"Новая {step}", "")
+                elif operation < 0.8 and len(manager.tasks) > 1:
+                    manager.remove_task(rng.randrange(len(manager.tasks)))
+                else:
+                    manager.change_task_status(rng.randrange(len(manager.tasks)))
+                self.assertIs(manager.tag_index, index)
+        rebuilt = taskmanager.TagIndex(manager.tasks)
+        self.assertEqual((index.size, index.bitsets), (rebuilt.size, rebuilt.bitsets))
+
+        query = "#работа AND NOT project:альфа"
+        expected = [position for position, task in enumerate(manager.tasks)
+                    if "работа" in task.tags and task.project != "альфа"]
+        self.assertEqual([position for position, _ in manager.filter_by_tags(query)], expected)
@@ -0,0 +1,53 @@
+import threading
+
+import taskmanager
+from tests.support import DataDirTestCase
+
+
+class ThreadSafeTaskManagerTest(DataDirTestCase):
+    def make_manager(self, count=20):
+        with self.quiet():
+            manager = taskmanager.ThreadSafeTaskManager("поток")
+            for i in range(count):
+                manager.add_task(f"Задача {i}", "")
+            manager.set_task_tags(0, "важно")
+            manager.add_task_dependency(1, 0)
+        return manager
+
+    def test_views_run_alongside_another_reader(self):
+        manager = self.make_manager()
+        views = (manager.top_tasks, manager.view_top_tasks, manager.ready_tasks, manager.blocked_tasks,
+                 manager.view_dependencies, lambda: manager.filter_by_tags("#важно"))
+        finished = []
+
+        def run_views():
+            with self.quiet():
+                for view in views:
+                    view()
+            finished.append(True)
+
+        # Просмотр под блокировкой записи ждал бы, пока этот поток не отпустит блокировку чтения
+        with manager._rw_lock.read_locked():
+            thread = threading.Thread(target=run_views)
+            thread.start()
+            thread.join(5)
+        self.assertEqual(finished, [True])
+
+    def test_writes_keep_derived_structures_current(self):
+        manager = self.make_manager()
+        manager.top_tasks(), manager.ready_tasks(), manager.filter_by_tags("#важно")
+        with self.quiet():
+            manager.change_task_status(0)
+            manager.set_task_priority(5, 1)
+            manager.set_task_tags(3, "важно")
+            manager.undo()
+        for attribute in ("_tag_index", "_priority", "_dependencies"):
+            self.assertIs(getattr(manager, attribute)[0], manager.tasks, attribute)
+        self.assertEqual(manager.top_tasks(1)[0].title, "Задача 5")
+        self.assertIn("Задача 1", [task.title for task in manager.ready_tasks()])
+        self.assertEqual([task.title for _, task in manager.filter_by_tags("#важно")], ["Задача 0"])
+
+    def test_stress_keeps_updates_and_read_throughput(self):
+        results = taskmanager.stress_test_thread_safe((1, 4), task_count=300, duration=0.5, writes_per_writer=50)
+        self.assertEqual([result["lost_updates"] for result in results], [0, 0])
+        self.assertGreaterEqual(results[-1]["scaling"], taskmanager.STRESS_MIN_SCALING)